@@ -1,9 +1,24 @@
 """
 Source modules for the Olist Analytics Dashboard
+Re-exports are resolved on first access, so importing one submodule (e.g.
+app.synthetic) does not import the database layer and its dependencies.
 """
 
-from .database import get_connection, load_data
-from .styles import inject_css
-from .utils import fmt_curr, fmt_num
+import importlib
 
-__all__ = ["get_connection", "load_data", "inject_css", "fmt_curr", "fmt_num"]
+# Re-exported name -> submodule defining it
+_EXPORTS = {
+    "get_connection": "database",
+    "load_data": "database",
+    "inject_css": "styles",
+    "fmt_curr": "utils",
+    "fmt_num": "utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
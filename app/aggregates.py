@@ -0,0 +1,144 @@
+"""
+Dashboard aggregates for the Home, Analytics and About tabs
+Same tables as the olist_gold.agg_* tables built by 05_gold_aggregates.sql, so the
+tabs render identically from either source.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.engine import get_engine
+from app.profiling import profiled
+
+# Aggregate name -> key columns (gold table is olist_gold.agg_<name>)
+AGG_KEYS = {
+    "kpis": [],
+    "monthly": ["month"],
+    "monthly_category": ["month", "product_category_name"],
+    "daily": ["day"],
+    "daily_category": ["day", "product_category_name"],
+    "daily_new_customers": ["day"],
+    "category": ["product_category_name"],
+    "state_customers": ["state"],
+    "state_buyers": ["state"],
+    "category_state_buyers": ["product_category_name", "state"],
+    "seller_tiers": ["seller_tier"],
+}
+
+
+def sort_aggregates(aggs: dict) -> dict:
+    """Order every aggregate by its keys so ties break the same way for both sources."""
+    return {
+        name: df.sort_values(AGG_KEYS[name]).reset_index(drop=True)
+        if AGG_KEYS[name]
+        else df
+        for name, df in aggs.items()
+    }
+
+
+# Aggregates computed from fct_orders, with the columns summed across chunks
+FACT_SUMS = {
+    "monthly": ["revenue", "orders"],
+    "monthly_category": ["revenue", "orders"],
+    "daily": ["revenue", "freight", "items", "orders"],
+    "daily_category": ["revenue", "freight", "items", "orders"],
+    "category": ["revenue", "orders"],
+    "state_buyers": ["customers"],
+    "category_state_buyers": ["customers"],
+}
+
+
+def fact_aggregates(fct_orders, dim_customers, engine=None) -> dict:
+    """Partial aggregates of a chunk of fct_orders, computed by engine (app.engine).
+
+    Partials of different chunks add up exactly as long as no order spans two
+    chunks (e.g. chunks are whole months): order counts are distinct per
+    order_id and buyer counts per customer_id, which is one id per order.
+    First purchases are kept per person and reduced in combine_aggregates().
+    """
+    return get_engine(engine).fact_aggregates(fct_orders, dim_customers)
+
+
+def combine_aggregates(parts, dim_customers, dim_sellers) -> dict:
+    """Add up fact_aggregates() partials and the dimension-only aggregates."""
+    parts = list(parts)
+    totals = pd.concat([part["totals"] for part in parts])
+    kpis = pd.DataFrame(
+        {
+            "total_revenue": [totals["total_revenue"].sum()],
+            "total_orders": [totals["total_orders"].sum()],
+            "total_items": [totals["total_items"].sum()],
+            "total_customers": [dim_customers["customer_id"].nunique()],
+            "avg_rating": [dim_sellers["avg_review_score"].mean()],
+            "total_sellers": [len(dim_sellers)],
+            "first_purchase": [totals["first_purchase"].min()],
+            "last_purchase": [totals["last_purchase"].max()],
+        }
+    )
+
+    aggs = {"kpis": kpis}
+    for name, sums in FACT_SUMS.items():
+        frames = pd.concat([part[name] for part in parts])
+        aggs[name] = frames.groupby(AGG_KEYS[name], as_index=False)[sums].sum()
+    # A person's first purchase is the earliest over all chunks
+    firsts = pd.concat([part["first_purchases"] for part in parts])
+    first_days = (
+        firsts.groupby("customer_unique_id")["first_purchase"]
+        .min()
+        .dt.floor("D")
+        .value_counts()
+    )
+    aggs["daily_new_customers"] = pd.DataFrame(
+        {
+            "day": first_days.index.strftime("%Y-%m-%d"),
+            "customers": first_days.to_numpy(),
+        }
+    )
+    aggs["state_customers"] = (
+        dim_customers.groupby("state").size().reset_index(name="customers")
+    )
+    aggs["seller_tiers"] = (
+        dim_sellers.groupby("seller_tier").size().reset_index(name="sellers")
+    )
+    return sort_aggregates({name: aggs[name] for name in AGG_KEYS})
+
+
+def build_aggregates(fct_orders, dim_customers, dim_sellers, engine=None) -> dict:
+    """Compute the dashboard aggregates from the item-level Gold tables."""
+    return combine_aggregates(
+        [fact_aggregates(fct_orders, dim_customers, engine)], dim_customers, dim_sellers
+    )
+
+
+@profiled("cache")
+@st.cache_data(ttl=None, max_entries=2, show_spinner=False)
+def _fact_aggregates(versions, _fct_orders, _dim_customers):
+    """fct_orders partials, the expensive part, once per version of their tables."""
+    return fact_aggregates(_fct_orders, _dim_customers)
+
+
+@profiled("cache")
+@st.cache_data(ttl=None, max_entries=2, show_spinner=False)
+def _aggregates(versions, _fact_versions, _fct_orders, _dim_customers, _dim_sellers):
+    """Helper to combine the cached partials with the dimension aggregates."""
+    return combine_aggregates(
+        [_fact_aggregates(_fact_versions, _fct_orders, _dim_customers)],
+        _dim_customers,
+        _dim_sellers,
+    )
+
+
+def get_aggregates(data_version, fct_orders, dim_customers, dim_sellers):
+    """Dashboard aggregates, recomputed only when a table they use changes.
+
+    A new dim_sellers version only re-runs combine_aggregates(); the fct_orders
+    partials stay cached.
+    """
+    return _aggregates(
+        lineage.key(data_version, "aggregates"),
+        lineage.key(data_version, "fact_aggregates"),
+        fct_orders,
+        dim_customers,
+        dim_sellers,
+    )
@@ -0,0 +1,118 @@
+"""
+Cohort retention by first-purchase month
+CohortRetention groups people (customer_unique_id) into cohorts by the month
+of their first purchase and counts how many of each cohort ordered again 1,
+2, ... months later. People and months are integer-encoded and packed into
+one int64 key per purchase, so the whole matrix is a hash join, one sort
+and a bincount in NumPy, with no per-customer Python: 10M order items take
+seconds. It needs the row-level tables (full and out_of_core modes).
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.profiling import profiled
+
+# fct_orders columns a cohort build reads
+COLUMNS = ["customer_id", "order_purchase_timestamp"]
+# Low bits of a purchase key hold the month (months since 1970-01)
+MONTH_BITS = 20
+
+
+def person_codes(customer_ids: pd.Series, dim_customers: pd.DataFrame) -> np.ndarray:
+    """Integer code of the person of every customer_id, -1 if not in dim_customers.
+
+    Codes follow dim_customers' order, so calls with the same dim_customers
+    agree. One factorize() of both id columns is the join.
+    """
+    known = dim_customers["customer_id"]
+    codes, uniques = pd.factorize(pd.concat([known, customer_ids], ignore_index=True))
+    # The extra last slot maps missing ids (code -1) to -1
+    people = np.full(len(uniques) + 1, -1)
+    people[codes[: len(known)]] = pd.factorize(dim_customers["customer_unique_id"])[0]
+    return people[codes[len(known) :]]
+
+
+def _distinct(keys: np.ndarray) -> np.ndarray:
+    # Sorting and dropping repeats is far faster than np.unique on int64 keys
+    keys = np.sort(keys)
+    return keys[np.diff(keys, prepend=keys[:1] - 1) != 0]
+
+
+def purchase_keys(person: np.ndarray, timestamps: pd.Series) -> np.ndarray:
+    """Sorted distinct person << MONTH_BITS | month keys of purchases.
+
+    Purchases of unknown people (code -1) or without a timestamp are left out.
+    """
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    months = timestamps.to_numpy().astype("datetime64[M]")
+    valid = (person >= 0) & ~np.isnat(months)
+    keys = (person[valid].astype(np.int64) << MONTH_BITS) | months[valid].astype(
+        np.int64
+    )
+    return _distinct(keys)
+
+
+class CohortRetention:
+    """People per first-purchase month (cohort) and months since it.
+
+    counts[i, k] is the number of people of cohort months[i] who ordered k
+    months after their first purchase, so counts[:, 0] are the cohort sizes;
+    cells past the last month of the data are 0.
+    """
+
+    def __init__(self, keys: np.ndarray):
+        # Sorted keys list each person's months in order, first month first
+        keys = _distinct(keys)
+        person = keys >> MONTH_BITS
+        month = keys & ((1 << MONTH_BITS) - 1)
+        starts = np.diff(person, prepend=-1) != 0
+        first = month[starts][np.cumsum(starts) - 1]
+
+        start, end = (int(month.min()), int(month.max())) if len(keys) else (0, -1)
+        n_months = end - start + 1
+        self.months = pd.period_range(
+            pd.Period(ordinal=start, freq="M"), periods=n_months, freq="M"
+        )
+        self.counts = np.bincount(
+            (first - start) * n_months + (month - first), minlength=n_months**2
+        ).reshape(n_months, n_months)
+
+    @classmethod
+    def build(cls, fct_orders, dim_customers):
+        """Cohorts of fct_orders' purchases, people taken from dim_customers."""
+        person = person_codes(fct_orders["customer_id"], dim_customers)
+        return cls(purchase_keys(person, fct_orders["order_purchase_timestamp"]))
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """People per cohort."""
+        return self.counts[:, :1].ravel()
+
+    def retention(self) -> pd.DataFrame:
+        """Share of each cohort ordering k months later, NaN past the data."""
+        n_months = len(self.months)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = self.counts / self.counts[:, :1]
+        # Cohort i can only be followed for n_months - i months
+        observed = np.add.outer(np.arange(n_months), np.arange(n_months)) < n_months
+        return pd.DataFrame(
+            np.where(observed, rates, np.nan),
+            index=self.months.astype(str),
+            columns=range(n_months),
+        )
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cohorts(versions, _fct_orders, _dim_customers):
+    """Helper to cache the cohorts per version of their tables."""
+    return CohortRetention.build(_fct_orders, _dim_customers)
+
+
+def get_cohorts(data_version, fct_orders, dim_customers):
+    """Build the cohort retention matrix once per version of its tables."""
+    return _cohorts(lineage.key(data_version, "cohorts"), fct_orders, dim_customers)
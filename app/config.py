@@ -0,0 +1,19 @@
+"""
+Settings lookup for the Olist Analytics Dashboard
+Environment variables win over .streamlit/secrets.toml.
+"""
+
+import os
+
+import streamlit as st
+
+
+def get_setting(name: str, default: str = "") -> str:
+    """Read a setting from the environment, then Streamlit secrets."""
+    value = os.getenv(name)
+    if value:
+        return value
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:  # No secrets.toml
+        return default
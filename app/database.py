@@ -1,47 +1,172 @@
 """
 Database connection and data loading for Olist Analytics
-Connects to Databricks SQL Warehouse (Free Edition)
+Connects to Databricks SQL Warehouse (Free Edition), or reads
+<name>.parquet files from OLIST_DATA_DIR when that is set.
 """
 
-import streamlit as st
-from databricks import sql
-import os
+from pathlib import Path
+
 import pandas as pd
+import streamlit as st
+
+from app import lineage, snapshot
+from app.aggregates import AGG_KEYS, sort_aggregates
+from app.config import get_setting
+from app.profiling import profiled, timed
+
+GOLD_TABLES = ["fct_orders", "dim_customers", "dim_products", "dim_sellers"]
+
+
+def connect():
+    """Open a new connection to Databricks SQL Warehouse."""
+    from databricks import sql  # Not needed, so not imported, with OLIST_DATA_DIR
+
+    return sql.connect(
+        server_hostname=get_setting("DATABRICKS_HOST"),
+        http_path=get_setting("DATABRICKS_HTTP_PATH"),
+        access_token=get_setting("DATABRICKS_TOKEN"),
+    )
+
+
+def connector_errors() -> tuple:
+    """Exception classes of the SQL connector, none when it is not installed."""
+    try:
+        from databricks.sql.exc import Error
+    except ImportError:  # Local Parquet data only
+        return ()
+    return (Error,)
 
 
 @st.cache_resource
 def get_connection():
     """Get cached connection to Databricks SQL Warehouse."""
-    return sql.connect(
-        server_hostname=os.getenv("DATABRICKS_HOST")
-        or st.secrets.get("DATABRICKS_HOST", ""),
-        http_path=os.getenv("DATABRICKS_HTTP_PATH")
-        or st.secrets.get("DATABRICKS_HTTP_PATH", ""),
-        access_token=os.getenv("DATABRICKS_TOKEN")
-        or st.secrets.get("DATABRICKS_TOKEN", ""),
-    )
+    return connect()
 
 
 def _fetch_table(cursor, table_name: str) -> pd.DataFrame:
     """Helper to fetch a table as DataFrame."""
-    cursor.execute(f"SELECT * FROM olist_gold.{table_name}")
-    columns = [desc[0] for desc in cursor.description]
-    rows = cursor.fetchall()
+    with timed("query", table_name):
+        cursor.execute(f"SELECT * FROM olist_gold.{table_name}")
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
     return pd.DataFrame(rows, columns=columns)
 
 
-@st.cache_data(ttl=None)  # Infinite cache - Olist data is static/historical
-def load_data():
-    """Load all dimension and fact tables from Databricks Gold layer."""
+def _table_version(cursor, table_name: str) -> int:
+    """Helper to read the latest Delta version of a Gold table."""
+    with timed("query", f"{table_name} version"):
+        cursor.execute(f"DESCRIBE HISTORY olist_gold.{table_name} LIMIT 1")
+        return cursor.fetchone()[0]
+
+
+def data_dir():
+    """Local directory of Gold Parquet files, or None to use Databricks."""
+    local = get_setting("OLIST_DATA_DIR")
+    return Path(local) if local else None
+
+
+def _load_tables(table_names) -> list:
+    """Helper to fetch several Gold tables, from Parquet files or Databricks."""
+    local = data_dir()
+    if local:
+        tables = []
+        for name in table_names:
+            with timed("query", f"{name}.parquet"):
+                tables.append(pd.read_parquet(local / f"{name}.parquet"))
+        return tables
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        fct_orders = _fetch_table(cursor, "fct_orders")
-        dim_customers = _fetch_table(cursor, "dim_customers")
-        dim_products = _fetch_table(cursor, "dim_products")
-        dim_sellers = _fetch_table(cursor, "dim_sellers")
+        return [_fetch_table(cursor, name) for name in table_names]
     finally:
         cursor.close()
 
-    return fct_orders, dim_customers, dim_products, dim_sellers
+
+def _fetch_gold_table(name: str) -> pd.DataFrame:
+    """Helper to fetch one Gold table from its source, ready for the tabs."""
+    (df,) = _load_tables([name])
+    if name == "fct_orders":
+        with timed("transform", "to_datetime"):
+            df["order_purchase_timestamp"] = pd.to_datetime(
+                df["order_purchase_timestamp"]
+            )
+    return df
+
+
+# A resource, not cache_data: one shared frame per process instead of an
+# unpickled copy per rerun. Callers must treat the frames as read-only.
+# Two versions of each table so the old one keeps serving while app.refresh
+# loads a new one.
+@profiled("cache")
+@st.cache_resource(max_entries=2 * len(GOLD_TABLES), show_spinner="Loading data...")
+def load_table(table_version, name):
+    """Load one Gold table, once per version of that table.
+
+    Unless OLIST_SNAPSHOT_DIR=off it is served from a memory-mapped Arrow
+    snapshot shared by every process on the host (app.snapshot).
+    """
+    if snapshot.snapshot_dir() is None:
+        return _fetch_gold_table(name)
+    with timed("snapshot", name):
+        (df,) = snapshot.load(table_version, [name], lambda: [_fetch_gold_table(name)])
+    return df
+
+
+def load_data(data_version):
+    """Load all dimension and fact tables from Databricks Gold layer.
+
+    Each table is cached on its own version (app.lineage), so a new version
+    of one table reloads only that table.
+    """
+    return tuple(load_table(lineage.key(data_version, t), t) for t in GOLD_TABLES)
+
+
+def load_dimensions(data_version):
+    """Load only the dimension tables, for when fct_orders stays out of core."""
+    return tuple(load_table(lineage.key(data_version, t), t) for t in GOLD_TABLES[1:])
+
+
+@profiled("cache")
+@st.cache_data(ttl=None, max_entries=2)
+def load_aggregates(data_version):
+    """Load the small dashboard aggregate tables (olist_gold.agg_*)."""
+    tables = _load_tables([f"agg_{name}" for name in AGG_KEYS])
+    return sort_aggregates(dict(zip(AGG_KEYS, tables)))
+
+
+def dashboard_mode():
+    """'full' loads the item-level tables, 'aggregates' only the agg_* tables and
+    'out_of_core' the dimensions, scanning fct_orders from Parquet (app.outofcore)."""
+    return get_setting("OLIST_DASHBOARD_MODE", "full").lower()
+
+
+def source_version():
+    """Current version token of the source tables, read uncached.
+
+    Reruns key their caches on app.refresh.get_data_version() instead, which
+    only moves to a new source version once it has been loaded.
+    """
+    local = data_dir()
+    if local:
+        versions = [
+            f"{t}@{(local / f'{t}.parquet').stat().st_mtime_ns}"
+            for t in GOLD_TABLES
+            if (local / f"{t}.parquet").exists()
+        ]
+    else:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            versions = [f"{t}@{_table_version(cursor, t)}" for t in GOLD_TABLES]
+        finally:
+            cursor.close()
+
+    if dashboard_mode() == "out_of_core":
+        from app.outofcore import dataset_version, fact_dataset_path
+
+        # Listed afresh, so new or rewritten partitions move the version
+        versions.append(dataset_version(fact_dataset_path()))
+    return ",".join(versions)
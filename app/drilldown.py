@@ -0,0 +1,82 @@
+"""
+Customer -> orders -> items drill-down over a precomputed adjacency
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.profiling import profiled
+
+_EMPTY = np.array([], dtype=np.int64)
+
+
+def order_summary(items) -> pd.DataFrame:
+    """One row per order of purchase-ordered item rows."""
+    return (
+        items.groupby("order_id", sort=False)
+        .agg(
+            purchased=("order_purchase_timestamp", "first"),
+            items=("product_id", "size"),
+            order_value=("total_order_value", "sum"),
+        )
+        .reset_index()
+    )
+
+
+class CustomerOrders:
+    """CSR adjacency from customer_unique_id to their rows in fct_orders.
+
+    Customers are stored sorted; rows[offsets[i]:offsets[i + 1]] are the
+    fct_orders positions of customer i, in purchase order.
+    """
+
+    def __init__(self, fct_orders, dim_customers):
+        self.fct_orders = fct_orders
+
+        unique_ids = pd.Series(
+            dim_customers["customer_unique_id"].to_numpy(),
+            index=dim_customers["customer_id"].to_numpy(),
+        )
+        codes, customers = pd.factorize(
+            fct_orders["customer_id"].map(unique_ids), sort=True
+        )
+
+        rows = np.flatnonzero(codes >= 0)
+        purchased = fct_orders["order_purchase_timestamp"].values[rows]
+        rows = rows[np.lexsort((purchased, codes[rows]))]
+
+        counts = np.bincount(codes[rows], minlength=len(customers))
+        self.customers = np.asarray(customers, dtype=str)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.rows = rows
+
+    def rows_for(self, customer_unique_id: str) -> np.ndarray:
+        """fct_orders positions of one customer, an O(degree) slice."""
+        i = np.searchsorted(self.customers, customer_unique_id)
+        if i == len(self.customers) or self.customers[i] != customer_unique_id:
+            return _EMPTY
+        return self.rows[self.offsets[i] : self.offsets[i + 1]]
+
+    def items(self, customer_unique_id: str) -> pd.DataFrame:
+        """Item-level rows of one customer's orders."""
+        return self.fct_orders.iloc[self.rows_for(customer_unique_id)]
+
+    def orders(self, customer_unique_id: str) -> pd.DataFrame:
+        """One row per order of one customer, oldest first."""
+        return order_summary(self.items(customer_unique_id))
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _customer_orders(versions, _fct_orders, _dim_customers):
+    """Helper to cache the adjacency per version of its tables."""
+    return CustomerOrders(_fct_orders, _dim_customers)
+
+
+def get_customer_orders(data_version, fct_orders, dim_customers):
+    """Build the customer -> orders adjacency once per version of its tables."""
+    return _customer_orders(
+        lineage.key(data_version, "customer_orders"), fct_orders, dim_customers
+    )
@@ -0,0 +1,143 @@
+"""
+Pluggable compute engine for the tabs' row-level aggregations
+OLIST_ENGINE selects the implementation behind fact_aggregates() and
+order_months(): "pandas" (default, single-threaded) or "polars", which runs
+the same group-bys on Polars' thread pool (POLARS_MAX_THREADS to limit).
+Every engine takes and returns pandas objects, so the tabs and caches are
+unchanged.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.config import get_setting
+from app.profiling import profiled
+
+ENGINES = ("pandas", "polars")
+
+
+class PandasEngine:
+    """Reference implementation on pandas."""
+
+    name = "pandas"
+
+    def fact_aggregates(self, fct_orders, dim_customers) -> dict:
+        """Partial aggregates of a chunk of fct_orders (see app.aggregates)."""
+        ts = fct_orders["order_purchase_timestamp"]
+        orders = fct_orders.assign(month=ts.dt.strftime("%Y-%m"))
+
+        def revenue_orders(keys):
+            return (
+                orders.groupby(keys)
+                .agg(
+                    revenue=("total_order_value", "sum"),
+                    orders=("order_id", "nunique"),
+                )
+                .reset_index()
+            )
+
+        def daily_totals(keys):
+            # Grouped on the day's timestamp; only the group keys get formatted
+            daily = (
+                orders.assign(day=ts.dt.floor("D"))
+                .groupby(keys)
+                .agg(
+                    revenue=("total_order_value", "sum"),
+                    freight=("freight_value", "sum"),
+                    items=("order_id", "size"),
+                    orders=("order_id", "nunique"),
+                )
+                .reset_index()
+            )
+            return daily.assign(day=daily["day"].dt.strftime("%Y-%m-%d"))
+
+        # De-duplicate before joining so multi-item orders don't fan out the merge
+        buyers = (
+            orders[["customer_id", "product_category_name"]]
+            .drop_duplicates()
+            .merge(dim_customers[["customer_id", "state"]], on="customer_id")
+        )
+
+        # Earliest purchase per person in this chunk, for the new customers
+        people = orders["customer_id"].map(
+            dim_customers.set_index("customer_id")["customer_unique_id"]
+        )
+        first_purchases = (
+            ts.groupby(people)
+            .min()
+            .rename("first_purchase")
+            .rename_axis("customer_unique_id")
+            .reset_index()
+        )
+
+        return {
+            "totals": pd.DataFrame(
+                {
+                    "total_revenue": [orders["total_order_value"].sum()],
+                    "total_orders": [orders["order_id"].nunique()],
+                    "total_items": [len(orders)],
+                    "first_purchase": [ts.min()],
+                    "last_purchase": [ts.max()],
+                }
+            ),
+            "monthly": revenue_orders(["month"]),
+            "monthly_category": revenue_orders(["month", "product_category_name"]),
+            "daily": daily_totals(["day"]),
+            "daily_category": daily_totals(["day", "product_category_name"]),
+            "first_purchases": first_purchases,
+            "category": revenue_orders(["product_category_name"]),
+            "state_buyers": buyers.groupby("state")["customer_id"]
+            .nunique()
+            .reset_index(name="customers"),
+            "category_state_buyers": buyers.groupby(["product_category_name", "state"])[
+                "customer_id"
+            ]
+            .nunique()
+            .reset_index(name="customers"),
+        }
+
+    def order_months(self, fct_orders) -> pd.Series:
+        """Purchase month (YYYY-MM) of every order item."""
+        return (
+            fct_orders["order_purchase_timestamp"]
+            .dt.tz_localize(None)
+            .dt.to_period("M")
+            .astype(str)
+        )
+
+
+_engines = {}
+
+
+def engine_name() -> str:
+    """Engine selected by OLIST_ENGINE."""
+    return get_setting("OLIST_ENGINE", "pandas").lower()
+
+
+def get_engine(name=None):
+    """The engine called name (default: OLIST_ENGINE), created once per process."""
+    name = name or engine_name()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown OLIST_ENGINE {name!r}; expected one of {ENGINES}")
+    if name not in _engines:
+        if name == "polars":
+            # Optional dependency, only imported when selected
+            from app.polars_engine import PolarsEngine
+
+            _engines[name] = PolarsEngine()
+        else:
+            _engines[name] = PandasEngine()
+    return _engines[name]
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _order_months(versions, _fct_orders):
+    """Helper to cache order_months() per fct_orders version."""
+    return get_engine().order_months(_fct_orders)
+
+
+def get_order_months(data_version, fct_orders) -> pd.Series:
+    """Purchase month of every order item, once per fct_orders version."""
+    return _order_months(lineage.key(data_version, "month_keys"), fct_orders)
@@ -0,0 +1,49 @@
+"""
+Per-table versions and the artifacts derived from each Gold table
+A data version token is "<table>@<version>,..." with one entry per Gold
+table. Every cached artifact is keyed by key(data_version, artifact), the
+versions of only the tables DEPENDS_ON lists for it, so e.g. a new
+dim_sellers version rebuilds the seller-derived results while the
+fct_orders structures stay warm.
+"""
+
+# Artifact -> Gold tables it is built from (a Gold table depends on itself)
+DEPENDS_ON = {
+    "month_keys": ["fct_orders"],
+    "fact_aggregates": ["fct_orders", "dim_customers"],
+    "aggregates": ["fct_orders", "dim_customers", "dim_sellers"],
+    "summary": ["fct_orders", "dim_customers", "dim_sellers"],
+    "customer_orders": ["fct_orders", "dim_customers"],
+    "sketches": ["fct_orders", "dim_customers"],
+    "daily_index": ["fct_orders", "dim_customers"],
+    "cohorts": ["fct_orders", "dim_customers"],
+    "search_index:fct_orders": ["fct_orders"],
+    "search_index:dim_customers": ["dim_customers"],
+    "search_index:dim_products": ["dim_products"],
+}
+
+
+def table_versions(data_version: str) -> dict:
+    """Table -> version of a data version token."""
+    return dict(part.split("@", 1) for part in data_version.split(",") if part)
+
+
+def key(data_version: str, artifact: str) -> str:
+    """Cache key of artifact: the versions of the tables it depends on."""
+    versions = table_versions(data_version)
+    return ",".join(
+        f"{table}@{versions.get(table, '')}"
+        for table in DEPENDS_ON.get(artifact, [artifact])
+    )
+
+
+def invalidated(old_version: str, new_version: str) -> list:
+    """Tables and artifacts whose key differs between two data versions."""
+    old, new = table_versions(old_version), table_versions(new_version)
+    tables = sorted(t for t in old.keys() | new.keys() if old.get(t) != new.get(t))
+    artifacts = [
+        artifact
+        for artifact, depends_on in DEPENDS_ON.items()
+        if set(depends_on) & set(tables)
+    ]
+    return tables + artifacts
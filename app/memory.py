@@ -0,0 +1,224 @@
+"""
+Memory accounting for the dashboard's tables and caches
+Deep size of each table and column, of every st.cache_data / st.cache_resource
+entry and the process RSS, flattened by metrics() for export in the
+Prometheus text format. Shown by the profiling panel with OLIST_PROFILE=memory.
+"""
+
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from streamlit.runtime.caching.cache_data_api import get_data_cache_stats_provider
+from streamlit.runtime.caching.cache_resource_api import (
+    get_resource_cache_stats_provider,
+)
+
+MB = 2**20
+
+
+def _psutil_memory():
+    """psutil's memory info of this process, or None without psutil."""
+    try:
+        import psutil  # Optional: only needed where `resource` is missing
+    except ImportError:
+        return None
+    return psutil.Process().memory_info()
+
+
+def rss_bytes():
+    """Current resident set size of this process, None if it cannot be read.
+
+    Read from /proc on Linux, falling back to the peak on other Unixes and
+    to psutil (if installed) on Windows.
+    """
+    if sys.platform == "win32":
+        info = _psutil_memory()
+        return None if info is None else info.rss
+    import resource  # Unix only
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, None if it cannot be read."""
+    if sys.platform == "win32":
+        info = _psutil_memory()
+        return None if info is None else info.peak_wset
+    import resource  # Unix only
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KB
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes held by obj and everything it references, counting shared objects once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        base = obj.base if obj.base is not None else obj
+        if base is not obj and id(base) in seen:
+            return 0
+        seen.add(id(base))
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += sum(deep_size(item, seen) for item in obj.ravel())
+        return size
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + deep_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def table_memory(tables: dict) -> pd.DataFrame:
+    """Deep memory usage of every column (and index) of each table."""
+    rows = []
+    for table, df in tables.items():
+        if df is None:  # e.g. fct_orders in out-of-core mode
+            continue
+        usage = df.memory_usage(deep=True, index=True)
+        for column, nbytes in usage.items():
+            dtype = df.index.dtype if column == "Index" else df[column].dtype
+            rows.append(
+                {
+                    "table": table,
+                    "column": column,
+                    "dtype": str(dtype),
+                    "rows": len(df),
+                    "bytes": int(nbytes),
+                }
+            )
+    return pd.DataFrame(rows, columns=["table", "column", "dtype", "rows", "bytes"])
+
+
+def cache_memory() -> pd.DataFrame:
+    """Bytes held by each st.cache_data and st.cache_resource entry.
+
+    cache_resource entries are sized through Streamlit internals; when those
+    are missing they are left out and attrs["unavailable"] lists the cache.
+    """
+    rows = []
+    # cache_data stores pickled bytes, whose length Streamlit reports exactly
+    for stats in get_data_cache_stats_provider().get_stats().values():
+        for stat in stats:
+            rows.append(
+                {
+                    "cache": "cache_data",
+                    "function": stat.cache_name,
+                    "bytes": stat.byte_length,
+                }
+            )
+
+    # cache_resource stats are only entry counts by default, so size the values
+    # (private Streamlit attributes, which may change between releases)
+    unavailable = []
+    resource_rows = []
+    try:
+        resource_caches = get_resource_cache_stats_provider()
+        for caches in list(resource_caches._function_caches.values()):
+            for cache in list(caches.values()):
+                for result in list(cache._mem_cache.values()):
+                    resource_rows.append(
+                        {
+                            "cache": "cache_resource",
+                            "function": cache.display_name,
+                            "bytes": deep_size(result.value),
+                        }
+                    )
+    except AttributeError:
+        unavailable.append("cache_resource")
+    else:
+        rows.extend(resource_rows)
+
+    caches_mem = pd.DataFrame(rows, columns=["cache", "function", "bytes"])
+    caches_mem.attrs["unavailable"] = unavailable
+    return caches_mem
+
+
+def top_allocations(before: tracemalloc.Snapshot, limit: int = 10) -> pd.DataFrame:
+    """Source lines that allocated the most memory still held since `before`."""
+    after = tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+    )
+    rows = [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "bytes": stat.size_diff,
+            "blocks": stat.count_diff,
+        }
+        for stat in after.compare_to(before, "lineno")[:limit]
+    ]
+    return pd.DataFrame(rows, columns=["location", "bytes", "blocks"])
+
+
+def metrics(tables_mem: pd.DataFrame, caches_mem: pd.DataFrame) -> list:
+    """(name, labels, value) samples for tables, caches and the process.
+
+    Process samples are left out where RSS cannot be read.
+    """
+    samples = [
+        (name, {}, value)
+        for name, value in [
+            ("olist_process_rss_bytes", rss_bytes()),
+            ("olist_process_peak_rss_bytes", peak_rss_bytes()),
+        ]
+        if value is not None
+    ]
+    for (table, column), nbytes in (
+        tables_mem.groupby(["table", "column"])["bytes"].sum().items()
+    ):
+        samples.append(
+            ("olist_table_column_bytes", {"table": table, "column": column}, nbytes)
+        )
+    for (cache, function), group in caches_mem.groupby(["cache", "function"]):
+        labels = {"cache": cache, "function": function}
+        samples.append(("olist_cache_bytes", labels, int(group["bytes"].sum())))
+        samples.append(("olist_cache_entries", labels, len(group)))
+    return samples
+
+
+def _label_value(value) -> str:
+    """A label value escaped for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(samples: list) -> str:
+    """Render samples in the Prometheus text exposition format.
+
+    The format wants every sample of a metric right after its TYPE line, so
+    samples are grouped by name, in order of first appearance.
+    """
+    families = {}
+    for name, labels, value in samples:
+        families.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, family in families.items():
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in family:
+            label_text = ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items())
+            lines.append(
+                f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}"
+            )
+    return "\n".join(lines) + "\n"
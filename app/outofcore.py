@@ -0,0 +1,257 @@
+"""
+Out-of-core fct_orders over month-partitioned Parquet
+With OLIST_DASHBOARD_MODE=out_of_core the fact table is never loaded whole:
+it stays a hive-partitioned dataset (month=YYYY-MM) at OLIST_FACT_DATASET and
+every aggregation or filter is a pyarrow.dataset scan that reads only the
+columns it needs (projection) of the partitions and row groups that can match
+(predicate pushdown). Aggregates stream one month at a time.
+
+Usage (partition an existing fct_orders Parquet file or directory):
+    python -m app.outofcore data/synthetic/fct_orders.parquet data/fct_orders
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import streamlit as st
+
+from app import lineage
+from app.aggregates import combine_aggregates, fact_aggregates
+from app.cohorts import COLUMNS as COHORT_COLUMNS
+from app.cohorts import CohortRetention, purchase_keys
+from app.config import get_setting
+from app.profiling import profiled, timed
+from app.sketches import DistinctSketches
+
+PARTITION = "month"
+PARTITIONING = ds.partitioning(pa.schema([(PARTITION, pa.string())]), flavor="hive")
+
+# Columns fact_aggregates() and DistinctSketches.build() read
+AGGREGATE_COLUMNS = [
+    "order_id",
+    "customer_id",
+    "product_category_name",
+    "freight_value",
+    "total_order_value",
+    "order_purchase_timestamp",
+]
+
+
+def _filesystem(path):
+    """(filesystem, path within it) of a local path or URI."""
+    try:
+        return pafs.FileSystem.from_uri(path)
+    except (pa.ArrowInvalid, ValueError):  # A plain, possibly relative, local path
+        return pafs.LocalFileSystem(), str(Path(path).resolve())
+
+
+def dataset_version(path) -> str:
+    """Token of the dataset's current files, listed afresh on every call.
+
+    It changes whenever a partition file is added, removed or rewritten;
+    files ds.dataset() skips (names starting with "." or "_") are ignored.
+    """
+    filesystem, root = _filesystem(path)
+    listing = filesystem.get_file_info(pafs.FileSelector(root, recursive=True))
+    files = sorted(
+        (info.path, info.size, info.mtime_ns)
+        for info in listing
+        if info.type == pafs.FileType.File
+        and not any(
+            part.startswith((".", "_")) for part in info.path[len(root) :].split("/")
+        )
+    )
+    digest = hashlib.sha1(repr(files).encode()).hexdigest()[:16]
+    return f"fct_orders@{len(files)}:{digest}"
+
+
+class FactDataset:
+    """fct_orders as a lazily scanned, month-partitioned Parquet dataset."""
+
+    def __init__(self, path):
+        self.path = path
+        self.dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+
+    def version(self) -> str:
+        """Token of the files at path now (dataset_version()), which may be newer
+        than the file list this object scans."""
+        return dataset_version(self.path)
+
+    def months(self) -> list:
+        """Partition months, from the file paths alone."""
+        return sorted(
+            {
+                ds.get_partition_keys(fragment.partition_expression)[PARTITION]
+                for fragment in self.dataset.get_fragments()
+            }
+        )
+
+    def scan(self, columns=None, filter=None) -> pd.DataFrame:
+        """Read the matching rows of the given columns."""
+        with timed("scan", ", ".join(columns) if columns else "*"):
+            return self.dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+    def month_orders(self, month: str, columns) -> pd.DataFrame:
+        """Order items of one month; only that partition is read."""
+        return self.scan(columns, ds.field(PARTITION) == month)
+
+    def customer_items(self, customer_ids) -> pd.DataFrame:
+        """Order items of the given customer_ids, oldest first."""
+        items = self.scan(
+            [f for f in self.dataset.schema.names if f != PARTITION],
+            ds.field("customer_id").isin(list(customer_ids)),
+        )
+        return items.sort_values("order_purchase_timestamp", kind="stable")
+
+    def search_order_ids(self, prefix: str, limit: int = 100):
+        """(match count, rows of the first `limit` order_ids starting with prefix)."""
+        prefix = prefix.strip().lower()
+        ids = self.dataset.to_table(
+            columns=["order_id"],
+            filter=pc.starts_with(ds.field("order_id"), pattern=prefix),
+        )["order_id"]
+        unique_ids = pc.unique(ids)
+        first = unique_ids.take(pc.sort_indices(unique_ids))[:limit]
+        rows = self.scan(
+            [f for f in self.dataset.schema.names if f != PARTITION],
+            ds.field("order_id").isin(first),
+        )
+        return len(ids), rows.sort_values("order_id", kind="stable").head(limit)
+
+    def aggregates(self, dim_customers, dim_sellers) -> dict:
+        """Dashboard aggregates, holding one month of projected columns at a time."""
+        parts = (
+            fact_aggregates(self.month_orders(month, AGGREGATE_COLUMNS), dim_customers)
+            for month in self.months()
+        )
+        return combine_aggregates(parts, dim_customers, dim_sellers)
+
+    def sketches(self, dim_customers):
+        """Distinct-count sketches (app.sketches), built one month at a time."""
+        return DistinctSketches.merge(
+            DistinctSketches.build(
+                self.month_orders(month, AGGREGATE_COLUMNS), dim_customers
+            )
+            for month in self.months()
+        )
+
+    def cohorts(self, dim_customers):
+        """Cohort retention (app.cohorts), from one month of purchases at a time."""
+        # One customer_id lookup for all months, rather than a join per month;
+        # the extra last slot maps missing ids (-1) to -1
+        customers = pd.Index(dim_customers["customer_id"])
+        people = np.append(pd.factorize(dim_customers["customer_unique_id"])[0], -1)
+        keys = []
+        for month in self.months():
+            orders = self.month_orders(month, COHORT_COLUMNS)
+            person = people[customers.get_indexer(orders["customer_id"])]
+            keys.append(purchase_keys(person, orders["order_purchase_timestamp"]))
+        return CohortRetention(np.concatenate(keys))
+
+
+def fact_dataset_path() -> str:
+    """Location of the partitioned fct_orders dataset (local path or URI)."""
+    return get_setting("OLIST_FACT_DATASET", "data/fct_orders")
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _fact_dataset(path, version):
+    """Helper to cache the opened dataset per path and file listing."""
+    return FactDataset(path)
+
+
+def get_fact_dataset(path, data_version):
+    """Open the partitioned fct_orders dataset once per version of its files.
+
+    ds.dataset() captures the file list when it is opened, so a data version
+    with new, rewritten or removed partition files opens a new one; the
+    previous one stays cached for reruns still pinned to the older version.
+    """
+    return _fact_dataset(path, lineage.key(data_version, "fct_orders"))
+
+
+@profiled("cache")
+@st.cache_data(ttl=None, max_entries=2, show_spinner="Scanning fct_orders...")
+def _dataset_aggregates(versions, _facts, _dim_customers, _dim_sellers):
+    """Helper to cache the streamed aggregates per version of their tables."""
+    return _facts.aggregates(_dim_customers, _dim_sellers)
+
+
+def get_dataset_aggregates(data_version, facts, dim_customers, dim_sellers):
+    """Stream the dashboard aggregates out of the dataset once per version of their tables."""
+    return _dataset_aggregates(
+        lineage.key(data_version, "aggregates"), facts, dim_customers, dim_sellers
+    )
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner="Scanning fct_orders...")
+def _dataset_sketches(versions, _facts, _dim_customers):
+    """Helper to cache the streamed sketches per version of their tables."""
+    return _facts.sketches(_dim_customers)
+
+
+def get_dataset_sketches(data_version, facts, dim_customers):
+    """Stream the distinct-count sketches out of the dataset once per version of their tables."""
+    return _dataset_sketches(
+        lineage.key(data_version, "sketches"), facts, dim_customers
+    )
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner="Scanning fct_orders...")
+def _dataset_cohorts(versions, _facts, _dim_customers):
+    """Helper to cache the streamed cohorts per version of their tables."""
+    return _facts.cohorts(_dim_customers)
+
+
+def get_dataset_cohorts(data_version, facts, dim_customers):
+    """Stream the cohort retention matrix out of the dataset once per version of its tables."""
+    return _dataset_cohorts(lineage.key(data_version, "cohorts"), facts, dim_customers)
+
+
+def write_partitioned(source, out_dir):
+    """Rewrite fct_orders Parquet as month=YYYY-MM partitions, batch by batch."""
+    src = ds.dataset(source, format="parquet")
+    schema = src.schema.append(pa.field(PARTITION, pa.string()))
+
+    def batches():
+        for batch in src.to_batches():
+            month = pc.strftime(
+                batch.column("order_purchase_timestamp"), format="%Y-%m"
+            )
+            yield pa.RecordBatch.from_arrays([*batch.columns, month], schema=schema)
+
+    ds.write_dataset(
+        batches(),
+        out_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", help="fct_orders Parquet file or directory")
+    parser.add_argument("out", help="output dataset directory")
+    args = parser.parse_args(argv)
+
+    write_partitioned(args.source, args.out)
+    facts = FactDataset(args.out)
+    print(
+        f"{len(facts.dataset.files)} files in {len(facts.months())} months at {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Pipeline runner for the Databricks SQL layers
+Parses databricks/*.sql into statements, infers the table dependency DAG
+and runs independent statements concurrently over the SQL connector.
+
+Usage:
+    python -m app.pipeline                      # 01 -> 06 full rebuild
+    python -m app.pipeline --incremental        # 04 instead of 03
+    python -m app.pipeline --dry-run            # print the DAG only
+"""
+
+import argparse
+import contextlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from app.database import connect, connector_errors
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "databricks"
+FULL_GOLD = "03_gold_layer.sql"
+INCREMENTAL_GOLD = "04_gold_incremental.sql"
+
+_NAME = r"([A-Za-z_]\w*\.[A-Za-z_]\w*)"
+_WRITE_PATTERNS = [
+    r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMPORARY\s+)?(?:TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    + _NAME,
+    r"^MERGE\s+INTO\s+" + _NAME,
+    r"^INSERT\s+(?:INTO|OVERWRITE)\s+(?:TABLE\s+)?" + _NAME,
+    r"^DELETE\s+FROM\s+" + _NAME,
+    r"^UPDATE\s+" + _NAME,
+    r"^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?" + _NAME,
+    r"^OPTIMIZE\s+" + _NAME,
+    r"^ANALYZE\s+TABLE\s+" + _NAME,
+    r"^ALTER\s+TABLE\s+" + _NAME,
+]
+_SCHEMA_PATTERN = r"^CREATE\s+SCHEMA\s+(?:IF\s+NOT\s+EXISTS\s+)?([A-Za-z_]\w*)"
+_READ_PATTERN = r"\b(?:FROM|JOIN|USING)\s+" + _NAME
+_DECLARE_PATTERN = r"^DECLARE\s+(?:OR\s+REPLACE\s+)?(?:VARIABLE\s+)?([A-Za-z_]\w*)"
+# Tables recording what the incremental Gold layer has merged: the purchase
+# watermark and the review scores dim_sellers reflects
+WATERMARKS = "olist_gold.pipeline_watermarks"
+CHECKPOINTS = {WATERMARKS, "olist_gold.order_review_scores"}
+
+
+class Statement:
+    """One SQL statement with the tables it reads and writes."""
+
+    def __init__(self, file_name: str, index: int, text: str):
+        self.file_name = file_name
+        self.index = index
+        self.text = text
+        self.writes = set()
+        self.reads = set()
+        self.deps = set()
+        self.creates_as = False
+
+        flags = re.IGNORECASE | re.MULTILINE
+        for pattern in _WRITE_PATTERNS:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                self.writes.add(match.group(1).lower())
+                break
+        schema = re.search(_SCHEMA_PATTERN, text, re.IGNORECASE)
+        if schema:
+            self.writes.add(f"schema:{schema.group(1).lower()}")
+
+        self.reads = {name.lower() for name in re.findall(_READ_PATTERN, text, flags)}
+        self.reads -= self.writes
+        # Any qualified name needs its schema to exist first
+        for name in self.reads | self.writes:
+            if "." in name:
+                self.reads.add(f"schema:{name.split('.')[0]}")
+
+        self.creates_as = bool(re.search(r"^CREATE\b.*\bAS\b", text, flags | re.DOTALL))
+        self.declares = re.findall(_DECLARE_PATTERN, text, re.IGNORECASE)
+        self.session_bound = False
+        # Checkpoint updates and staging cleanups close a script: they must
+        # not run until everything before them in the file has succeeded
+        self.finalizes = bool(CHECKPOINTS & self.writes) or bool(
+            re.match(r"DROP\s+TABLE\b", text, re.IGNORECASE)
+        )
+
+    @property
+    def target(self):
+        """Table (or schema) this statement writes, if any."""
+        return next(iter(sorted(self.writes)), None)
+
+    @property
+    def label(self):
+        return f"{self.file_name}#{self.index}"
+
+
+def split_statements(sql_text: str) -> list:
+    """Split a SQL script on semicolons, ignoring comments and quoted text."""
+    statements, current = [], []
+    i, n = 0, len(sql_text)
+    quote = None
+
+    while i < n:
+        ch = sql_text[i]
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+            current.append(ch)
+        elif sql_text.startswith("--", i):
+            end = sql_text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif sql_text.startswith("/*", i):
+            end = sql_text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statements.append("".join(current).strip())
+    return [s for s in statements if s]
+
+
+def parse_files(paths) -> list:
+    """Parse SQL files into statements and wire up their dependencies."""
+    statements = []
+    for path in paths:
+        path = Path(path)
+        for i, text in enumerate(split_statements(path.read_text()), start=1):
+            statements.append(Statement(path.name, i, text))
+
+    # Session variables live in one SQL session, so every statement that
+    # declares, sets or reads one runs in order on a shared connection
+    variables = {name.lower() for stmt in statements for name in stmt.declares}
+    if variables:
+        pattern = r"^SET\s+VAR\b|\b(?:" + "|".join(sorted(variables)) + r")\b"
+        for stmt in statements:
+            stmt.session_bound = bool(
+                stmt.declares or re.search(pattern, stmt.text, re.IGNORECASE)
+            )
+
+    last_bound = None
+    for j, stmt in enumerate(statements):
+        for earlier in statements[:j]:
+            if (
+                stmt.reads & earlier.writes
+                or stmt.writes & earlier.writes
+                or stmt.writes & earlier.reads
+            ):
+                stmt.deps.add(earlier.label)
+        if stmt.session_bound:
+            if last_bound is not None:
+                stmt.deps.add(last_bound.label)
+            last_bound = stmt
+        if stmt.finalizes:
+            # A checkpoint moved past rows whose MERGE failed would skip them
+            # on the next run; a failed dependency skips this statement instead
+            stmt.deps |= {
+                earlier.label
+                for earlier in statements[:j]
+                if earlier.file_name == stmt.file_name and earlier.writes
+            }
+
+    return statements
+
+
+def misordered(statements) -> list:
+    """Finalizing statements that could run before an earlier write of their file."""
+    depth = {
+        stmt.label: i for i, wave in enumerate(levels(statements)) for stmt in wave
+    }
+    problems = []
+    for j, stmt in enumerate(statements):
+        if not stmt.finalizes:
+            continue
+        for earlier in statements[:j]:
+            if (
+                earlier.file_name == stmt.file_name
+                and earlier.writes
+                and depth[earlier.label] >= depth[stmt.label]
+            ):
+                problems.append(f"{stmt.label} may run before {earlier.label}")
+    return problems
+
+
+def levels(statements) -> list:
+    """Group statements into waves that could run concurrently."""
+    depth = {}
+    for stmt in statements:
+        depth[stmt.label] = 1 + max((depth[d] for d in stmt.deps), default=-1)
+    waves = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for stmt in statements:
+        waves[depth[stmt.label]].append(stmt)
+    return waves
+
+
+class Runner:
+    """Executes a statement DAG with a pool of warehouse connections."""
+
+    def __init__(self, statements, workers: int = 4):
+        self.statements = statements
+        self.workers = workers
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _connection(self, stmt):
+        if stmt.session_bound:
+            if self._session is None:
+                self._session = self._open()
+            return self._session
+        if not hasattr(self._local, "conn"):
+            self._local.conn = self._open()
+        return self._local.conn
+
+    def _open(self):
+        conn = connect()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _execute(self, stmt, started_at):
+        result = {
+            "statement": stmt.label,
+            "target": stmt.target,
+            "deps": sorted(stmt.deps),
+            "start_s": round(time.perf_counter() - started_at, 3),
+        }
+        start = time.perf_counter()
+        lock = self._session_lock if stmt.session_bound else contextlib.nullcontext()
+        with lock:
+            cursor = self._connection(stmt).cursor()
+            try:
+                cursor.execute(stmt.text)
+                result["row_count"] = self._row_count(cursor, stmt)
+            finally:
+                cursor.close()
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    @staticmethod
+    def _row_count(cursor, stmt):
+        """Rows written: DML metrics when returned, else COUNT(*) of a CTAS target."""
+        if cursor.description:
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+            if "num_affected_rows" in columns and rows:
+                return rows[0][columns.index("num_affected_rows")]
+        if stmt.creates_as and stmt.target and "." in stmt.target:
+            cursor.execute(f"SELECT COUNT(*) FROM {stmt.target}")
+            return cursor.fetchone()[0]
+        return None
+
+    def run(self) -> list:
+        """Run every statement once its dependencies have succeeded."""
+        pending = {s.label: s for s in self.statements}
+        done, failed, results = set(), set(), []
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for label, stmt in list(pending.items()):
+                    if stmt.deps & failed:
+                        failed.add(label)
+                        results.append({"statement": label, "status": "skipped"})
+                        del pending[label]
+                    elif stmt.deps <= done:
+                        running[pool.submit(self._execute, stmt, started_at)] = stmt
+                        del pending[label]
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stmt = running.pop(future)
+                    try:
+                        result = future.result()
+                        result["status"] = "ok"
+                        done.add(stmt.label)
+                    except connector_errors() as e:
+                        result = {
+                            "statement": stmt.label,
+                            "status": "failed",
+                            "error": str(e),
+                        }
+                        failed.add(stmt.label)
+                    results.append(result)
+                    print(_format_result(result), flush=True)
+
+        for conn in self._connections:
+            conn.close()
+        return results
+
+
+def _format_result(result) -> str:
+    seconds = result.get("seconds")
+    rows = result.get("row_count")
+    return (
+        f"{result['status']:>7}  {result['statement']:<32}"
+        f"{'' if seconds is None else f'{seconds:8.2f}s'}"
+        f"{'' if rows is None else f'  {rows:,} rows'}"
+        f"{'  ' + result['error'] if 'error' in result else ''}"
+    )
+
+
+def default_files(incremental: bool = False) -> list:
+    """All layer scripts in order, with either the full or incremental Gold layer."""
+    skip = FULL_GOLD if incremental else INCREMENTAL_GOLD
+    return [p for p in sorted(SQL_DIR.glob("*.sql")) if p.name != skip]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "files", nargs="*", help="SQL files (default: databricks/*.sql)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true", help="use the MERGE-based Gold layer"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="concurrent statements")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="print the DAG without running"
+    )
+    parser.add_argument(
+        "--report", default="pipeline_report.json", help="timings output path"
+    )
+    args = parser.parse_args(argv)
+
+    statements = parse_files(args.files or default_files(args.incremental))
+    problems = misordered(statements)
+    for problem in problems:
+        print(f"MISORDERED {problem}")
+    if problems:
+        return 1
+
+    if args.dry_run:
+        for depth, wave in enumerate(levels(statements)):
+            print(f"wave {depth}:")
+            for stmt in wave:
+                print(f"  {stmt.label:<32} -> {stmt.target}")
+        return 0
+
+    results = Runner(statements, workers=args.workers).run()
+    Path(args.report).write_text(json.dumps(results, indent=2, default=str))
+    print(f"Report written to {args.report}")
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
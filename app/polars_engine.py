@@ -0,0 +1,120 @@
+"""
+Polars compute engine (OLIST_ENGINE=polars)
+Same results as app.engine.PandasEngine, computed by one lazy Polars query
+plan per call on its thread pool. pandas semantics are kept explicitly:
+missing group keys are dropped and missing values are not counted as unique.
+"""
+
+import pandas as pd
+import polars as pl
+
+# fct_orders columns the aggregates read
+FACT_COLUMNS = [
+    "order_id",
+    "customer_id",
+    "product_category_name",
+    "freight_value",
+    "total_order_value",
+    "order_purchase_timestamp",
+]
+
+
+def _n_unique(column: str) -> pl.Expr:
+    """Distinct non-missing values, as pandas nunique() counts them."""
+    return pl.col(column).drop_nulls().n_unique().cast(pl.Int64)
+
+
+class PolarsEngine:
+    """Multi-threaded implementation on Polars."""
+
+    name = "polars"
+
+    def fact_aggregates(self, fct_orders, dim_customers) -> dict:
+        """Partial aggregates of a chunk of fct_orders (see app.aggregates)."""
+        ts = pl.col("order_purchase_timestamp")
+        orders = (
+            pl.from_pandas(fct_orders[FACT_COLUMNS])
+            .lazy()
+            .with_columns(month=ts.dt.strftime("%Y-%m"), day=ts.dt.strftime("%Y-%m-%d"))
+        )
+
+        def revenue_orders(keys):
+            return (
+                orders.drop_nulls(keys)
+                .group_by(keys)
+                .agg(
+                    revenue=pl.col("total_order_value").sum(),
+                    orders=_n_unique("order_id"),
+                )
+            )
+
+        def daily_totals(keys):
+            return (
+                orders.drop_nulls(keys)
+                .group_by(keys)
+                .agg(
+                    revenue=pl.col("total_order_value").sum(),
+                    freight=pl.col("freight_value").sum(),
+                    items=pl.len().cast(pl.Int64),
+                    orders=_n_unique("order_id"),
+                )
+            )
+
+        # De-duplicate before joining so multi-item orders don't fan out the join
+        buyers = (
+            orders.select("customer_id", "product_category_name")
+            .unique()
+            .join(
+                pl.from_pandas(dim_customers[["customer_id", "state"]]).lazy(),
+                on="customer_id",
+                nulls_equal=True,  # As pandas merge matches missing keys
+            )
+        )
+
+        def buyer_counts(keys):
+            return (
+                buyers.drop_nulls(keys)
+                .group_by(keys)
+                .agg(customers=_n_unique("customer_id"))
+            )
+
+        # Earliest purchase per person in this chunk, for the new customers
+        first_purchases = (
+            orders.join(
+                pl.from_pandas(
+                    dim_customers[["customer_id", "customer_unique_id"]]
+                ).lazy(),
+                on="customer_id",
+                nulls_equal=True,
+            )
+            .drop_nulls("customer_unique_id")
+            .group_by("customer_unique_id")
+            .agg(first_purchase=ts.min())
+        )
+
+        plans = {
+            "totals": orders.select(
+                total_revenue=pl.col("total_order_value").sum(),
+                total_orders=_n_unique("order_id"),
+                total_items=pl.len().cast(pl.Int64),
+                first_purchase=ts.min(),
+                last_purchase=ts.max(),
+            ),
+            "monthly": revenue_orders(["month"]),
+            "monthly_category": revenue_orders(["month", "product_category_name"]),
+            "daily": daily_totals(["day"]),
+            "daily_category": daily_totals(["day", "product_category_name"]),
+            "first_purchases": first_purchases,
+            "category": revenue_orders(["product_category_name"]),
+            "state_buyers": buyer_counts(["state"]),
+            "category_state_buyers": buyer_counts(["product_category_name", "state"]),
+        }
+        # One optimized plan: the shared scan and de-duplication run once
+        frames = pl.collect_all(list(plans.values()))
+        return {name: frame.to_pandas() for name, frame in zip(plans, frames)}
+
+    def order_months(self, fct_orders) -> pd.Series:
+        """Purchase month (YYYY-MM) of every order item."""
+        ts = fct_orders["order_purchase_timestamp"]
+        months = pl.from_pandas(ts).dt.replace_time_zone(None).dt.strftime("%Y-%m")
+        return pd.Series(months.to_pandas().array, index=ts.index, name=ts.name)
@@ -0,0 +1,333 @@
+"""
+Opt-in per-rerun profiling for the Olist Analytics Dashboard
+Enabled by OLIST_PROFILE=1 or a ?profile query parameter. Tab renders, chart
+builds, cache lookups and warehouse queries are timed with timed()/profiled()
+and shown in a breakdown panel at the bottom of the page. The heavier modes
+write files or slow the whole process, so only the OLIST_PROFILE setting,
+never a URL, turns them on. With OLIST_PROFILE=cprofile the whole rerun also
+runs under cProfile and is dumped to OLIST_PROFILE_DIR (default profiles/ in
+the repo), keeping the newest KEEP_PROFILES dumps, for snakeviz, flameprof,
+py-spy ... With =memory, each block's peak allocation is traced too, and a
+memory panel reports tables, cache entries and RSS (app.memory). cProfile and
+tracemalloc are process-wide, so one session at a time uses each; a
+concurrent rerun in the same mode gets the timings (and memory panel)
+without them.
+"""
+
+import functools
+import io
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from app import memory
+from app.config import get_setting
+
+# cProfile dumps kept in the profile directory; older ones are removed
+KEEP_PROFILES = 20
+
+# The rerun being profiled on this script thread, if any
+_local = threading.local()
+
+
+class _Exclusive:
+    """A process-wide profiler that one script thread at a time may use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner = None  # (thread, callback that gives the profiler up)
+
+    def claim(self, release) -> bool:
+        """Take the profiler for this thread, False if another one holds it.
+
+        A holder whose thread has ended, or this thread's own earlier rerun,
+        stopped before finish(), so its release() runs first.
+        """
+        with self._lock:
+            if self._owner is not None:
+                thread, stale_release = self._owner
+                if thread.is_alive() and thread is not threading.current_thread():
+                    return False
+                stale_release()
+            self._owner = (threading.current_thread(), release)
+            return True
+
+    def release(self):
+        """Give the profiler up, if this thread holds it."""
+        with self._lock:
+            if self._owner is None or self._owner[0] is not threading.current_thread():
+                return
+            _, release = self._owner
+            self._owner = None
+        release()
+
+
+# tracemalloc.reset_peak() in timed() would corrupt another session's peaks
+_tracing = _Exclusive()
+# A second cProfile.enable() raises while one is active (Python 3.12+)
+_profiling = _Exclusive()
+# Numbers the dumps of this process, which can finish several per second
+_dump_numbers = itertools.count(1)
+
+
+class _Rerun:
+    """Timings (and optionally a cProfile or memory trace) of one script run."""
+
+    def __init__(self, mode: str):
+        self.records = []
+        self.stack = []
+        self.start = time.perf_counter()
+
+        self.memory = mode == "memory"
+        self.started_tracing = False
+        self.trace = self.memory and _tracing.claim(self._stop_tracing)
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.snapshot = tracemalloc.take_snapshot() if self.trace else None
+
+        self.profile = None
+        self.profile_busy = False
+        if mode == "cprofile":
+            import cProfile  # Only imported when cProfile mode is on
+
+            profile = cProfile.Profile()
+            if _profiling.claim(profile.disable):
+                try:
+                    profile.enable()
+                    self.profile = profile
+                except ValueError:  # Another profiler (a debugger...) is active
+                    _profiling.release()
+            self.profile_busy = self.profile is None
+
+    def _stop_tracing(self):
+        if self.started_tracing:
+            tracemalloc.stop()
+
+
+def _mode():
+    """None (off), 'timings', 'cprofile' or 'memory'.
+
+    ?profile (any value) only turns on timings: anyone can add it to the URL.
+    """
+    mode = get_setting("OLIST_PROFILE").lower()
+    if mode in ("", "0", "false", "off"):
+        return "timings" if "profile" in st.query_params else None
+    return mode if mode in ("cprofile", "memory") else "timings"
+
+
+def profile_dir() -> Path:
+    """Directory of the cProfile dumps, independent of the working directory."""
+    setting = get_setting("OLIST_PROFILE_DIR")
+    return (
+        Path(setting)
+        if setting
+        else Path(__file__).resolve().parent.parent / "profiles"
+    )
+
+
+def _prune_dumps(root: Path):
+    """Remove all but the newest KEEP_PROFILES dumps in root."""
+    dumps = sorted(
+        root.glob("rerun-*.prof"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for old in dumps[KEEP_PROFILES:]:
+        old.unlink(missing_ok=True)
+
+
+def start():
+    """Start profiling this rerun if enabled; call right after set_page_config."""
+    mode = _mode()
+    _local.rerun = _Rerun(mode) if mode else None
+
+
+@contextmanager
+def timed(kind: str, name: str):
+    """Record how long the block takes under (kind, name) when profiling."""
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        yield
+        return
+
+    record = {"kind": kind, "name": name, "depth": len(rerun.stack), "peak": 0}
+    if rerun.trace:
+        # reset_peak() below would lose the enclosing block's peak so far
+        current, peak = tracemalloc.get_traced_memory()
+        if rerun.stack:
+            parent = rerun.stack[-1]
+            parent["peak"] = max(parent["peak"], peak)
+        tracemalloc.reset_peak()
+        record["traced"] = current
+    rerun.records.append(record)
+    rerun.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = (time.perf_counter() - start) * 1000
+        rerun.stack.pop()
+        if rerun.trace:
+            peak = max(record["peak"], tracemalloc.get_traced_memory()[1])
+            record["peak_mb"] = (peak - record["traced"]) / memory.MB
+            if rerun.stack:
+                parent = rerun.stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+
+
+def profiled(kind: str):
+    """Decorator form of timed(), named after the function."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(kind, func.__name__):
+                return func(*args, **kwargs)
+
+        if hasattr(func, "clear"):  # Keep st.cache_* clear() reachable
+            wrapper.clear = func.clear
+        return wrapper
+
+    return decorate
+
+
+def finish(tables=None):
+    """Stop profiling and render the breakdown panel for this rerun.
+
+    tables maps names to the DataFrames this rerun holds, for the memory panel.
+    """
+    rerun = getattr(_local, "rerun", None)
+    _local.rerun = None
+    if rerun is None:
+        return
+    total_ms = (time.perf_counter() - rerun.start) * 1000
+
+    dump = None
+    if rerun.profile:
+        _profiling.release()  # Disables the profile
+        root = profile_dir()
+        root.mkdir(parents=True, exist_ok=True)
+        dump = root / (
+            f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            f"-{next(_dump_numbers)}.prof"
+        )
+        rerun.profile.dump_stats(dump)
+        _prune_dumps(root)
+
+    columns = ["kind", "name", "depth", "ms"] + (["peak_mb"] if rerun.trace else [])
+    breakdown = pd.DataFrame(rerun.records, columns=columns)
+    breakdown["name"] = [
+        " " * depth + name for depth, name in zip(breakdown["depth"], breakdown["name"])
+    ]
+    breakdown["% of rerun"] = breakdown["ms"] / total_ms * 100
+
+    with st.expander(f"⏱️ Rerun profile: {total_ms:,.0f} ms", expanded=True):
+        by_kind = breakdown.groupby("kind")["ms"].sum()
+        st.caption(" • ".join(f"{kind}: {ms:,.0f} ms" for kind, ms in by_kind.items()))
+        st.dataframe(
+            breakdown.drop(columns="depth").round(1),
+            width="stretch",
+            hide_index=True,
+        )
+        if rerun.profile_busy:
+            st.caption("cProfile unavailable: another session is being profiled")
+        if dump:
+            import pstats
+
+            out = io.StringIO()
+            pstats.Stats(str(dump), stream=out).sort_stats("cumulative").print_stats(20)
+            st.caption(f"cProfile dump: {dump}")
+            st.code(out.getvalue(), language=None)
+            st.download_button(
+                "📥 Download .prof",
+                dump.read_bytes(),
+                dump.name,
+                "application/octet-stream",
+            )
+
+    if rerun.memory:
+        allocations = memory.top_allocations(rerun.snapshot) if rerun.trace else None
+        if rerun.trace:
+            _tracing.release()
+        _memory_panel(tables or {}, allocations)
+
+
+def _mb(nbytes) -> str:
+    """Bytes as whole MB, or "unavailable" for None."""
+    return "unavailable" if nbytes is None else f"{nbytes / memory.MB:,.0f} MB"
+
+
+def _memory_panel(tables: dict, allocations):
+    """Tables, cache entries, RSS and retained allocations, plus a metrics export."""
+    tables_mem = memory.table_memory(tables)
+    caches_mem = memory.cache_memory()
+    samples = memory.metrics(tables_mem, caches_mem)
+    prometheus = memory.to_prometheus(samples)
+
+    metrics_file = get_setting("OLIST_METRICS_FILE")
+    if metrics_file:  # e.g. for node_exporter's textfile collector
+        Path(metrics_file).write_text(prometheus)
+
+    rss = _mb(memory.rss_bytes())
+    with st.expander(f"🧠 Memory: {rss} RSS", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("RSS", rss)
+        col2.metric("Peak RSS", _mb(memory.peak_rss_bytes()))
+        col3.metric("Tables", f"{tables_mem['bytes'].sum() / memory.MB:,.1f} MB")
+        unavailable = caches_mem.attrs["unavailable"]
+        col4.metric(
+            "Caches",
+            "unavailable"
+            if unavailable
+            else f"{caches_mem['bytes'].sum() / memory.MB:,.1f} MB",
+        )
+
+        st.caption("Tables held by this rerun")
+        per_table = tables_mem.groupby("table", sort=False).agg(
+            rows=("rows", "first"), mb=("bytes", "sum")
+        )
+        st.dataframe((per_table.assign(mb=per_table["mb"] / memory.MB)).round(2))
+        st.dataframe(
+            tables_mem.assign(mb=tables_mem["bytes"] / memory.MB)
+            .drop(columns="bytes")
+            .sort_values("mb", ascending=False)
+            .round(2),
+            width="stretch",
+            hide_index=True,
+        )
+
+        st.caption(
+            "Cache entries (cache_data: pickled size; cache_resource: deep size)"
+        )
+        if unavailable:
+            st.caption(
+                f"{', '.join(unavailable)} sizes unavailable in this Streamlit version"
+            )
+        st.dataframe(
+            caches_mem.assign(mb=caches_mem["bytes"] / memory.MB)
+            .drop(columns="bytes")
+            .round(2),
+            width="stretch",
+            hide_index=True,
+        )
+
+        st.caption("Largest allocations still held after this rerun")
+        if allocations is None:
+            st.caption("unavailable: another session is tracing memory")
+        else:
+            st.dataframe(
+                allocations.assign(mb=allocations["bytes"] / memory.MB)
+                .drop(columns="bytes")
+                .round(2),
+                width="stretch",
+                hide_index=True,
+            )
+        st.download_button(
+            "📥 Download metrics", prometheus, "olist_memory.prom", "text/plain"
+        )
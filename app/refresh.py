@@ -0,0 +1,137 @@
+"""
+Stale-while-revalidate refresh of the Gold data
+A daemon thread checks the source table versions every OLIST_REFRESH_SECONDS
+(default 300, 0 to turn it off). When they change it loads the new tables
+and builds the derived structures off the request path, then switches the
+served version in one assignment. Until then reruns keep getting the old
+version, and each rerun stays on the version it started with.
+"""
+
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from app import lineage, summary
+from app.aggregates import get_aggregates
+from app.cohorts import get_cohorts
+from app.config import get_setting
+from app.database import (
+    dashboard_mode,
+    load_aggregates,
+    load_data,
+    load_dimensions,
+    source_version,
+)
+from app.drilldown import get_customer_orders
+from app.engine import get_order_months
+from app.search import get_search_index
+from app.sketches import distinct_mode, get_sketches
+from app.timeindex import get_daily_index
+
+logger = logging.getLogger(__name__)
+
+# The version pinned by the rerun on this script thread, if any
+_local = threading.local()
+
+
+def warm(data_version):
+    """Build everything a rerun of data_version reads from the caches."""
+    mode = dashboard_mode()
+    approximate = distinct_mode() == "approximate"
+    if mode == "aggregates":
+        aggs = load_aggregates(data_version)  # Row-level tables still load on demand
+    elif mode == "out_of_core":
+        from app.outofcore import (
+            fact_dataset_path,
+            get_dataset_aggregates,
+            get_dataset_cohorts,
+            get_dataset_sketches,
+            get_fact_dataset,
+        )
+
+        dim_customers, dim_products, dim_sellers = load_dimensions(data_version)
+        facts = get_fact_dataset(fact_dataset_path(), data_version)
+        aggs = get_dataset_aggregates(data_version, facts, dim_customers, dim_sellers)
+        get_search_index(data_version, None, dim_customers, dim_products)
+        get_dataset_cohorts(data_version, facts, dim_customers)
+        if approximate:
+            get_dataset_sketches(data_version, facts, dim_customers)
+    else:
+        fct_orders, dim_customers, dim_products, dim_sellers = load_data(data_version)
+        aggs = get_aggregates(data_version, fct_orders, dim_customers, dim_sellers)
+        get_order_months(data_version, fct_orders)
+        get_customer_orders(data_version, fct_orders, dim_customers)
+        get_search_index(data_version, fct_orders, dim_customers, dim_products)
+        get_cohorts(data_version, fct_orders, dim_customers)
+        if approximate:
+            get_sketches(data_version, fct_orders, dim_customers)
+    get_daily_index(data_version, aggs)
+    summary.publish(data_version, aggs)
+
+
+class Refresher:
+    """Serves one data version and revalidates it in the background."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.version = source_version()  # Loaded by the first rerun, as before
+        self.checked_at = time.time()
+        self.refreshed_at = None
+        self.rebuilt = []
+        self.error = None
+        if interval > 0:
+            threading.Thread(
+                target=self._run, name="olist-refresh", daemon=True
+            ).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+    def check(self):
+        """Load and warm a new source version, then serve it."""
+        try:
+            version = source_version()
+            if version != self.version:
+                # Only these are rebuilt; everything else is a cache hit
+                self.rebuilt = lineage.invalidated(self.version, version)
+                start = time.perf_counter()
+                warm(version)
+                self.version = version
+                self.refreshed_at = time.time()
+                logger.info(
+                    "Serving data version %s (rebuilt %s in %.1fs)",
+                    version,
+                    ", ".join(self.rebuilt),
+                    time.perf_counter() - start,
+                )
+            self.error = None
+        except Exception as e:  # Keep serving the old version; retry next interval
+            logger.exception("Data refresh failed")
+            self.error = repr(e)
+        self.checked_at = time.time()
+
+
+def refresh_interval() -> float:
+    """Seconds between version checks; 0 serves the first version forever."""
+    return float(get_setting("OLIST_REFRESH_SECONDS", "300"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_refresher():
+    """The process's one Refresher, started by the first rerun."""
+    return Refresher(refresh_interval())
+
+
+def pin():
+    """Serve this rerun from the current version; call at the top of the script."""
+    _local.version = get_refresher().version
+
+
+def get_data_version():
+    """Version token of the Gold data this rerun is served, used to key caches."""
+    version = getattr(_local, "version", None)
+    return version if version is not None else get_refresher().version
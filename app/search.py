@@ -0,0 +1,99 @@
+"""
+Prefix search indexes over order, customer, product, city and category keys
+"""
+
+import numpy as np
+import streamlit as st
+
+from app import lineage
+from app.profiling import profiled
+
+# Search field -> (table, column) it is looked up in
+SEARCH_FIELDS = {
+    "Order ID": ("fct_orders", "order_id"),
+    "Customer ID": ("dim_customers", "customer_unique_id"),
+    "Product ID": ("dim_products", "product_id"),
+    "City": ("dim_customers", "city"),
+    "Category": ("dim_products", "product_category_name"),
+}
+
+_EMPTY = np.array([], dtype=np.int64)
+
+
+class PrefixIndex:
+    """Sorted array of lowercased keys with the row positions they came from."""
+
+    def __init__(self, values):
+        valid = values.notna().to_numpy()
+        keys = values[valid].astype(str).str.lower().to_numpy(dtype=str)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = np.flatnonzero(valid)[order]
+
+    def lookup(self, prefix: str) -> np.ndarray:
+        """Row positions whose key starts with prefix, in key order."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return _EMPTY
+        lo = np.searchsorted(self.keys, prefix, side="left")
+        hi = np.searchsorted(self.keys, prefix + "\U0010ffff", side="left")
+        return self.positions[lo:hi]
+
+
+def table_indexes(table: str, df) -> dict:
+    """Field -> PrefixIndex for every search field looked up in one table."""
+    return {
+        field: PrefixIndex(df[column])
+        for field, (field_table, column) in SEARCH_FIELDS.items()
+        if field_table == table
+    }
+
+
+class SearchIndex:
+    """One PrefixIndex per search field, plus the tables they point into."""
+
+    def __init__(self, fct_orders, dim_customers, dim_products, indexes=None):
+        self.tables = {
+            "fct_orders": fct_orders,
+            "dim_customers": dim_customers,
+            "dim_products": dim_products,
+        }
+        if indexes is None:
+            indexes = {}
+            for table, df in self.tables.items():
+                # fct_orders is None when it lives out of core (app.outofcore)
+                if df is not None:
+                    indexes.update(table_indexes(table, df))
+        self.indexes = indexes
+
+    def search(self, field: str, prefix: str, limit: int = 100):
+        """Return (match count, first `limit` matching rows in key order)."""
+        table, _ = SEARCH_FIELDS[field]
+        positions = self.indexes[field].lookup(prefix)
+        return len(positions), self.tables[table].iloc[positions[:limit]]
+
+
+@profiled("cache")
+# Two versions of each of the three searched tables
+@st.cache_resource(max_entries=6, show_spinner=False)
+def _table_indexes(versions, table, _df):
+    """Helper to cache table_indexes() per version of the table."""
+    return table_indexes(table, _df)
+
+
+def get_search_index(data_version, fct_orders, dim_customers, dim_products):
+    """Search index whose per-table parts are built once per version of that table."""
+    tables = {
+        "fct_orders": fct_orders,
+        "dim_customers": dim_customers,
+        "dim_products": dim_products,
+    }
+    indexes = {}
+    for table, df in tables.items():
+        if df is not None:
+            indexes.update(
+                _table_indexes(
+                    lineage.key(data_version, f"search_index:{table}"), table, df
+                )
+            )
+    return SearchIndex(fct_orders, dim_customers, dim_products, indexes)
@@ -0,0 +1,228 @@
+"""
+Distinct-count sketches of orders and customers per dashboard cell
+DistinctSketches keeps, for every month x category x customer state cell,
+the cell's exact revenue and a sparse HyperLogLog++ sketch (Heule et al.,
+2013) of its order_ids and customer_ids. Sketches merge by taking the
+register-wise maximum, so rollup() estimates the distinct counts of any
+combination of cells without touching fct_orders: almost exactly up to
+SPARSE_LIMIT distinct values, and beyond it with a relative standard error
+of ERROR. With OLIST_DISTINCT_COUNTS=approximate the Analytics tab uses them
+for roll-ups the exact aggregates do not cover; otherwise ("exact", the
+default) they are not built.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.config import get_setting
+from app.profiling import profiled
+
+DISTINCT_MODES = ("exact", "approximate")
+
+# Dense registers of a merged sketch; their estimates have standard error ERROR
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+ERROR = 1.04 / math.sqrt(REGISTERS)
+# Cells keep sparse entries at this precision instead (as in HyperLogLog++),
+# which count up to SPARSE_LIMIT distinct values almost exactly
+SPARSE_PRECISION = 25
+SPARSE_LIMIT = 6 * REGISTERS
+
+DIMENSIONS = ["month", "product_category_name", "state"]
+# Sketch name -> fct_orders column whose distinct values it counts
+SKETCHED = {"orders": "order_id", "customers": "customer_id"}
+
+
+def distinct_mode() -> str:
+    """'exact' or 'approximate', from OLIST_DISTINCT_COUNTS."""
+    mode = get_setting("OLIST_DISTINCT_COUNTS", "exact").lower()
+    if mode not in DISTINCT_MODES:
+        raise ValueError(
+            f"Unknown OLIST_DISTINCT_COUNTS {mode!r}; expected one of {DISTINCT_MODES}"
+        )
+    return mode
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # frexp's exponent of a positive integer is its bit length (0 for 0)
+    return np.frexp(values.astype(np.float64))[1]
+
+
+def hash_entries(values: pd.Series):
+    """(sparse index, rank) of every value's 64-bit hash."""
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    rest_bits = 64 - SPARSE_PRECISION
+    index = (hashes >> np.uint64(rest_bits)).astype(np.uint32)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    rank = (rest_bits + 1 - _bit_length(rest)).astype(np.uint8)
+    return index, rank
+
+
+def _dense_registers(index: np.ndarray, rank: np.ndarray):
+    """(register slot, rank) at PRECISION of sparse entries."""
+    extra_bits = SPARSE_PRECISION - PRECISION
+    slot = (index >> extra_bits).astype(np.int64)
+    extra = index & ((1 << extra_bits) - 1)
+    # The rank counts from the end of the slot bits, through the extra ones
+    dense_rank = np.where(
+        extra > 0, extra_bits + 1 - _bit_length(extra), extra_bits + rank
+    )
+    return slot, dense_rank.astype(np.uint8)
+
+
+def _hyperloglog(dense: np.ndarray) -> np.ndarray:
+    """Cardinality estimate of each row of dense (n, REGISTERS) registers."""
+    m = REGISTERS
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.exp2(-dense.astype(np.float64)).sum(axis=1)
+    zeros = (dense == 0).sum(axis=1)
+    # Linear counting is the more accurate estimate for small cardinalities
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+def estimate(groups: np.ndarray, index: np.ndarray, rank: np.ndarray, n_groups: int):
+    """Distinct values per group of the sparse entries (group, index, rank)."""
+    keys = np.sort((groups.astype(np.int64) << SPARSE_PRECISION) | index)
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+    entries = np.bincount(keys >> SPARSE_PRECISION, minlength=n_groups)
+    # Linear counting over the 2^SPARSE_PRECISION sparse slots
+    m = 1 << SPARSE_PRECISION
+    result = m * np.log(m / (m - entries))
+
+    large = np.flatnonzero(entries > SPARSE_LIMIT)
+    if len(large):
+        row = np.full(n_groups, -1)
+        row[large] = np.arange(len(large))
+        keep = row[groups] >= 0
+        slot, dense_rank = _dense_registers(index[keep], rank[keep])
+        dense = np.zeros((len(large), REGISTERS), dtype=np.uint8)
+        np.maximum.at(dense, (row[groups[keep]], slot), dense_rank)
+        result[large] = _hyperloglog(dense)
+    return np.rint(result).astype(np.int64)
+
+
+def _sparse(cell_ids, index, rank) -> pd.DataFrame:
+    """Highest rank per (cell, index): the sparse entries of every cell, by cell."""
+    return (
+        pd.DataFrame({"cell": cell_ids, "index": index, "rank": rank})
+        .groupby(["cell", "index"], as_index=False, sort=True)["rank"]
+        .max()
+    )
+
+
+class DistinctSketches:
+    """Exact revenue and distinct-count sketches per month x category x state.
+
+    cells has one row per cell (DIMENSIONS and revenue), its position being
+    the cell id; sketches[name] holds the sparse entries of every cell as
+    (cell, index, rank) rows sorted by cell, those of cell i being rows
+    offsets[name][i]:offsets[name][i + 1].
+    """
+
+    def __init__(self, cells: pd.DataFrame, sketches: dict):
+        self.cells = cells
+        self.sketches = sketches
+        self.offsets = {
+            name: np.searchsorted(sparse["cell"].to_numpy(), np.arange(len(cells) + 1))
+            for name, sparse in sketches.items()
+        }
+
+    @classmethod
+    def build(cls, fct_orders, dim_customers):
+        """Sketch fct_orders items, placed by purchase month and customer state."""
+        rows = fct_orders[
+            [*SKETCHED.values(), "product_category_name", "total_order_value"]
+        ].assign(
+            # Periods, not strings: formatting every row would dominate the build
+            month=fct_orders["order_purchase_timestamp"]
+            .dt.tz_localize(None)
+            .dt.to_period("M"),
+            state=fct_orders["customer_id"].map(
+                dim_customers.set_index("customer_id")["state"]
+            ),
+        )
+        groups = rows.groupby(DIMENSIONS, dropna=False, sort=True)
+        cells = groups["total_order_value"].sum().rename("revenue").reset_index()
+        cells["month"] = cells["month"].astype(str)
+        cell_ids = groups.ngroup().to_numpy()
+        sketches = {
+            name: _sparse(cell_ids, *hash_entries(rows[column]))
+            for name, column in SKETCHED.items()
+        }
+        return cls(cells, sketches)
+
+    @classmethod
+    def merge(cls, parts):
+        """One set of sketches covering all of parts (e.g. one per month)."""
+        parts = list(parts)
+        all_cells = pd.concat([part.cells for part in parts], ignore_index=True)
+        groups = all_cells.groupby(DIMENSIONS, dropna=False, sort=True)
+        cells = groups["revenue"].sum().reset_index()
+        new_ids = groups.ngroup().to_numpy()
+
+        sketches = {}
+        offsets = np.cumsum([0] + [len(part.cells) for part in parts])
+        for name in SKETCHED:
+            stacked = pd.concat(
+                [
+                    part.sketches[name].assign(
+                        cell=new_ids[offset + part.sketches[name]["cell"].to_numpy()]
+                    )
+                    for part, offset in zip(parts, offsets)
+                ]
+            )
+            sketches[name] = _sparse(stacked["cell"], stacked["index"], stacked["rank"])
+        return cls(cells, sketches)
+
+    def rollup(self, by=(), **filters) -> pd.DataFrame:
+        """Revenue and estimated distinct orders/customers per `by` group of
+        the cells matching filters (dimension=value)."""
+        by = list(by)
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dimension, value in filters.items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension {dimension!r}")
+            mask &= (self.cells[dimension] == value).to_numpy(
+                dtype=bool, na_value=False
+            )
+        selected = self.cells[mask]
+
+        if by:
+            groups = selected.groupby(by, dropna=False, sort=True)
+            result = groups["revenue"].sum().reset_index()
+            group_ids = groups.ngroup().to_numpy()
+        else:
+            result = pd.DataFrame({"revenue": [selected["revenue"].sum()]})
+            group_ids = np.zeros(len(selected), dtype=np.int64)
+
+        cell_ids = selected.index.to_numpy()
+        for name, sparse in self.sketches.items():
+            # Gather the entries of the selected cells only
+            starts = self.offsets[name][cell_ids]
+            lengths = self.offsets[name][cell_ids + 1] - starts
+            rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            rows += np.arange(len(rows))
+            result[name] = estimate(
+                np.repeat(group_ids, lengths),
+                sparse["index"].to_numpy()[rows],
+                sparse["rank"].to_numpy()[rows],
+                len(result),
+            )
+        return result
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _sketches(versions, _fct_orders, _dim_customers):
+    """Helper to cache the sketches per version of their tables."""
+    return DistinctSketches.build(_fct_orders, _dim_customers)
+
+
+def get_sketches(data_version, fct_orders, dim_customers):
+    """Build the distinct-count sketches once per version of their tables."""
+    return _sketches(lineage.key(data_version, "sketches"), fct_orders, dim_customers)
@@ -0,0 +1,133 @@
+"""
+Memory-mapped Arrow snapshot of the Gold tables
+The first process to load a data version writes each table to an uncompressed
+Arrow IPC (Feather v2) file; every process then memory-maps those files
+read-only and wraps the buffers in Arrow-backed frames without copying, so
+all replicas on a host share one physical copy through the page cache.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from app.config import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Snapshot versions kept per set of tables; older ones go when a new one lands
+KEEP_VERSIONS = 2
+
+# Default roots already reported as unsafe, to log each one once
+_unsafe = set()
+
+
+def _default_dir():
+    """<tmp>/olist_snapshot-<uid>, private to this user, or None if it is not.
+
+    The name is predictable, so another user could create it first and
+    plant or swap snapshots: it must be a real directory owned by this user
+    that nobody else can write to, else snapshots are off.
+    """
+    root = Path(tempfile.gettempdir()) / f"olist_snapshot-{os.getuid()}"
+    try:
+        root.mkdir(mode=0o700, exist_ok=True)
+        info = root.lstat()
+    except OSError:
+        info = None
+    if (
+        info is not None
+        and stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    ):
+        return root
+    if root not in _unsafe:
+        _unsafe.add(root)
+        logger.warning(
+            "Snapshots disabled: %s is not a directory private to this user; "
+            "set OLIST_SNAPSHOT_DIR to use another directory",
+            root,
+        )
+    return None
+
+
+def snapshot_dir():
+    """Root directory of the snapshots, or None when OLIST_SNAPSHOT_DIR=off.
+
+    An explicit OLIST_SNAPSHOT_DIR can be shared by replicas running as
+    different users; the default is per user (_default_dir()).
+    """
+    setting = get_setting("OLIST_SNAPSHOT_DIR")
+    if setting.lower() == "off":
+        return None
+    return Path(setting) if setting else _default_dir()
+
+
+def _version_dir(root: Path, data_version: str, names) -> Path:
+    digest = hashlib.sha1(data_version.encode()).hexdigest()[:16]
+    return root / "-".join(names) / digest
+
+
+def write(tables: dict, path: Path):
+    """Write each frame to <path>/<name>.arrow, published atomically as a directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    staging.chmod(0o755)  # mkdtemp is owner-only; replicas may run as other users
+    try:
+        for name, df in tables.items():
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with (
+                pa.OSFile(str(staging / f"{name}.arrow"), "wb") as sink,
+                pa.ipc.new_file(sink, table.schema) as writer,
+            ):
+                writer.write_table(table)
+        os.rename(staging, path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not path.exists():  # Lost a race to another process otherwise
+            raise
+
+
+def read(path: Path, names) -> list:
+    """Memory-map <path>/<name>.arrow files into Arrow-backed DataFrames."""
+    frames = []
+    for name in names:
+        source = pa.memory_map(str(path / f"{name}.arrow"), "r")
+        table = pa.ipc.open_file(source).read_all()
+        frames.append(
+            table.to_pandas(
+                split_blocks=True,  # Numeric columns stay views of the map
+                types_mapper={
+                    pa.string(): pd.StringDtype("pyarrow"),
+                    pa.large_string(): pd.StringDtype("pyarrow"),
+                }.get,
+            )
+        )
+    return frames
+
+
+def _prune(root: Path):
+    """Remove all but the newest KEEP_VERSIONS snapshots in root (mapped files stay valid)."""
+    versions = sorted(
+        (p for p in root.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in versions[KEEP_VERSIONS:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def load(data_version: str, names, fetch) -> list:
+    """Frames for names from the snapshot of data_version, writing it with fetch() first if missing."""
+    path = _version_dir(snapshot_dir(), data_version, names)
+    if not path.exists():
+        write(dict(zip(names, fetch())), path)
+        _prune(path.parent)
+    return read(path, names)
@@ -0,0 +1,150 @@
+"""
+Precomputed Home tab summary for a fast first paint
+build() reduces the dashboard aggregates to what the Home tab shows (KPIs,
+insights, the monthly series and the top-5 lists) as a few KB of JSON.
+publish() writes it once per data version to <snapshot dir>/summary, on
+warm-up, on a data refresh or with `python -m app.summary` after a pipeline
+run, so a rerun renders Home from load() before it touches the Gold tables.
+
+Usage:
+    python -m app.summary
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from app import lineage, snapshot
+
+TOP_N = 5
+# Bumped when build() changes shape, so summaries written before are not read
+FORMAT = 2
+
+# Summaries this process has published or read, oldest first; sessions and
+# the refresh thread update it concurrently, under _published_lock
+_published = {}
+_published_lock = threading.Lock()
+
+
+def build(aggs: dict) -> dict:
+    """JSON-ready summary of the Home tab's numbers from the aggregates."""
+    kpis = aggs["kpis"].iloc[0]
+    categories = aggs["category"].sort_values("revenue", ascending=False, kind="stable")
+    states = aggs["state_customers"].sort_values(
+        "customers", ascending=False, kind="stable"
+    )
+    tiers = aggs["seller_tiers"]
+    return {
+        "kpis": {
+            "total_revenue": float(kpis["total_revenue"]),
+            "total_orders": int(kpis["total_orders"]),
+            "total_customers": int(kpis["total_customers"]),
+            "avg_rating": float(kpis["avg_rating"]),
+            "total_sellers": int(kpis["total_sellers"]),
+            "first_purchase": pd.Timestamp(kpis["first_purchase"]).isoformat(),
+            "last_purchase": pd.Timestamp(kpis["last_purchase"]).isoformat(),
+        },
+        "platinum_sellers": int(
+            tiers.loc[tiers["seller_tier"] == "Platinum", "sellers"].sum()
+        ),
+        # Column lists rather than records keep the JSON small
+        "monthly": {
+            "month": aggs["monthly"]["month"].astype(str).tolist(),
+            "revenue": aggs["monthly"]["revenue"].astype(float).tolist(),
+        },
+        "top_categories": {
+            "product_category_name": categories["product_category_name"]
+            .head(TOP_N)
+            .astype(str)
+            .tolist(),
+            "revenue": categories["revenue"].head(TOP_N).astype(float).tolist(),
+        },
+        "top_states": {
+            "state": states["state"].head(TOP_N).astype(str).tolist(),
+            "customers": states["customers"].head(TOP_N).astype(int).tolist(),
+        },
+    }
+
+
+def summary_path(data_version: str):
+    """File of data_version's summary, or None when OLIST_SNAPSHOT_DIR=off."""
+    root = snapshot.snapshot_dir()
+    if root is None:
+        return None
+    key = f"{lineage.key(data_version, 'summary')}#{FORMAT}"
+    return root / "summary" / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.json"
+
+
+def _remember(key: str, summary: dict):
+    with _published_lock:
+        _published[key] = summary
+        while len(_published) > snapshot.KEEP_VERSIONS:
+            del _published[next(iter(_published))]
+
+
+def publish(data_version: str, aggs: dict) -> dict:
+    """Build the summary of data_version and store it for load()."""
+    summary = build(aggs)
+    _remember(lineage.key(data_version, "summary"), summary)
+    path = summary_path(data_version)
+    if path is not None and not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written aside and renamed so readers never see a partial file
+        fd, staging = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+        with os.fdopen(fd, "w") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        os.chmod(staging, 0o644)
+        os.replace(staging, path)
+        _prune(path.parent)
+    return summary
+
+
+def _prune(root: Path):
+    """Remove all but the newest KEEP_VERSIONS summaries in root."""
+    files = sorted(
+        root.glob("[!.]*.json"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for old in files[snapshot.KEEP_VERSIONS :]:
+        old.unlink(missing_ok=True)
+
+
+def load(data_version: str):
+    """The published summary of data_version, or None if it is not built yet."""
+    key = lineage.key(data_version, "summary")
+    with _published_lock:
+        summary = _published.get(key)
+    if summary is not None:
+        return summary
+    path = summary_path(data_version)
+    if path is None or not path.exists():
+        return None
+    summary = json.loads(path.read_text())
+    _remember(key, summary)
+    return summary
+
+
+def main(argv=None):
+    # app.refresh imports this module
+    from app.database import source_version
+    from app.refresh import warm
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args(argv)
+
+    # warm() publishes the summary along with the other caches
+    data_version = source_version()
+    warm(data_version)
+    path = summary_path(data_version)
+    print(
+        f"Summary of {data_version} written to {path}" if path else "Snapshots are off"
+    )
+
+
+if __name__ == "__main__":
+    main()
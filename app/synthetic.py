@@ -0,0 +1,382 @@
+"""
+Synthetic Olist data generator
+Produces fct_orders, dim_customers, dim_products and dim_sellers with the
+Gold schema, Olist-like category/state skew and 32-char hex IDs, at any
+scale factor (1x ~ 112K order items). Fully vectorized with NumPy/Arrow.
+The command line also writes the agg_* tables, so the output directory
+serves OLIST_DASHBOARD_MODE=aggregates as well.
+
+Usage:
+    python -m app.synthetic --scale 10 --out data/synthetic
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Row counts of the Kaggle dataset (scale factor 1)
+BASE_ORDERS = 99_441
+BASE_PRODUCTS = 32_951
+BASE_SELLERS = 3_095
+REPEAT_CUSTOMER_SHARE = 0.034
+
+START_DATE = np.datetime64("2016-09-04")
+END_DATE = np.datetime64("2018-09-03")
+BLACK_FRIDAY = np.datetime64("2017-11-24")
+
+# Item-level category shares (English names, as in the silver layer)
+CATEGORY_SHARES = {
+    "bed_bath_table": 0.100,
+    "health_beauty": 0.086,
+    "sports_leisure": 0.077,
+    "furniture_decor": 0.074,
+    "computers_accessories": 0.069,
+    "housewares": 0.062,
+    "watches_gifts": 0.053,
+    "telephony": 0.040,
+    "garden_tools": 0.039,
+    "auto": 0.038,
+    "toys": 0.036,
+    "cool_stuff": 0.034,
+    "perfumery": 0.030,
+    "baby": 0.027,
+    "electronics": 0.025,
+    "stationery": 0.023,
+    "fashion_bags_accessories": 0.018,
+    "pet_shop": 0.017,
+    "office_furniture": 0.015,
+    "consoles_games": 0.010,
+    "luggage_accessories": 0.010,
+    "construction_tools_construction": 0.008,
+    "home_appliances": 0.007,
+    "musical_instruments": 0.006,
+    "small_appliances": 0.006,
+    "books_general_interest": 0.005,
+    "food": 0.004,
+    "kitchen_dining_laundry_garden_furniture": 0.002,
+    None: 0.014,
+}
+
+# Customer share by state, with the main cities of each
+STATE_SHARES = {
+    "SP": (0.420, ["sao paulo", "campinas", "guarulhos", "santo andre", "osasco"]),
+    "RJ": (0.129, ["rio de janeiro", "niteroi", "sao goncalo", "duque de caxias"]),
+    "MG": (0.117, ["belo horizonte", "juiz de fora", "contagem", "uberlandia"]),
+    "RS": (0.055, ["porto alegre", "caxias do sul", "canoas"]),
+    "PR": (0.051, ["curitiba", "londrina", "maringa"]),
+    "SC": (0.037, ["florianopolis", "joinville", "blumenau"]),
+    "BA": (0.034, ["salvador", "feira de santana"]),
+    "DF": (0.022, ["brasilia"]),
+    "ES": (0.020, ["vitoria", "vila velha", "serra"]),
+    "GO": (0.020, ["goiania", "anapolis"]),
+    "PE": (0.017, ["recife", "jaboatao dos guararapes"]),
+    "CE": (0.013, ["fortaleza"]),
+    "PA": (0.010, ["belem"]),
+    "MT": (0.009, ["cuiaba"]),
+    "MA": (0.007, ["sao luis"]),
+    "MS": (0.007, ["campo grande"]),
+    "PB": (0.005, ["joao pessoa"]),
+    "PI": (0.005, ["teresina"]),
+    "RN": (0.005, ["natal"]),
+    "AL": (0.004, ["maceio"]),
+    "SE": (0.003, ["aracaju"]),
+    "TO": (0.003, ["palmas"]),
+    "RO": (0.003, ["porto velho"]),
+    "AM": (0.002, ["manaus"]),
+    "AC": (0.001, ["rio branco"]),
+    "AP": (0.001, ["macapa"]),
+    "RR": (0.001, ["boa vista"]),
+}
+
+# Sellers are far more concentrated in the south-east than customers
+SELLER_STATE_SHARES = {
+    "SP": 0.60,
+    "PR": 0.11,
+    "MG": 0.08,
+    "SC": 0.06,
+    "RJ": 0.05,
+    "RS": 0.05,
+}
+
+ITEMS_PER_ORDER_SHARES = [0.900, 0.075, 0.015, 0.006, 0.004]
+REVIEW_SCORE_SHARES = [0.115, 0.032, 0.083, 0.193, 0.577]  # scores 1..5
+
+# Byte value -> its two hex digits, packed so a uint16 gather writes both
+_HEX_PAIRS = np.frombuffer(
+    b"".join(f"{b:02x}".encode("ascii") for b in range(256)), dtype=np.uint16
+)
+
+
+def _shares(values):
+    p = np.asarray(values, dtype=float)
+    return p / p.sum()
+
+
+def _hex_ids(rng, n: int) -> pa.Array:
+    """n random 32-char lowercase hex IDs, built straight into an Arrow buffer."""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8)
+    data = _HEX_PAIRS[raw].view(np.uint8)
+    offset_type = np.int32 if 32 * n < 2**31 else np.int64
+    offsets = np.arange(0, 32 * (n + 1), 32, dtype=offset_type)
+    string_type = pa.string() if offset_type is np.int32 else pa.large_string()
+    return pa.Array.from_buffers(
+        string_type, n, [None, pa.py_buffer(offsets), pa.py_buffer(data)]
+    )
+
+
+def _labels(names, codes) -> pa.Array:
+    """Expand category codes into a plain string array (None stays null)."""
+    return pa.array(list(names), type=pa.string()).take(pa.array(codes))
+
+
+def _purchase_times(rng, n: int) -> np.ndarray:
+    """Purchase timestamps with a growth trend and a Black Friday spike."""
+    days = np.arange(START_DATE, END_DATE, dtype="datetime64[D]")
+    weight = np.linspace(0.2, 1.0, len(days))
+    weight[days == BLACK_FRIDAY] *= 8
+    day = rng.choice(len(days), size=n, p=_shares(weight))
+    seconds = rng.integers(0, 86_400, size=n).astype("timedelta64[s]")
+    return (days[day] + seconds).astype("datetime64[us]")
+
+
+def _power_law(rng, n_items: int, n_targets: int, alpha: float = 1.1) -> np.ndarray:
+    """Pick targets for n_items with a Zipf-like popularity skew."""
+    weight = 1.0 / np.arange(1, n_targets + 1) ** alpha
+    picks = np.searchsorted(np.cumsum(_shares(weight)), rng.random(n_items))
+    return rng.permutation(n_targets)[np.minimum(picks, n_targets - 1)]
+
+
+def _tier(values, thresholds, labels, default) -> pa.Array:
+    """Vectorized CASE WHEN value >= threshold ... ELSE default, as strings."""
+    codes = np.select(
+        [values >= t for t in thresholds], np.arange(len(labels)), default=len(labels)
+    )
+    return _labels([*labels, default], codes)
+
+
+def generate_tables(scale: float = 1.0, seed: int = 42) -> dict:
+    """Generate the four Gold tables as Arrow tables."""
+    rng = np.random.default_rng(seed)
+    n_orders = max(int(BASE_ORDERS * scale), 1)
+    n_products = max(int(BASE_PRODUCTS * scale), 1)
+    n_sellers = max(int(BASE_SELLERS * scale), 1)
+
+    # Products: category, list price and the seller offering them
+    categories = list(CATEGORY_SHARES)
+    product_cat = rng.choice(
+        len(categories), n_products, p=_shares(list(CATEGORY_SHARES.values()))
+    )
+    product_price = np.round(rng.lognormal(np.log(75), 0.9, n_products), 2)
+    product_seller = _power_law(rng, n_products, n_sellers, alpha=0.9)
+
+    # Orders -> items
+    items_per_order = rng.choice(5, n_orders, p=_shares(ITEMS_PER_ORDER_SHARES)) + 1
+    n_items = int(items_per_order.sum())
+    item_order = np.repeat(np.arange(n_orders), items_per_order)
+    order_start = np.cumsum(items_per_order) - items_per_order
+    order_item_id = np.arange(n_items) - np.repeat(order_start, items_per_order) + 1
+    item_product = _power_law(rng, n_items, n_products)
+    item_seller = product_seller[item_product]
+    price = product_price[item_product]
+    freight = np.round(rng.lognormal(np.log(16), 0.6, n_items), 2)
+
+    order_ts = _purchase_times(rng, n_orders)
+    order_review = rng.choice(5, n_orders, p=_shares(REVIEW_SCORE_SHARES)) + 1
+
+    # Customers: one customer_id per order, a few people ordering repeatedly
+    n_people = max(int(n_orders * (1 - REPEAT_CUSTOMER_SHARE)), 1)
+    order_person = rng.permutation(
+        np.concatenate(
+            [np.arange(n_people), rng.integers(0, n_people, n_orders - n_people)]
+        )
+    )
+    states = list(STATE_SHARES)
+    person_state = rng.choice(
+        len(states), n_people, p=_shares([s for s, _ in STATE_SHARES.values()])
+    )
+    cities = [
+        city for _, state_cities in STATE_SHARES.values() for city in state_cities
+    ]
+    first_city = np.cumsum([0] + [len(c) for _, c in STATE_SHARES.values()])[:-1]
+    n_cities = np.array([len(c) for _, c in STATE_SHARES.values()])
+    # Capital-heavy: the first (largest) city of a state is picked most often
+    city_rank = np.floor(n_cities[person_state] * rng.random(n_people) ** 2.5).astype(
+        int
+    )
+    person_city = first_city[person_state] + city_rank
+    person_zip = (person_state * 3_000 + rng.integers(1_000, 3_999, n_people)).astype(
+        np.int64
+    )
+
+    # Sellers
+    seller_states = states
+    seller_share = np.array([SELLER_STATE_SHARES.get(s, 0.002) for s in seller_states])
+    seller_state = rng.choice(len(seller_states), n_sellers, p=_shares(seller_share))
+    seller_city = first_city[seller_state]
+
+    order_ids = _hex_ids(rng, n_orders)
+    customer_ids = _hex_ids(rng, n_orders)
+    person_ids = _hex_ids(rng, n_people)
+    product_ids = _hex_ids(rng, n_products)
+    seller_ids = _hex_ids(rng, n_sellers)
+    item_idx = pa.array(item_order)
+
+    fct_orders = pa.table(
+        {
+            "order_id": order_ids.take(item_idx),
+            "order_item_id": order_item_id,
+            "customer_id": customer_ids.take(item_idx),
+            "product_id": product_ids.take(pa.array(item_product)),
+            "order_purchase_timestamp": order_ts[item_order],
+            "product_category_name": _labels(categories, product_cat[item_product]),
+            "price": price,
+            "freight_value": freight,
+            "total_order_value": np.round(price + freight, 2),
+        }
+    )
+
+    # dim_customers: aggregates per customer_id (== per order here)
+    lifetime_value = np.bincount(item_order, weights=price, minlength=n_orders)
+    dim_customers = pa.table(
+        {
+            "customer_id": customer_ids,
+            "customer_unique_id": person_ids.take(pa.array(order_person)),
+            "zip_code": person_zip[order_person],
+            "city": _labels(cities, person_city[order_person]),
+            "state": _labels(states, person_state[order_person]),
+            "total_orders": np.ones(n_orders, dtype=np.int64),
+            "lifetime_value": np.round(lifetime_value, 2),
+            "customer_type": _labels(["One-time"], np.zeros(n_orders, dtype=np.int8)),
+        }
+    )
+
+    # dim_products
+    times_sold = np.bincount(item_product, minlength=n_products)
+    dim_products = pa.table(
+        {
+            "product_id": product_ids,
+            "product_category_name": _labels(categories, product_cat),
+            "times_sold": times_sold,
+            "total_revenue": np.round(
+                np.bincount(item_product, weights=price, minlength=n_products), 2
+            ),
+            "sales_tier": _tier(
+                times_sold,
+                [50, 10, 1],
+                ["High Seller", "Medium Seller", "Low Seller"],
+                "Never Sold",
+            ),
+        }
+    )
+
+    # dim_sellers: order-level review average, as in 03_gold_layer.sql
+    pairs = np.sort(item_seller.astype(np.int64) * n_orders + item_order)
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    pair_seller, pair_order = np.divmod(pairs, n_orders)
+    seller_orders = np.bincount(pair_seller, minlength=n_sellers)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_review = (
+            np.bincount(
+                pair_seller, weights=order_review[pair_order], minlength=n_sellers
+            )
+            / seller_orders
+        )
+    dim_sellers = pa.table(
+        {
+            "seller_id": seller_ids,
+            "city": _labels(cities, seller_city),
+            "state": _labels(seller_states, seller_state),
+            "total_orders": seller_orders,
+            "total_revenue": np.round(
+                np.bincount(item_seller, weights=price, minlength=n_sellers), 2
+            ),
+            "avg_review_score": pa.array(avg_review, from_pandas=True),
+            "seller_tier": _tier(
+                avg_review,
+                [4.5, 4.0, 3.0],
+                ["Platinum", "Gold", "Silver"],
+                "Bronze",
+            ),
+        }
+    )
+
+    return {
+        "fct_orders": fct_orders,
+        "dim_customers": dim_customers,
+        "dim_products": dim_products,
+        "dim_sellers": dim_sellers,
+    }
+
+
+def generate(scale: float = 1.0, seed: int = 42):
+    """Generate the Gold tables as DataFrames, in load_data() order."""
+    tables = generate_tables(scale, seed)
+    return tuple(
+        tables[name].to_pandas()
+        for name in ("fct_orders", "dim_customers", "dim_products", "dim_sellers")
+    )
+
+
+def write_parquet(tables: dict, out_dir) -> dict:
+    """Write each table to <out_dir>/<name>.parquet and return the paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, table in tables.items():
+        paths[name] = out_dir / f"{name}.parquet"
+        pq.write_table(table, paths[name])
+    return paths
+
+
+def write_aggregates(tables: dict, out_dir) -> dict:
+    """Write the agg_* tables of the Gold tables as <out_dir>/agg_<name>.parquet."""
+    # Imported here so generating data does not pull in the dashboard layer
+    from app.aggregates import build_aggregates
+
+    fct_orders, dim_customers, dim_sellers = (
+        tables[name].to_pandas()
+        for name in ("fct_orders", "dim_customers", "dim_sellers")
+    )
+    out_dir = Path(out_dir)
+    paths = {}
+    for name, df in build_aggregates(fct_orders, dim_customers, dim_sellers).items():
+        paths[f"agg_{name}"] = out_dir / f"agg_{name}.parquet"
+        df.to_parquet(paths[f"agg_{name}"])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="scale factor (1 = Kaggle size)"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data/synthetic", help="output directory")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    tables = generate_tables(args.scale, args.seed)
+    generated = time.perf_counter() - start
+    paths = write_parquet(tables, args.out)
+    written = time.perf_counter() - start - generated
+    agg_paths = write_aggregates(tables, args.out)
+    aggregated = time.perf_counter() - start - generated - written
+
+    for name, table in tables.items():
+        size = paths[name].stat().st_size
+        print(
+            f"{name:<14} {table.num_rows:>12,} rows  {size / 1e6:8.1f} MB  {paths[name]}"
+        )
+    print(f"{len(agg_paths)} agg_* tables in {args.out}")
+    print(
+        f"Generated in {generated:.1f}s, written in {written:.1f}s, "
+        f"aggregated in {aggregated:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Daily prefix-sum index for date-range KPIs
+DailyIndex turns the daily aggregates (agg_daily, agg_daily_category,
+agg_daily_new_customers) into cumulative sums over a dense calendar, so the
+revenue, freight, item and order totals of any date range, overall or for
+one category, are two array lookups and a subtraction whatever the size of
+fct_orders. Order counts add up across days because every order has a single
+purchase timestamp, and new customers because every person has a single
+first purchase. compare() sets a period against the previous month, year or
+period of the same length, for the Home tab's comparison mode.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app import lineage
+from app.profiling import profiled
+
+METRICS = ["revenue", "freight", "items", "orders"]
+
+COMPARISONS = ("Month over month", "Year over year", "Custom vs prior period")
+# Metrics compare() reports, with the change of each
+COMPARED = ["revenue", "orders", "avg_order_value", "new_customers"]
+
+
+def _prefix_sums(
+    daily: pd.DataFrame, first: pd.Timestamp, n_days: int, columns=METRICS
+) -> np.ndarray:
+    """(column, n_days + 1) running totals; column d sums the days before day d."""
+    sums = np.zeros((len(columns), n_days + 1))
+    positions = (pd.to_datetime(daily["day"]) - first).dt.days.to_numpy()
+    sums[:, positions + 1] = daily[columns].to_numpy(dtype=np.float64).T
+    return np.cumsum(sums, axis=1)
+
+
+def previous_period(comparison: str, start, end):
+    """(start, end) of the period start..end is compared with.
+
+    Month and year comparisons shift both ends by a month or a year, a period
+    ending on a month end keeping the end of the earlier month; the custom
+    comparison takes the days just before start, as many as start..end spans.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if comparison == "Custom vs prior period":
+        day = pd.Timedelta(days=1)
+        return start - (end - start) - day, start - day
+    if comparison not in COMPARISONS:
+        raise ValueError(
+            f"Unknown comparison {comparison!r}; expected one of {COMPARISONS}"
+        )
+    shift = pd.DateOffset(months=1 if comparison == "Month over month" else 12)
+    previous_end = end - shift
+    if end.is_month_end:
+        previous_end += pd.offsets.MonthEnd(0)
+    return start - shift, previous_end
+
+
+class DailyIndex:
+    """Running totals per calendar day, overall and per category."""
+
+    def __init__(
+        self,
+        daily: pd.DataFrame,
+        daily_category: pd.DataFrame,
+        daily_new_customers: pd.DataFrame,
+    ):
+        days = pd.to_datetime(daily["day"])
+        self.first = days.min()
+        self.last = days.max()
+        n_days = (self.last - self.first).days + 1
+        self.totals = _prefix_sums(daily, self.first, n_days)
+        # First purchases happen on purchase days, so they fit the same calendar
+        self.new_customers = _prefix_sums(
+            daily_new_customers, self.first, n_days, ["customers"]
+        )[0]
+
+        categories = daily_category["product_category_name"]
+        self.categories = {}
+        for name, rows in daily_category.groupby(categories, sort=True):
+            self.categories[name] = _prefix_sums(rows, self.first, n_days)
+
+    def _position(self, day) -> int:
+        """Days from the first indexed day to day, clipped to the index."""
+        offset = (pd.Timestamp(day) - self.first).days
+        return min(max(offset, 0), self.totals.shape[1] - 1)
+
+    def range_totals(self, start, end, category=None) -> dict:
+        """Totals and averages of the days start..end (inclusive), in O(1).
+
+        category=None covers every item, including those without a category,
+        and adds the new customers (first purchases) of the days.
+        """
+        sums = self.totals if category is None else self.categories.get(category)
+        lo = self._position(start)
+        hi = max(self._position(pd.Timestamp(end) + pd.Timedelta(days=1)), lo)
+        if sums is None:
+            values = np.zeros(len(METRICS))
+        else:
+            values = sums[:, hi] - sums[:, lo]
+        result = dict(zip(METRICS, values.tolist()))
+        if category is None:
+            result["new_customers"] = round(
+                self.new_customers[hi] - self.new_customers[lo]
+            )
+        result["items"] = round(result["items"])
+        result["orders"] = round(result["orders"])
+        result["days"] = hi - lo
+        result["avg_order_value"] = (
+            result["revenue"] / result["orders"] if result["orders"] else 0.0
+        )
+        result["avg_daily_revenue"] = (
+            result["revenue"] / result["days"] if result["days"] else 0.0
+        )
+        result["freight_share"] = (
+            result["freight"] / result["revenue"] if result["revenue"] else 0.0
+        )
+        return result
+
+    def compare(self, comparison: str, start, end) -> dict:
+        """Totals of start..end and of its previous_period(), overall.
+
+        Returns {"current": (start, end), "previous": (start, end),
+        "covered": bool, metric: (current value, previous value, relative
+        change)} for every COMPARED metric. The change is None when the
+        previous value is 0, or when the previous period is not covered:
+        it reaches outside first..last, where its totals would be clipped.
+        """
+        previous = previous_period(comparison, start, end)
+        covered = self.first <= previous[0] and previous[1] <= self.last
+        now = self.range_totals(start, end)
+        before = self.range_totals(*previous)
+        result = {
+            "current": (pd.Timestamp(start), pd.Timestamp(end)),
+            "previous": previous,
+            "covered": covered,
+        }
+        for metric in COMPARED:
+            change = (
+                now[metric] / before[metric] - 1 if covered and before[metric] else None
+            )
+            result[metric] = (now[metric], before[metric], change)
+        return result
+
+
+@profiled("cache")
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _daily_index(versions, _aggs):
+    """Helper to cache the index per fct_orders version."""
+    return DailyIndex(
+        _aggs["daily"], _aggs["daily_category"], _aggs["daily_new_customers"]
+    )
+
+
+def get_daily_index(data_version, aggs):
+    """Build the date-range index from the aggregates once per fct_orders version."""
+    return _daily_index(lineage.key(data_version, "daily_index"), aggs)
@@ -19,3 +19,11 @@ def fmt_num(v):
     if v >= 1e3:
         return f"{v/1e3:.1f}K"
     return f"{v:,.0f}"
+
+
+def fmt_span(first, last):
+    """Format the time between two timestamps as whole years or months."""
+    months = (last.year - first.year) * 12 + last.month - first.month + 1
+    if months >= 24:
+        return f"{months // 12} years"
+    return f"{months} month{'s' if months != 1 else ''}"
@@ -0,0 +1,85 @@
+"""
+Startup warm-up and readiness signal for the dashboard server
+lifespan() starts a thread as soon as the server is up that loads the served
+data version and builds every derived cache (app.refresh.warm), so no
+session pays for a cold load. A failed warm-up (say the warehouse is down)
+is retried with exponential backoff until it succeeds. ready() answers the
+load balancer's readiness probe: 503 until the warm-up has finished, with the
+last error in the body, and 200 after. Wired up in server.py.
+"""
+
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from starlette.responses import JSONResponse
+
+from app import refresh
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry of a failed warm-up, doubled up to the cap
+RETRY_SECONDS = 5
+MAX_RETRY_SECONDS = 300
+
+
+class _Status:
+    """Progress of the warm-up, read by ready()."""
+
+    def __init__(self):
+        self.started_at = None
+        self.seconds = None
+        self.version = None
+        self.error = None
+        self.attempts = 0
+        self.done = threading.Event()
+
+
+status = _Status()
+
+
+def _attempt() -> bool:
+    """Load the served data version and build its caches; True on success."""
+    status.attempts += 1
+    try:
+        status.version = refresh.get_refresher().version
+        refresh.warm(status.version)
+    except Exception as e:  # Stay unready until a later attempt succeeds
+        logger.exception("Warm-up attempt %d failed", status.attempts)
+        status.error = repr(e)
+        return False
+    status.error = None
+    return True
+
+
+def run():
+    """Warm up, retrying with backoff until it succeeds, then mark ready."""
+    status.started_at = time.time()
+    start = time.perf_counter()
+    delay = RETRY_SECONDS
+    while not _attempt():
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_SECONDS)
+    status.seconds = round(time.perf_counter() - start, 2)
+    status.done.set()
+    logger.info("Warm-up of %s done in %.1fs", status.version, status.seconds)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm up in the background once the Streamlit runtime has started."""
+    threading.Thread(target=run, name="olist-warmup", daemon=True).start()
+    yield
+
+
+async def ready(request):
+    """Readiness probe: 200 once the caches are warm, 503 until then."""
+    body = {
+        "ready": status.done.is_set(),
+        "version": status.version,
+        "warmup_seconds": status.seconds,
+        "attempts": status.attempts,
+        "error": status.error,  # Of the last failed attempt, while unready
+    }
+    return JSONResponse(body, status_code=200 if status.done.is_set() else 503)
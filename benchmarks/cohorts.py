@@ -0,0 +1,129 @@
+"""
+Parity and speed of the cohort retention matrix (app.cohorts)
+Builds CohortRetention on synthetic data and checks its counts against a
+plain pandas version (distinct person-months, each person's first month via
+groupby().transform(), then a crosstab), timing both. Only the two fct_orders
+columns a build reads are materialized, so --scales 90 (~10M order items)
+fits in a few GB. Exits 1 on any count mismatch.
+
+Usage:
+    python -m benchmarks.cohorts --scales 1 10
+    python -m benchmarks.cohorts --scales 90 --repeat 1
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from app.cohorts import COLUMNS, CohortRetention
+from app.synthetic import generate_tables
+from benchmarks.engines import best_time
+
+
+def load_columns(scale: float, seed: int):
+    """The fct_orders and dim_customers columns a cohort build reads."""
+    tables = generate_tables(scale, seed)
+    return (
+        tables["fct_orders"].select(COLUMNS).to_pandas(),
+        tables["dim_customers"]
+        .select(["customer_id", "customer_unique_id"])
+        .to_pandas(),
+    )
+
+
+def reference_counts(fct_orders, dim_customers) -> pd.DataFrame:
+    """Cohort x months-since-first counts, the pandas way."""
+    ts = fct_orders["order_purchase_timestamp"]
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)
+    purchases = (
+        pd.DataFrame(
+            {
+                "person": fct_orders["customer_id"].map(
+                    dim_customers.set_index("customer_id")["customer_unique_id"]
+                ),
+                # Months since 1970-01, as the ordinals of monthly periods
+                "month": (ts.dt.year - 1970) * 12 + ts.dt.month - 1,
+            }
+        )
+        .dropna()
+        .drop_duplicates()
+    )
+    first = purchases.groupby("person")["month"].transform("min")
+    return pd.crosstab(first, purchases["month"] - first)
+
+
+def mismatches(cohorts, reference) -> int:
+    """Cells where the matrix and the pandas counts differ."""
+    n_months = len(cohorts.months)
+    expected = reference.reindex(
+        index=cohorts.months.asi8, columns=range(n_months), fill_value=0
+    )
+    extra = reference.to_numpy().sum() - expected.to_numpy().sum()
+    return int((expected.to_numpy() != cohorts.counts).sum()) + int(extra != 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/cohorts.json")
+    args = parser.parse_args(argv)
+
+    report = {}
+    failures = []
+    for scale in args.scales:
+        fct_orders, dim_customers = load_columns(scale, args.seed)
+        cohorts = CohortRetention.build(fct_orders, dim_customers)
+        reference = reference_counts(fct_orders, dim_customers)
+        result = {
+            "rows": len(fct_orders),
+            "customers": int(cohorts.sizes.sum()),
+            "cohorts": len(cohorts.months),
+            # Defaults bind this scale's data to the timed lambdas
+            "build_s": best_time(
+                lambda fct_orders=fct_orders, dim_customers=dim_customers: (
+                    CohortRetention.build(fct_orders, dim_customers)
+                ),
+                args.repeat,
+            ),
+            "pandas_s": best_time(
+                lambda fct_orders=fct_orders, dim_customers=dim_customers: (
+                    reference_counts(fct_orders, dim_customers)
+                ),
+                args.repeat,
+            ),
+            "mismatches": mismatches(cohorts, reference),
+        }
+        report[f"{scale:g}"] = result
+
+        print(
+            f"Scale {scale:g}x: {result['rows']:,} rows, {result['customers']:,} "
+            f"customers in {result['cohorts']} cohorts"
+        )
+        print(
+            f"  matrix {result['build_s']:.2f} s, pandas {result['pandas_s']:.2f} s "
+            f"({result['pandas_s'] / result['build_s']:.1f}x), "
+            f"{result['mismatches']} mismatched cells"
+        )
+        if result["mismatches"]:
+            failures.append(f"{scale:g}x")
+
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if not failures:
+        print("Cohort counts match pandas at every scale")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Parity and thread-count benchmark of the compute engines (app.engine)
+Checks that every engine returns exactly the pandas results for the
+dashboard aggregates and the Query Data month column, then times both
+computations for pandas and for Polars at each thread count. Polars fixes
+its thread pool at import, so every thread count runs in a fresh
+subprocess with POLARS_MAX_THREADS set. Thread counts above the host's
+cores say nothing about scaling, so the default sweep stops at cpu_count
+and larger requested counts are flagged in the output. Exits 1 on any
+parity mismatch.
+
+Usage:
+    python -m benchmarks.engines --scales 1 5 --threads 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.aggregates import build_aggregates
+from app.engine import ENGINES
+from app.synthetic import generate
+from tabs.query import order_months
+
+
+def computations(engine, fct_orders, dim_customers, dim_products, dim_sellers):
+    """Name -> zero-argument callable for every engine-backed computation."""
+    return {
+        "aggregates.build": lambda: build_aggregates(
+            fct_orders, dim_customers, dim_sellers, engine
+        ),
+        "query.order_months": lambda: order_months(fct_orders, engine),
+    }
+
+
+def parity(engine, tables) -> list:
+    """Differences between engine's results and the pandas ones."""
+    mismatches = []
+    fct_orders, dim_customers, _, dim_sellers = tables
+    expected = build_aggregates(fct_orders, dim_customers, dim_sellers, "pandas")
+    actual = build_aggregates(fct_orders, dim_customers, dim_sellers, engine)
+    for name in expected:
+        try:
+            pd.testing.assert_frame_equal(actual[name], expected[name])
+        except AssertionError as e:
+            mismatches.append(f"{engine} aggregates[{name!r}]: {e}")
+    try:
+        pd.testing.assert_series_equal(
+            order_months(fct_orders, engine), order_months(fct_orders, "pandas")
+        )
+    except AssertionError as e:
+        mismatches.append(f"{engine} order_months: {e}")
+    return mismatches
+
+
+def best_time(func, repeat: int) -> float:
+    """Best wall time in seconds over `repeat` runs, after one warm-up run."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return round(min(times), 5)
+
+
+def run(engine, scales, repeat: int, seed: int) -> dict:
+    """Scale -> computation -> best wall time of engine in this process."""
+    results = {}
+    for scale in scales:
+        tables = generate(scale, seed)
+        results[f"{scale:g}"] = {
+            name: best_time(func, repeat)
+            for name, func in computations(engine, *tables).items()
+        }
+    return results
+
+
+def run_threads(engine, threads: int, args) -> dict:
+    """run() in a subprocess limited to `threads` Polars threads."""
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.engines",
+            "--worker",
+            engine,
+            "--scales",
+            *map(str, args.scales),
+            "--repeat",
+            str(args.repeat),
+            "--seed",
+            str(args.seed),
+        ],
+        env={**os.environ, "POLARS_MAX_THREADS": str(threads)},
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 5])
+    cores = os.cpu_count() or 1
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=sorted({n for n in (1, 2, 4, 8) if n <= cores} | {cores}),
+        help="Polars thread counts",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/engines.json")
+    parser.add_argument("--worker", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run(args.worker, args.scales, args.repeat, args.seed)))
+        return 0
+
+    mismatches = []
+    for scale in args.scales:
+        tables = generate(scale, args.seed)
+        for engine in ENGINES[1:]:
+            mismatches += [f"{scale:g}x {m}" for m in parity(engine, tables)]
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    if not mismatches:
+        print("Parity: every engine matches pandas exactly")
+
+    oversubscribed = [n for n in args.threads if n > cores]
+    if oversubscribed:
+        print(
+            f"Only {cores} cores: timings at {oversubscribed} threads do not "
+            "measure scaling"
+        )
+
+    results = {"pandas": run("pandas", args.scales, args.repeat, args.seed)}
+    results["polars"] = {f"{n}": run_threads("polars", n, args) for n in args.threads}
+
+    for scale in map("{:g}".format, args.scales):
+        print(f"Scale {scale}x")
+        for name, pandas_s in results["pandas"][scale].items():
+            print(f"  {name:20} pandas {pandas_s * 1000:9.1f} ms")
+            for n, runs in results["polars"].items():
+                polars_s = runs[scale][name]
+                print(
+                    f"  {'':20} polars {polars_s * 1000:9.1f} ms  {n:>3} threads  "
+                    f"{pandas_s / polars_s:5.2f}x"
+                    f"{'  (> cores)' if int(n) > cores else ''}"
+                )
+
+    report = {
+        "cpu_count": cores,
+        "oversubscribed_threads": oversubscribed,
+        "mismatches": mismatches,
+        **results,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Import-time report of the dashboard's cold start
+Runs the imports of streamlit_app.py in fresh interpreters under
+`python -X importtime`, after `import streamlit` (which the server has
+loaded before the script runs), and reports the total plus the time spent
+in each top-level package and the slowest modules. Fails when the total
+regresses past a stored baseline by more than --threshold.
+
+Usage:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --save-baseline
+"""
+
+import argparse
+import ast
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks.rerun_latency import APP_FILE
+
+# Differences below this are noise, whatever the relative change
+MIN_TIME_DELTA_MS = 20
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_imports(path=APP_FILE) -> list:
+    """The module-level import statements of the app script, as source lines."""
+    tree = ast.parse(Path(path).read_text())
+    return [
+        ast.unparse(node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+        and not (isinstance(node, ast.Import) and node.names[0].name == "streamlit")
+    ]
+
+
+def import_times(statements) -> list:
+    """(module, self µs, cumulative µs, depth) of every import in a fresh interpreter."""
+    code = "import streamlit\nimport sys\nprint('--', file=sys.stderr)\n" + "\n".join(
+        statements
+    )
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+        cwd=Path(APP_FILE).parent,
+    ).stderr
+    # Only what the app adds on top of streamlit
+    lines = out.split("--\n", 1)[1].splitlines()
+    rows = []
+    for line in lines:
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def report(rows, top: int) -> dict:
+    """Total, per-package and slowest-module import times in ms."""
+    packages = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        packages[module.split(".")[0]] += self_us
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "total_ms": round(sum(row[1] for row in rows) / 1000, 1),
+        "modules": len(rows),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda kv: -kv[1])
+            if us >= 1000
+        },
+        "slowest_ms": {
+            module: round(self_us / 1000, 1) for module, self_us, _, _ in slowest
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", default="benchmarks/results/importtime.json")
+    parser.add_argument("--baseline", default="benchmarks/baselines/importtime.json")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed relative slowdown"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store results as the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    statements = app_imports()
+    # Best of several cold interpreters; the first also warms the OS file cache
+    runs = [report(import_times(statements), args.top) for _ in range(args.repeat)]
+    result = min(runs, key=lambda run: run["total_ms"])
+
+    print(f"{result['modules']} modules imported in {result['total_ms']:.1f} ms")
+    for name, ms in result["packages_ms"].items():
+        print(f"  {name:28} {ms:8.1f} ms")
+    print("Slowest modules (self time):")
+    for name, ms in result["slowest_ms"].items():
+        print(f"  {name:40} {ms:8.1f} ms")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Results written to {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2))
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline first")
+        return 0
+
+    old, new = json.loads(baseline_path.read_text())["total_ms"], result["total_ms"]
+    if new > old * (1 + args.threshold) and new - old > MIN_TIME_DELTA_MS:
+        print(
+            f"REGRESSION import total_ms: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)"
+        )
+        return 1
+    print(
+        f"No regression beyond {args.threshold:.0%} of {baseline_path} ({old} -> {new} ms)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
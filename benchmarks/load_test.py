@@ -0,0 +1,292 @@
+"""
+Concurrent-session load test of the dashboard
+Starts one `streamlit run streamlit_app.py` server on local Parquet data
+(OLIST_DATA_DIR) and drives N browser-like sessions against it over the
+Streamlit websocket, each opening the app and changing filters like
+benchmarks.rerun_latency. For every N it reports rerun throughput,
+p50/p95/p99 rerun latency and the server's CPU use and peak RSS, which
+shows where a single replica saturates. Server stats read /proc (Linux).
+
+Usage:
+    python -m benchmarks.load_test --sessions 1 2 4 8 --scale 1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks.rerun_latency import APP_FILE, write_local_data
+
+PERCENTILES = [50, 95, 99]
+WIDGET_TYPES = ("selectbox", "text_input", "button")
+
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, timeout: float = 60) -> subprocess.Popen:
+    """Start a headless Streamlit server and wait until it is healthy."""
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            APP_FILE,
+            "--server.headless",
+            "true",
+            "--server.port",
+            str(port),
+            "--browser.gatherUsageStats",
+            "false",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health"):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Streamlit server did not start on port {port}")
+
+
+class ProcessStats:
+    """CPU seconds and RSS of another process, read from /proc."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.tick = os.sysconf("SC_CLK_TCK")
+        self.page = os.sysconf("SC_PAGE_SIZE")
+
+    def cpu_s(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.tick  # utime + stime
+
+    def rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * self.page / 2**20
+
+
+class Client:
+    """One browser session: sends reruns with its widget states over the websocket."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.widgets = {}  # label -> widget proto of the last rerun
+        self.states = {}  # widget id -> WidgetState sent with every rerun
+        self.latencies = []
+        self.errors = []
+
+    async def __aenter__(self):
+        self.ws = await websockets.connect(self.url, max_size=None)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ws.close()
+
+    async def rerun(self, trigger=None):
+        """Rerun the script and wait until it has finished."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            msg.rerun_script.widget_states.widgets.append(trigger)
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "script_finished":
+                break
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    self.widgets[widget.label] = widget
+                elif element_type == "exception":
+                    self.errors.append(element.exception.message)
+        self.latencies.append(time.perf_counter() - start)
+
+    async def set_text(self, label: str, value: str):
+        """Set a selectbox or text input by label and rerun."""
+        state = WidgetState(id=self.widgets[label].id, string_value=value)
+        self.states[state.id] = state
+        await self.rerun()
+
+    async def click(self, label: str):
+        """Click a button by label."""
+        await self.rerun(WidgetState(id=self.widgets[label].id, trigger_value=True))
+
+    async def cycle(self, label: str, steps: int):
+        """Select the last `steps` options of a selectbox, one rerun each."""
+        for option in list(self.widgets[label].options)[-steps:]:
+            await self.set_text(label, option)
+
+
+async def journey(client: Client, steps: int, aggregates_only: bool):
+    """The scripted user journey of one session."""
+    for _ in range(steps + 1):
+        await client.rerun()
+    await client.cycle("🏷️ Filter Category", steps)
+    if aggregates_only:
+        await client.click("📥 Load row-level data")
+    await client.cycle("Select Month", steps)
+    await client.cycle("Select Category", steps)
+    await client.cycle("Select State", steps)
+    await client.cycle("Select Customer", steps)
+    for prefix in ["a", "ab", "abc", "sao", "be"][:steps]:
+        await client.set_text("Starts with", prefix)
+
+
+async def run_level(url: str, stats: ProcessStats, n_sessions: int, args) -> dict:
+    """Run n_sessions journeys concurrently and measure the server meanwhile."""
+    clients = [Client(url) for _ in range(n_sessions)]
+    peak_rss = stats.rss_mb()
+
+    async def sample():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, stats.rss_mb())
+            await asyncio.sleep(0.1)
+
+    async def drive(client):
+        async with client:
+            await journey(client, args.steps, args.mode == "aggregates")
+
+    sampler = asyncio.create_task(sample())
+    cpu_start, wall_start = stats.cpu_s(), time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(drive(c) for c in clients), return_exceptions=True
+    )
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = stats.cpu_s() - cpu_start
+    sampler.cancel()
+
+    ms = np.array([v for c in clients for v in c.latencies]) * 1000
+    errors = [repr(o) for o in outcomes if isinstance(o, Exception)]
+    errors += [e for c in clients for e in c.errors]
+    return {
+        "sessions": n_sessions,
+        "reruns": len(ms),
+        "wall_s": round(wall_s, 2),
+        "throughput_rps": round(len(ms) / wall_s, 2),
+        **{f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES},
+        "server_cpu_cores": round(cpu_s / wall_s, 2),
+        "server_peak_rss_mb": round(peak_rss, 1),
+        "errors": errors,
+    }
+
+
+def saturation_point(levels: list, gain: float = 1.1):
+    """First session count whose throughput is less than `gain` x the previous one."""
+    for prev, cur in itertools.pairwise(levels):
+        if cur["throughput_rps"] < prev["throughput_rps"] * gain:
+            return cur["sessions"]
+    return None
+
+
+async def run_levels(url: str, stats: ProcessStats, args) -> list:
+    """Warm the server up, then run every session count in turn."""
+    # Fill the server's caches first so every level measures warm reruns
+    async with Client(url) as client:
+        await journey(client, 1, args.mode == "aggregates")
+
+    levels = []
+    for n_sessions in args.sessions:
+        level = await run_level(url, stats, n_sessions, args)
+        levels.append(level)
+        print(
+            f"{n_sessions:>3} sessions: {level['throughput_rps']:6.2f} reruns/s  "
+            f"p50 {level['p50_ms']:8.1f} ms  p95 {level['p95_ms']:8.1f} ms  "
+            f"p99 {level['p99_ms']:8.1f} ms  cpu {level['server_cpu_cores']:4.2f}  "
+            f"rss {level['server_peak_rss_mb']:7.1f} MB"
+            + (f"  {len(level['errors'])} errors" if level["errors"] else "")
+        )
+    return levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--data-dir", help="existing Parquet directory (default: generate)"
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", choices=["full", "aggregates"], default="full")
+    parser.add_argument("--steps", type=int, default=3, help="reruns per interaction")
+    parser.add_argument("--output", default="benchmarks/results/load_test.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if not data_dir:
+            data_dir = tmp
+            write_local_data(data_dir, args.scale, args.seed)
+        os.environ["OLIST_DATA_DIR"] = str(data_dir)
+        os.environ["OLIST_DASHBOARD_MODE"] = args.mode
+
+        port = free_port()
+        server = start_server(port)
+        try:
+            levels = asyncio.run(
+                run_levels(
+                    f"ws://localhost:{port}/_stcore/stream",
+                    ProcessStats(server.pid),
+                    args,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    saturated_at = saturation_point(levels)
+    print(
+        f"Throughput stops scaling at {saturated_at} sessions"
+        if saturated_at
+        else "Throughput still scaling at the largest session count"
+    )
+
+    report = {
+        "data_dir": args.data_dir,
+        "scale": None if args.data_dir else args.scale,
+        "mode": args.mode,
+        "cpu_count": os.cpu_count(),
+        "saturated_at": saturated_at,
+        "levels": levels,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+File-pruning benchmark for olist_gold.fct_orders
+Runs the dashboard's month and category filters against the warehouse and
+reports files/bytes read vs. pruned, to check the CLUSTER BY layout.
+
+Usage:
+    python -m benchmarks.pruning --month 2018-01 --category health_beauty
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from app.database import connect
+from benchmarks.warehouse import run_query, table_detail
+
+TABLE = "olist_gold.fct_orders"
+
+
+def pruning_queries(month: str, category: str) -> dict:
+    """The filter shapes the dashboard issues, keyed by name."""
+    start = pd.Period(month, "M").start_time.strftime("%Y-%m-%d")
+    end = (pd.Period(month, "M") + 1).start_time.strftime("%Y-%m-%d")
+    by_month = (
+        f"order_purchase_timestamp >= '{start}' AND order_purchase_timestamp < '{end}'"
+    )
+    by_category = f"product_category_name = '{category}'"
+    select = f"SELECT COUNT(DISTINCT order_id), SUM(total_order_value) FROM {TABLE}"
+    return {
+        "full_scan": select,
+        "month": f"{select} WHERE {by_month}",
+        "category": f"{select} WHERE {by_category}",
+        "month_and_category": f"{select} WHERE {by_month} AND {by_category}",
+    }
+
+
+def _summary(name: str, run: dict) -> str:
+    m = run["metrics"]
+    read, pruned = m.get("read_files_count") or 0, m.get("pruned_files_count") or 0
+    read_b, pruned_b = m.get("read_bytes") or 0, m.get("pruned_bytes") or 0
+    line = f"{name:<20} {run['wall_s']:7.2f}s"
+    if not read + pruned:
+        return f"{line}  (no file metrics)"
+    return (
+        f"{line}  files read {read:>5} / pruned {pruned:>5}"
+        f" ({pruned / (read + pruned):.0%})"
+        f"  bytes read {read_b / 1e6:8.1f}MB / pruned {pruned_b / 1e6:8.1f}MB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--month", default="2018-01", help="YYYY-MM month filter")
+    parser.add_argument("--category", default="health_beauty", help="category filter")
+    parser.add_argument("--output", default="benchmarks/results/pruning.json")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        report = {"table": TABLE, "detail": table_detail(cursor, TABLE), "queries": {}}
+        print(f"{TABLE}: {report['detail']}")
+        for name, query in pruning_queries(args.month, args.category).items():
+            run = run_query(cursor, query)
+            run["result"] = [list(row) for row in run["result"]]
+            report["queries"][name] = {"sql": query, **run}
+            print(_summary(name, run))
+    finally:
+        cursor.close()
+        conn.close()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
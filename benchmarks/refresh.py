@@ -0,0 +1,121 @@
+"""
+Stale-while-revalidate check of the out_of_core fct_orders dataset
+Partitions synthetic fct_orders into a month dataset (app.outofcore), warms
+a Refresher (app.refresh) on it, then adds a partition for the month after
+the last one. Checks that the source data version moves, that the refresher
+switches to it and that the aggregates of the new version include the new
+month, and reports how long the revalidation took. Exits 1 when any check
+fails.
+
+Usage:
+    python -m benchmarks.refresh --scale 1
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.synthetic import generate_tables, write_parquet
+
+
+def add_next_month(dataset_dir: Path, fct_orders: pd.DataFrame) -> str:
+    """Write the last month's items again, one month later, as a new partition."""
+    ts = fct_orders["order_purchase_timestamp"]
+    last = ts.max().to_period("M")
+    items = fct_orders[ts.dt.to_period("M") == last].assign(
+        order_purchase_timestamp=ts + pd.DateOffset(months=1)
+    )
+    month = str(last + 1)
+    partition = dataset_dir / f"month={month}"
+    partition.mkdir()
+    items.to_parquet(partition / "part-0.parquet", index=False)
+    return month
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/refresh.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir, dataset_dir = Path(tmp) / "gold", Path(tmp) / "fct_orders"
+        paths = write_parquet(generate_tables(args.scale, args.seed), data_dir)
+        os.environ.update(
+            OLIST_DATA_DIR=str(data_dir),
+            OLIST_FACT_DATASET=str(dataset_dir),
+            OLIST_DASHBOARD_MODE="out_of_core",
+            OLIST_SNAPSHOT_DIR="off",
+            OLIST_REFRESH_SECONDS="0",
+        )
+        # Settings are read when these run, so import them once they are set
+        from app.database import load_dimensions, source_version
+        from app.outofcore import (
+            fact_dataset_path,
+            get_dataset_aggregates,
+            get_fact_dataset,
+            write_partitioned,
+        )
+        from app.refresh import Refresher
+
+        write_partitioned(paths["fct_orders"], dataset_dir)
+        fct_orders = pd.read_parquet(paths["fct_orders"])
+        paths["fct_orders"].unlink()  # fct_orders only comes from the dataset
+
+        refresher = Refresher(0)
+        old_version = refresher.version
+        start = time.perf_counter()
+        refresher.check()  # Same version: nothing to revalidate
+        unchanged_s = time.perf_counter() - start
+
+        month = add_next_month(dataset_dir, fct_orders)
+        new_source = source_version()
+        start = time.perf_counter()
+        refresher.check()
+        revalidate_s = time.perf_counter() - start
+
+        new_version = refresher.version
+        dim_customers, _, dim_sellers = load_dimensions(new_version)
+        facts = get_fact_dataset(fact_dataset_path(), new_version)
+        aggs = get_dataset_aggregates(new_version, facts, dim_customers, dim_sellers)
+        months = aggs["monthly"]["month"].astype(str).tolist()
+
+    checks = {
+        "source version moved": new_source != old_version,
+        "refresher switched": new_version == new_source,
+        "fct_orders rebuilt": "fct_orders" in refresher.rebuilt,
+        "new month scanned": month in facts.months(),
+        "new month aggregated": month in months,
+        "no refresh error": refresher.error is None,
+    }
+    report = {
+        "rows": len(fct_orders),
+        "new_month": month,
+        "unchanged_check_s": round(unchanged_s, 4),
+        "revalidate_s": round(revalidate_s, 3),
+        "rebuilt": refresher.rebuilt,
+        "checks": checks,
+    }
+    print(
+        f"{len(fct_orders):,} rows; added month={month}; revalidated in "
+        f"{revalidate_s:.2f} s (unchanged check {unchanged_s * 1000:.1f} ms)"
+    )
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
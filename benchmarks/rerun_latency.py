@@ -0,0 +1,142 @@
+"""
+Rerun latency of the dashboard, driven headlessly with Streamlit's AppTest
+Runs streamlit_app.py against local Parquet files (OLIST_DATA_DIR) instead
+of Databricks, scripts the interactions a user makes and records how long
+each rerun takes. Every st.tabs body runs on every rerun, so opening the
+app covers all tabs; widget changes are what trigger the later reruns.
+
+Usage:
+    python -m benchmarks.rerun_latency --scale 1
+    python -m benchmarks.rerun_latency --data-dir data/synthetic --mode aggregates
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from app.synthetic import generate_tables, write_aggregates, write_parquet
+
+APP_FILE = str(Path(__file__).resolve().parent.parent / "streamlit_app.py")
+PERCENTILES = [50, 90, 95, 99]
+
+
+def write_local_data(out_dir, scale: float, seed: int):
+    """Write synthetic Gold tables plus their agg_* tables as Parquet."""
+    tables = generate_tables(scale, seed)
+    write_parquet(tables, out_dir)
+    write_aggregates(tables, out_dir)
+
+
+def _widget(widgets, label):
+    """The widget of a kind with a given label."""
+    return next(w for w in widgets if w.label == label)
+
+
+class Session:
+    """One AppTest session that times every rerun under an interaction name."""
+
+    def __init__(self, timeout: float):
+        self.at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.latencies = {}
+
+    def run(self, interaction: str, widget=None):
+        start = time.perf_counter()
+        (widget or self.at).run()
+        elapsed = time.perf_counter() - start
+        if self.at.exception:
+            raise RuntimeError(f"{interaction}: {self.at.exception[0].message}")
+        self.latencies.setdefault(interaction, []).append(elapsed)
+
+    def cycle(self, interaction: str, kind: str, label: str, steps: int):
+        """Select up to `steps` options of a selectbox, one rerun each."""
+        options = _widget(getattr(self.at, kind), label).options
+        for option in options[-steps:]:
+            self.run(interaction, _widget(getattr(self.at, kind), label).select(option))
+
+
+def script(session: Session, steps: int, aggregates_only: bool):
+    """The scripted user journey."""
+    at = session.at
+    session.run("open (cold)")
+    for _ in range(steps):
+        session.run("open (warm)")
+
+    session.cycle("analytics category", "selectbox", "🏷️ Filter Category", steps)
+
+    if aggregates_only:
+        session.run(
+            "load row-level data", _widget(at.button, "📥 Load row-level data").click()
+        )
+
+    session.cycle("query month", "selectbox", "Select Month", steps)
+    session.cycle("query category", "selectbox", "Select Category", steps)
+    session.cycle("query state", "selectbox", "Select State", steps)
+    session.cycle("customer drill-down", "selectbox", "Select Customer", steps)
+    for prefix in ["a", "ab", "abc", "sao", "be"][:steps]:
+        session.run("search", _widget(at.text_input, "Starts with").input(prefix))
+
+
+def summarize(latencies: dict) -> dict:
+    """Count, percentiles and max (ms) per interaction."""
+    summary = {}
+    for interaction, values in latencies.items():
+        ms = np.array(values) * 1000
+        summary[interaction] = {
+            "runs": len(ms),
+            **{f"p{p}_ms": round(float(np.percentile(ms, p)), 1) for p in PERCENTILES},
+            "max_ms": round(float(ms.max()), 1),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--data-dir", help="existing Parquet directory (default: generate)"
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", choices=["full", "aggregates"], default="full")
+    parser.add_argument("--steps", type=int, default=10, help="reruns per interaction")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", default="benchmarks/results/rerun_latency.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if not data_dir:
+            data_dir = tmp
+            write_local_data(data_dir, args.scale, args.seed)
+        os.environ["OLIST_DATA_DIR"] = str(data_dir)
+        os.environ["OLIST_DASHBOARD_MODE"] = args.mode
+
+        session = Session(args.timeout)
+        script(session, args.steps, args.mode == "aggregates")
+
+    summary = summarize(session.latencies)
+    for interaction, stats in summary.items():
+        print(
+            f"{interaction:22} n={stats['runs']:<3} p50 {stats['p50_ms']:8.1f} ms  "
+            f"p95 {stats['p95_ms']:8.1f} ms  max {stats['max_ms']:8.1f} ms"
+        )
+
+    report = {
+        "data_dir": args.data_dir,
+        "scale": None if args.data_dir else args.scale,
+        "mode": args.mode,
+        "interactions": summary,
+    }
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Before/after comparison of the dim_sellers aggregate
+The old query joined order_items to reviews on order_id before grouping,
+fanning out multi-item and multi-review orders; the new one pre-aggregates
+both sides to one row per order. Reports join size, runtime and shuffle/
+spill metrics of each, and how much avg_review_score (and seller_tier) moves.
+
+Usage:
+    python -m benchmarks.seller_fanout
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.database import connect
+from benchmarks.warehouse import run_query
+
+OLD_SELLER_AGG = """
+SELECT oi.seller_id, COUNT(DISTINCT oi.order_id) AS total_orders,
+       SUM(oi.price) AS total_revenue, AVG(r.review_score) AS avg_review_score
+FROM olist_silver.order_items oi
+LEFT JOIN olist_silver.reviews r ON oi.order_id = r.order_id
+GROUP BY oi.seller_id
+"""
+
+NEW_SELLER_AGG = """
+SELECT so.seller_id, COUNT(*) AS total_orders,
+       SUM(so.revenue) AS total_revenue, AVG(r.review_score) AS avg_review_score
+FROM (
+    SELECT seller_id, order_id, SUM(price) AS revenue
+    FROM olist_silver.order_items
+    GROUP BY seller_id, order_id
+) so
+LEFT JOIN (
+    SELECT order_id, AVG(review_score) AS review_score
+    FROM olist_silver.reviews
+    GROUP BY order_id
+) r ON so.order_id = r.order_id
+GROUP BY so.seller_id
+"""
+
+JOIN_ROWS = {
+    "old": """
+SELECT COUNT(*) FROM olist_silver.order_items oi
+LEFT JOIN olist_silver.reviews r ON oi.order_id = r.order_id
+""",
+    "new": """
+SELECT COUNT(*) FROM (
+    SELECT DISTINCT seller_id, order_id FROM olist_silver.order_items
+) so
+LEFT JOIN (SELECT DISTINCT order_id FROM olist_silver.reviews) r
+    ON so.order_id = r.order_id
+""",
+}
+
+TIER = """CASE
+    WHEN {0} >= 4.5 THEN 'Platinum' WHEN {0} >= 4.0 THEN 'Gold'
+    WHEN {0} >= 3.0 THEN 'Silver' ELSE 'Bronze' END"""
+
+SCORE_DIFF = f"""
+SELECT
+    COUNT(*) AS sellers,
+    AVG(ABS(n.avg_review_score - o.avg_review_score)) AS mean_abs_diff,
+    MAX(ABS(n.avg_review_score - o.avg_review_score)) AS max_abs_diff,
+    SUM(CASE WHEN {TIER.format("n.avg_review_score")}
+             <> {TIER.format("o.avg_review_score")} THEN 1 ELSE 0 END) AS tier_changes,
+    SUM(CASE WHEN n.total_orders <> o.total_orders
+             OR ABS(n.total_revenue - o.total_revenue) > 0.01 THEN 1 ELSE 0 END)
+        AS order_or_revenue_mismatches
+FROM ({OLD_SELLER_AGG}) o
+JOIN ({NEW_SELLER_AGG}) n ON o.seller_id = n.seller_id
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default="benchmarks/results/seller_fanout.json")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    cursor = conn.cursor()
+    report = {}
+    try:
+        for name, query in (("old", OLD_SELLER_AGG), ("new", NEW_SELLER_AGG)):
+            run = run_query(cursor, query)
+            del run["result"]
+            run["join_rows"] = run_query(cursor, JOIN_ROWS[name])["result"][0][0]
+            report[name] = run
+            m = run["metrics"]
+            print(
+                f"{name}: {run['wall_s']:.2f}s, join rows {run['join_rows']:,}, "
+                f"task time {m.get('task_total_time_ms')} ms, "
+                f"network sent {m.get('network_sent_bytes')} B, "
+                f"spill {m.get('spill_to_disk_bytes')} B"
+            )
+
+        diff = run_query(cursor, SCORE_DIFF)
+        columns = [desc[0] for desc in cursor.description]
+        report["avg_review_score"] = dict(zip(columns, diff["result"][0]))
+        print(f"avg_review_score: {report['avg_review_score']}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
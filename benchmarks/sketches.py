@@ -0,0 +1,163 @@
+"""
+Accuracy and speed of the distinct-count sketches (app.sketches)
+Compares the HyperLogLog estimates of distinct orders and customers with
+exact nunique() counts for roll-ups by month, category, state and month x
+state on synthetic data, and times a filtered roll-up (one category in one
+state, by month) against the exact count over the filtered rows. Exits 1
+when any estimate is off by more than 4 x ERROR, or the mean relative
+error of a roll-up with at least 10 groups exceeds the standard error ERROR.
+
+Usage:
+    python -m benchmarks.sketches --scales 1 5
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.sketches import DIMENSIONS, ERROR, SKETCHED, DistinctSketches
+from app.synthetic import generate
+from benchmarks.engines import best_time
+
+ROLLUPS = [["month"], ["product_category_name"], ["state"], ["month", "state"], []]
+MAX_ERROR = 4 * ERROR
+# Roll-ups with fewer groups are too small a sample for their mean error
+MIN_GROUPS = 10
+
+
+def joined_rows(fct_orders, dim_customers):
+    """fct_orders with the dimensions the sketches are keyed on."""
+    return fct_orders.assign(
+        month=fct_orders["order_purchase_timestamp"].dt.strftime("%Y-%m"),
+        state=fct_orders["customer_id"].map(
+            dim_customers.set_index("customer_id")["state"]
+        ),
+    )
+
+
+def exact_rollup(rows, by):
+    """Exact distinct orders/customers per `by` group."""
+    counts = {name: (column, "nunique") for name, column in SKETCHED.items()}
+    if not by:
+        return (
+            rows.agg({column: "nunique" for column in SKETCHED.values()})
+            .rename(dict(zip(SKETCHED.values(), SKETCHED)))
+            .to_frame()
+            .T
+        )
+    return rows.groupby(by, dropna=False).agg(**counts).reset_index()
+
+
+def accuracy(sketches, rows) -> dict:
+    """Roll-up -> sketch -> (groups, mean and max relative error)."""
+    results = {}
+    for by in ROLLUPS:
+        estimated = sketches.rollup(by)
+        exact = exact_rollup(rows, by)
+        if by:
+            merged = estimated.merge(exact, on=by, suffixes=("", "_exact"))
+        else:
+            merged = estimated.join(exact.add_suffix("_exact"))
+        for name in SKETCHED:
+            error = (merged[name] / merged[f"{name}_exact"] - 1).abs()
+            results[f"{' x '.join(by) or 'total'}.{name}"] = {
+                "groups": len(merged),
+                "mean_error": round(float(error.mean()), 5),
+                "max_error": round(float(error.max()), 5),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/sketches.json")
+    args = parser.parse_args(argv)
+
+    report = {"error": ERROR, "max_error": MAX_ERROR, "scales": {}}
+    failures = []
+    for scale in args.scales:
+        fct_orders, dim_customers, _, _ = generate(scale, args.seed)
+        rows = joined_rows(fct_orders, dim_customers)
+        sketches = DistinctSketches.build(fct_orders, dim_customers)
+
+        # The busiest category and state, as a user would likely pick them
+        category = rows["product_category_name"].mode()[0]
+        state = rows["state"].mode()[0]
+
+        result = {
+            "rows": len(fct_orders),
+            "cells": len(sketches.cells),
+            "sketch_mb": round(
+                sum(df.memory_usage().sum() for df in sketches.sketches.values())
+                / 2**20,
+                2,
+            ),
+            # Defaults bind this scale's data to the timed lambdas
+            "build_s": best_time(
+                lambda fct_orders=fct_orders, dim_customers=dim_customers: (
+                    DistinctSketches.build(fct_orders, dim_customers)
+                ),
+                args.repeat,
+            ),
+            "filtered_rollup_s": best_time(
+                lambda sketches=sketches, category=category, state=state: (
+                    sketches.rollup(
+                        ["month"], product_category_name=category, state=state
+                    )
+                ),
+                args.repeat,
+            ),
+            "filtered_exact_s": best_time(
+                lambda rows=rows, category=category, state=state: exact_rollup(
+                    rows[
+                        (rows["product_category_name"] == category)
+                        & (rows["state"] == state)
+                    ],
+                    ["month"],
+                ),
+                args.repeat,
+            ),
+            "accuracy": accuracy(sketches, rows),
+        }
+        report["scales"][f"{scale:g}"] = result
+
+        print(
+            f"Scale {scale:g}x: {result['rows']:,} rows, {result['cells']:,} "
+            f"{' x '.join(DIMENSIONS)} cells, sketches {result['sketch_mb']} MB, "
+            f"built in {result['build_s'] * 1000:.0f} ms"
+        )
+        print(
+            f"  {category} in {state} by month: sketches "
+            f"{result['filtered_rollup_s'] * 1000:.1f} ms, exact "
+            f"{result['filtered_exact_s'] * 1000:.1f} ms"
+        )
+        for name, acc in result["accuracy"].items():
+            print(
+                f"  {name:38} {acc['groups']:6} groups  mean {acc['mean_error']:6.2%}"
+                f"  max {acc['max_error']:6.2%}"
+            )
+            if acc["max_error"] > MAX_ERROR or (
+                acc["groups"] >= MIN_GROUPS and acc["mean_error"] > ERROR
+            ):
+                failures.append(f"{scale:g}x {name}")
+
+    for failure in failures:
+        print(f"OUT OF BOUNDS {failure}")
+    if not failures:
+        print(
+            f"All estimates within the error bounds ({ERROR:.2%} mean, {MAX_ERROR:.2%} max)"
+        )
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
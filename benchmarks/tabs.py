@@ -0,0 +1,181 @@
+"""
+Benchmarks of each tab's data preparation on synthetic data
+Runs the pandas/NumPy side of Home/Analytics/About (the aggregate dict and
+the Home summary), Query Data (month/category/state filters, drill-down,
+prefix search) at several scale factors, with no Streamlit calls involved.
+Reports the best wall time and the peak traced memory of every computation,
+and fails when either regresses past a stored baseline by more than
+--threshold.
+
+Usage:
+    python -m benchmarks.tabs --scales 1 5
+    python -m benchmarks.tabs --save-baseline
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.aggregates import build_aggregates
+from app.cohorts import CohortRetention
+from app.drilldown import CustomerOrders
+from app.search import SearchIndex
+from app.sketches import DistinctSketches
+from app.summary import build as build_summary
+from app.synthetic import generate
+from app.timeindex import DailyIndex
+from tabs.analytics import filter_category, filter_state
+from tabs.query import category_products, month_orders, order_months, state_customers
+
+# Differences below these are noise, whatever the relative change
+MIN_TIME_DELTA_S = 0.005
+MIN_MEMORY_DELTA_MB = 1.0
+
+
+def computations(fct_orders, dim_customers, dim_products, dim_sellers):
+    """Name -> zero-argument callable for every benchmarked computation."""
+    aggs = build_aggregates(fct_orders, dim_customers, dim_sellers)
+    top_category = (
+        aggs["category"].nlargest(1, "revenue")["product_category_name"].iloc[0]
+    )
+    months = order_months(fct_orders)
+    last_month = months.max()
+    customer_orders = CustomerOrders(fct_orders, dim_customers)
+    top_customer = dim_customers.nlargest(1, "lifetime_value")[
+        "customer_unique_id"
+    ].iloc[0]
+    index = SearchIndex(fct_orders, dim_customers, dim_products)
+    sketches = DistinctSketches.build(fct_orders, dim_customers)
+    daily_index = DailyIndex(
+        aggs["daily"], aggs["daily_category"], aggs["daily_new_customers"]
+    )
+    first, last = daily_index.first, daily_index.last
+    cohorts = CohortRetention.build(fct_orders, dim_customers)
+
+    return {
+        "aggregates.build": lambda: build_aggregates(
+            fct_orders, dim_customers, dim_sellers
+        ),
+        "home.summary": lambda: build_summary(aggs),
+        "analytics.filter_category": lambda: filter_category(aggs, top_category),
+        "analytics.filter_state": lambda: filter_state(sketches, top_category, "SP"),
+        "analytics.date_range": lambda: daily_index.range_totals(
+            first, last, top_category
+        ),
+        "home.comparison": lambda: daily_index.compare(
+            "Custom vs prior period", last - (last - first) / 2, last
+        ),
+        "analytics.cohorts": lambda: cohorts.retention(),
+        "query.order_months": lambda: order_months(fct_orders),
+        "query.month_orders": lambda: month_orders(fct_orders, months, last_month),
+        "query.category_products": lambda: category_products(
+            dim_products, top_category
+        ),
+        "query.state_customers": lambda: state_customers(dim_customers, "SP"),
+        "drilldown.build": lambda: CustomerOrders(fct_orders, dim_customers),
+        "drilldown.orders": lambda: customer_orders.orders(top_customer),
+        "search.build": lambda: SearchIndex(fct_orders, dim_customers, dim_products),
+        "sketches.build": lambda: DistinctSketches.build(fct_orders, dim_customers),
+        "timeindex.build": lambda: DailyIndex(
+            aggs["daily"], aggs["daily_category"], aggs["daily_new_customers"]
+        ),
+        "cohorts.build": lambda: CohortRetention.build(fct_orders, dim_customers),
+        "search.lookup": lambda: index.search("Customer ID", "a1"),
+    }
+
+
+def measure(func, repeat: int) -> dict:
+    """Best wall time over `repeat` runs, then peak traced memory of one run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    # Traced separately: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_s": round(min(times), 5), "peak_mb": round(peak / 2**20, 2)}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Human-readable regressions of results against baseline."""
+    regressions = []
+    for scale, runs in results.items():
+        for name, run in runs.items():
+            base = baseline.get(scale, {}).get(name)
+            if base is None:
+                continue
+            for metric, floor in (
+                ("wall_s", MIN_TIME_DELTA_S),
+                ("peak_mb", MIN_MEMORY_DELTA_MB),
+            ):
+                old, new = base[metric], run[metric]
+                if new > old * (1 + threshold) and new - old > floor:
+                    regressions.append(
+                        f"{scale}x {name} {metric}: {old} -> {new} "
+                        f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)"
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/tabs.json")
+    parser.add_argument("--baseline", default="benchmarks/baselines/tabs.json")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed relative slowdown"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store results as the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scale in args.scales:
+        tables = generate(scale, args.seed)
+        print(f"Scale {scale:g}x ({len(tables[0]):,} order items)")
+        runs = {}
+        for name, func in computations(*tables).items():
+            runs[name] = measure(func, args.repeat)
+            print(
+                f"  {name:28} {runs[name]['wall_s'] * 1000:10.2f} ms "
+                f"{runs[name]['peak_mb']:10.2f} MB"
+            )
+        results[f"{scale:g}"] = runs
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline first")
+        return 0
+
+    regressions = compare(
+        results, json.loads(baseline_path.read_text()), args.threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} of {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
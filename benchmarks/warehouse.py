@@ -0,0 +1,74 @@
+"""
+Helpers for benchmarking queries on the Databricks SQL Warehouse
+Query metrics (files/bytes read and pruned, task time) come from the
+Query History API, looked up by the statement id of each query.
+"""
+
+import json
+import time
+import urllib.parse
+import urllib.request
+
+from app.config import get_setting
+
+METRIC_FIELDS = [
+    "total_time_ms",
+    "task_total_time_ms",
+    "read_files_count",
+    "pruned_files_count",
+    "read_bytes",
+    "pruned_bytes",
+    "rows_read_count",
+    "rows_produced_count",
+    "network_sent_bytes",
+    "spill_to_disk_bytes",
+]
+
+
+def query_metrics(statement_id: str, retries: int = 10) -> dict:
+    """Fetch execution metrics of one finished statement from Query History."""
+    host = get_setting("DATABRICKS_HOST").removeprefix("https://").rstrip("/")
+    params = urllib.parse.urlencode(
+        {"filter_by.statement_ids": statement_id, "include_metrics": "true"}
+    )
+    request = urllib.request.Request(
+        f"https://{host}/api/2.0/sql/history/queries?{params}",
+        headers={"Authorization": f"Bearer {get_setting('DATABRICKS_TOKEN')}"},
+    )
+
+    # History is written asynchronously, so metrics can lag the query a little
+    for _ in range(retries):
+        with urllib.request.urlopen(request) as response:
+            queries = json.load(response).get("res", [])
+        if queries and queries[0].get("metrics"):
+            metrics = queries[0]["metrics"]
+            return {field: metrics.get(field) for field in METRIC_FIELDS}
+        time.sleep(1)
+    return {}
+
+
+def run_query(cursor, query: str) -> dict:
+    """Run a query uncached and return its wall time, row count and metrics."""
+    cursor.execute("SET use_cached_result = false")
+    start = time.perf_counter()
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    wall_s = time.perf_counter() - start
+    return {
+        "wall_s": round(wall_s, 3),
+        "rows": len(rows),
+        "result": rows,
+        "metrics": query_metrics(cursor.query_id),
+    }
+
+
+def table_detail(cursor, table: str) -> dict:
+    """File count and size of a Delta table."""
+    cursor.execute(f"DESCRIBE DETAIL {table}")
+    columns = [desc[0] for desc in cursor.description]
+    detail = dict(zip(columns, cursor.fetchone()))
+    return {
+        "num_files": detail.get("numFiles"),
+        "size_bytes": detail.get("sizeInBytes"),
+        "clustering_columns": detail.get("clusteringColumns"),
+    }
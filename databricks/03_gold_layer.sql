@@ -5,9 +5,14 @@
 CREATE SCHEMA IF NOT EXISTS olist_gold;
 
 -- Fact: Orders (at order item level)
-CREATE OR REPLACE TABLE olist_gold.fct_orders AS
+-- Liquid clustering on purchase time + category so month/category filters
+-- skip files via min/max stats (see 06_maintenance.sql for OPTIMIZE)
+CREATE OR REPLACE TABLE olist_gold.fct_orders
+CLUSTER BY (order_purchase_timestamp, product_category_name)
+AS
 SELECT
     oi.order_id,
+    oi.order_item_id,
     o.customer_id,
     oi.product_id,
     o.order_purchase_date AS order_purchase_timestamp,
@@ -20,7 +25,9 @@ LEFT JOIN olist_silver.orders o ON oi.order_id = o.order_id
 LEFT JOIN olist_silver.products p ON oi.product_id = p.product_id;
 
 -- Dimension: Customers
-CREATE OR REPLACE TABLE olist_gold.dim_customers AS
+CREATE OR REPLACE TABLE olist_gold.dim_customers
+CLUSTER BY (state, customer_id)
+AS
 SELECT
     c.customer_id,
     c.customer_unique_id,
@@ -41,7 +48,9 @@ LEFT JOIN (
 ) agg ON c.customer_id = agg.customer_id;
 
 -- Dimension: Products
-CREATE OR REPLACE TABLE olist_gold.dim_products AS
+CREATE OR REPLACE TABLE olist_gold.dim_products
+CLUSTER BY (product_category_name, product_id)
+AS
 SELECT
     p.product_id,
     p.product_category AS product_category_name,
@@ -60,7 +69,9 @@ LEFT JOIN (
 ) ps ON p.product_id = ps.product_id;
 
 -- Dimension: Sellers
-CREATE OR REPLACE TABLE olist_gold.dim_sellers AS
+CREATE OR REPLACE TABLE olist_gold.dim_sellers
+CLUSTER BY (seller_id)
+AS
 SELECT
     s.seller_id,
     s.seller_city AS city,
@@ -76,9 +87,35 @@ SELECT
     END AS seller_tier
 FROM olist_silver.sellers s
 LEFT JOIN (
-    SELECT oi.seller_id, COUNT(DISTINCT oi.order_id) AS total_orders,
-           SUM(oi.price) AS total_revenue, AVG(r.review_score) AS avg_review_score
-    FROM olist_silver.order_items oi
-    LEFT JOIN olist_silver.reviews r ON oi.order_id = r.order_id
-    GROUP BY oi.seller_id
+    -- Items and reviews are both pre-aggregated to one row per order before
+    -- joining, so multi-item or multi-review orders don't fan out the join
+    -- (and each order's review counts once in avg_review_score)
+    SELECT so.seller_id, COUNT(*) AS total_orders,
+           SUM(so.revenue) AS total_revenue, AVG(r.review_score) AS avg_review_score
+    FROM (
+        SELECT seller_id, order_id, SUM(price) AS revenue
+        FROM olist_silver.order_items
+        GROUP BY seller_id, order_id
+    ) so
+    LEFT JOIN (
+        SELECT order_id, AVG(review_score) AS review_score
+        FROM olist_silver.reviews
+        GROUP BY order_id
+    ) r ON so.order_id = r.order_id
+    GROUP BY so.seller_id
 ) agg ON s.seller_id = agg.seller_id;
+
+-- Review score per order as dim_sellers averages it; 04_gold_incremental.sql
+-- compares Silver with it to find the sellers whose reviews changed
+CREATE OR REPLACE TABLE olist_gold.order_review_scores AS
+SELECT order_id, AVG(review_score) AS review_score
+FROM olist_silver.reviews
+GROUP BY order_id;
+
+-- Watermark for 04_gold_incremental.sql: a full rebuild covers everything
+CREATE OR REPLACE TABLE olist_gold.pipeline_watermarks AS
+SELECT
+    'fct_orders' AS table_name,
+    MAX(order_purchase_timestamp) AS watermark,
+    current_timestamp() AS updated_at
+FROM olist_gold.fct_orders;
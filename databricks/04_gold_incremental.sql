@@ -0,0 +1,274 @@
+-- ============================================
+-- GOLD LAYER (INCREMENTAL): MERGE Only What Changed
+-- ============================================
+-- Run after 02_silver_layer.sql instead of 03_gold_layer.sql once the Gold
+-- tables exist. Order items purchased after the stored watermark (minus a
+-- lookback for late-arriving items) are merged into fct_orders, and only
+-- the customers, products and sellers they touch are re-aggregated, along
+-- with customers and sellers whose Silver attributes changed and sellers of
+-- orders whose reviews changed, however old the order.
+-- Not detected: changed items of orders older than the lookback, product
+-- category moves (fct_orders keeps the old category on older rows) and rows
+-- deleted from the customer/seller/product tables. Schedule the full
+-- rebuild (03) to pick those up, e.g. weekly.
+-- 03_gold_layer.sql stays the full rebuild and resets the watermark; the
+-- agg_* tables come from 05_gold_aggregates.sql after either one.
+
+CREATE TABLE IF NOT EXISTS olist_gold.pipeline_watermarks (
+    table_name STRING,
+    watermark TIMESTAMP,
+    updated_at TIMESTAMP
+);
+
+-- Built by 03_gold_layer.sql; when missing, every review counts as changed
+CREATE TABLE IF NOT EXISTS olist_gold.order_review_scores (
+    order_id STRING,
+    review_score DOUBLE
+);
+
+DECLARE OR REPLACE VARIABLE lookback_days INT DEFAULT 3;
+DECLARE OR REPLACE VARIABLE gold_watermark TIMESTAMP;
+
+SET VAR gold_watermark = TIMESTAMPADD(
+    DAY,
+    -lookback_days,
+    COALESCE(
+        (SELECT MAX(watermark) FROM olist_gold.pipeline_watermarks
+         WHERE table_name = 'fct_orders'),
+        TIMESTAMP '1970-01-01'
+    )
+);
+
+-- Staging: order items inside the incremental window
+CREATE OR REPLACE TABLE olist_gold.stg_changed_order_items AS
+SELECT
+    oi.order_id,
+    oi.order_item_id,
+    o.customer_id,
+    oi.product_id,
+    oi.seller_id,
+    o.order_purchase_date AS order_purchase_timestamp,
+    p.product_category AS product_category_name,
+    oi.price,
+    oi.freight_value,
+    (oi.price + oi.freight_value) AS total_order_value
+FROM olist_silver.order_items oi
+JOIN olist_silver.orders o ON oi.order_id = o.order_id
+LEFT JOIN olist_silver.products p ON oi.product_id = p.product_id
+WHERE o.order_purchase_date > gold_watermark;
+
+-- Staging: orders whose review score differs from the one last merged
+-- (new, changed or removed reviews), however old the order
+CREATE OR REPLACE TABLE olist_gold.stg_changed_reviews AS
+SELECT
+    COALESCE(s.order_id, g.order_id) AS order_id,
+    s.review_score,
+    s.order_id IS NULL AS removed
+FROM (
+    SELECT order_id, AVG(review_score) AS review_score
+    FROM olist_silver.reviews
+    GROUP BY order_id
+) s
+FULL OUTER JOIN olist_gold.order_review_scores g ON s.order_id = g.order_id
+WHERE s.order_id IS NULL OR g.order_id IS NULL OR NOT (s.review_score <=> g.review_score);
+
+-- Staging: dimension keys to re-aggregate (captured before the fact MERGE
+-- so items deleted inside the window still refresh their customer/product).
+-- fct_orders has no seller_id, so the sellers of deleted items are found
+-- through their products: every seller of a product in the window.
+CREATE OR REPLACE TABLE olist_gold.stg_affected_keys AS
+SELECT 'customer' AS key_type, customer_id AS key FROM olist_gold.stg_changed_order_items
+UNION
+SELECT 'customer', customer_id FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp > gold_watermark
+UNION
+-- Customers whose attributes changed in Silver
+SELECT 'customer', c.customer_id FROM olist_silver.customers c
+JOIN olist_gold.dim_customers d ON c.customer_id = d.customer_id
+WHERE NOT (
+    c.customer_unique_id <=> d.customer_unique_id
+    AND c.customer_zip_code_prefix <=> d.zip_code
+    AND c.customer_city <=> d.city
+    AND c.customer_state <=> d.state
+)
+UNION
+SELECT 'product', product_id FROM olist_gold.stg_changed_order_items
+UNION
+SELECT 'product', product_id FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp > gold_watermark
+UNION
+SELECT 'seller', seller_id FROM olist_gold.stg_changed_order_items
+UNION
+SELECT 'seller', oi.seller_id FROM olist_silver.order_items oi
+WHERE oi.product_id IN (
+    SELECT product_id FROM olist_gold.fct_orders
+    WHERE order_purchase_timestamp > gold_watermark
+)
+UNION
+-- Sellers of orders whose reviews changed (avg_review_score, seller_tier)
+SELECT 'seller', oi.seller_id FROM olist_silver.order_items oi
+WHERE oi.order_id IN (SELECT order_id FROM olist_gold.stg_changed_reviews)
+UNION
+-- Sellers whose attributes changed in Silver
+SELECT 'seller', s.seller_id FROM olist_silver.sellers s
+JOIN olist_gold.dim_sellers d ON s.seller_id = d.seller_id
+WHERE NOT (s.seller_city <=> d.city AND s.seller_state <=> d.state);
+
+-- Fact: Orders
+MERGE INTO olist_gold.fct_orders t
+USING olist_gold.stg_changed_order_items s
+    ON t.order_id = s.order_id AND t.order_item_id = s.order_item_id
+WHEN MATCHED THEN UPDATE SET
+    t.customer_id = s.customer_id,
+    t.product_id = s.product_id,
+    t.order_purchase_timestamp = s.order_purchase_timestamp,
+    t.product_category_name = s.product_category_name,
+    t.price = s.price,
+    t.freight_value = s.freight_value,
+    t.total_order_value = s.total_order_value
+WHEN NOT MATCHED THEN INSERT (
+    order_id, order_item_id, customer_id, product_id, order_purchase_timestamp,
+    product_category_name, price, freight_value, total_order_value
+) VALUES (
+    s.order_id, s.order_item_id, s.customer_id, s.product_id, s.order_purchase_timestamp,
+    s.product_category_name, s.price, s.freight_value, s.total_order_value
+)
+WHEN NOT MATCHED BY SOURCE AND t.order_purchase_timestamp > gold_watermark THEN DELETE;
+
+-- Dimension: Customers (affected + newly arrived)
+MERGE INTO olist_gold.dim_customers t
+USING (
+    SELECT
+        c.customer_id,
+        c.customer_unique_id,
+        c.customer_zip_code_prefix AS zip_code,
+        c.customer_city AS city,
+        c.customer_state AS state,
+        COALESCE(agg.total_orders, 0) AS total_orders,
+        COALESCE(agg.lifetime_value, 0) AS lifetime_value,
+        CASE
+            WHEN agg.total_orders > 1 THEN 'Returning'
+            WHEN agg.total_orders = 1 THEN 'One-time'
+            ELSE 'No Orders'
+        END AS customer_type
+    FROM olist_silver.customers c
+    LEFT JOIN (
+        SELECT customer_id, COUNT(DISTINCT order_id) AS total_orders, SUM(price) AS lifetime_value
+        FROM olist_gold.fct_orders
+        WHERE customer_id IN (
+            SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'customer'
+        )
+        GROUP BY customer_id
+    ) agg ON c.customer_id = agg.customer_id
+    WHERE c.customer_id IN (
+        SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'customer'
+    )
+    OR NOT EXISTS (
+        SELECT 1 FROM olist_gold.dim_customers d WHERE d.customer_id = c.customer_id
+    )
+) s ON t.customer_id = s.customer_id
+WHEN MATCHED THEN UPDATE SET *
+WHEN NOT MATCHED THEN INSERT *;
+
+-- Dimension: Products (affected + newly arrived)
+MERGE INTO olist_gold.dim_products t
+USING (
+    SELECT
+        p.product_id,
+        p.product_category AS product_category_name,
+        COALESCE(ps.times_sold, 0) AS times_sold,
+        COALESCE(ps.total_revenue, 0) AS total_revenue,
+        CASE
+            WHEN ps.times_sold >= 50 THEN 'High Seller'
+            WHEN ps.times_sold >= 10 THEN 'Medium Seller'
+            WHEN ps.times_sold >= 1 THEN 'Low Seller'
+            ELSE 'Never Sold'
+        END AS sales_tier
+    FROM olist_silver.products p
+    LEFT JOIN (
+        SELECT product_id, COUNT(*) AS times_sold, SUM(price) AS total_revenue
+        FROM olist_silver.order_items
+        WHERE product_id IN (
+            SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'product'
+        )
+        GROUP BY product_id
+    ) ps ON p.product_id = ps.product_id
+    WHERE p.product_id IN (
+        SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'product'
+    )
+    OR NOT EXISTS (
+        SELECT 1 FROM olist_gold.dim_products d WHERE d.product_id = p.product_id
+    )
+) s ON t.product_id = s.product_id
+WHEN MATCHED THEN UPDATE SET *
+WHEN NOT MATCHED THEN INSERT *;
+
+-- Dimension: Sellers (affected + newly arrived)
+MERGE INTO olist_gold.dim_sellers t
+USING (
+    SELECT
+        s.seller_id,
+        s.seller_city AS city,
+        s.seller_state AS state,
+        COALESCE(agg.total_orders, 0) AS total_orders,
+        COALESCE(agg.total_revenue, 0) AS total_revenue,
+        agg.avg_review_score,
+        CASE
+            WHEN agg.avg_review_score >= 4.5 THEN 'Platinum'
+            WHEN agg.avg_review_score >= 4.0 THEN 'Gold'
+            WHEN agg.avg_review_score >= 3.0 THEN 'Silver'
+            ELSE 'Bronze'
+        END AS seller_tier
+    FROM olist_silver.sellers s
+    LEFT JOIN (
+        -- Same order-level pre-aggregation as 03_gold_layer.sql
+        SELECT so.seller_id, COUNT(*) AS total_orders,
+               SUM(so.revenue) AS total_revenue, AVG(r.review_score) AS avg_review_score
+        FROM (
+            SELECT seller_id, order_id, SUM(price) AS revenue
+            FROM olist_silver.order_items
+            WHERE seller_id IN (
+                SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'seller'
+            )
+            GROUP BY seller_id, order_id
+        ) so
+        LEFT JOIN (
+            SELECT order_id, AVG(review_score) AS review_score
+            FROM olist_silver.reviews
+            GROUP BY order_id
+        ) r ON so.order_id = r.order_id
+        GROUP BY so.seller_id
+    ) agg ON s.seller_id = agg.seller_id
+    WHERE s.seller_id IN (
+        SELECT key FROM olist_gold.stg_affected_keys WHERE key_type = 'seller'
+    )
+    OR NOT EXISTS (
+        SELECT 1 FROM olist_gold.dim_sellers d WHERE d.seller_id = s.seller_id
+    )
+) src ON t.seller_id = src.seller_id
+WHEN MATCHED THEN UPDATE SET *
+WHEN NOT MATCHED THEN INSERT *;
+
+-- Record the review scores dim_sellers now reflects
+MERGE INTO olist_gold.order_review_scores t
+USING olist_gold.stg_changed_reviews s ON t.order_id = s.order_id
+WHEN MATCHED AND s.removed THEN DELETE
+WHEN MATCHED THEN UPDATE SET t.review_score = s.review_score
+WHEN NOT MATCHED AND NOT s.removed THEN INSERT (order_id, review_score)
+VALUES (s.order_id, s.review_score);
+
+-- Advance the watermark (never backwards)
+MERGE INTO olist_gold.pipeline_watermarks t
+USING (
+    SELECT 'fct_orders' AS table_name, MAX(order_purchase_timestamp) AS watermark
+    FROM olist_gold.stg_changed_order_items
+) s ON t.table_name = s.table_name
+WHEN MATCHED AND s.watermark > COALESCE(t.watermark, TIMESTAMP '1970-01-01') THEN UPDATE SET
+    t.watermark = s.watermark,
+    t.updated_at = current_timestamp()
+WHEN NOT MATCHED AND s.watermark IS NOT NULL THEN INSERT (table_name, watermark, updated_at)
+VALUES (s.table_name, s.watermark, current_timestamp());
+
+DROP TABLE IF EXISTS olist_gold.stg_changed_order_items;
+DROP TABLE IF EXISTS olist_gold.stg_changed_reviews;
+DROP TABLE IF EXISTS olist_gold.stg_affected_keys;
@@ -0,0 +1,137 @@
+-- ============================================
+-- DASHBOARD AGGREGATES: Small Tables for Home & Analytics
+-- ============================================
+-- Run after 03_gold_layer.sql or 04_gold_incremental.sql, whichever built
+-- the Gold tables: the one definition of the aggregates for both. They are
+-- rebuilt whole since they are tiny and their distinct counts cannot be
+-- patched per row.
+-- Loaded instead of the item-level tables when OLIST_DASHBOARD_MODE=aggregates
+
+-- Headline KPIs (single row)
+CREATE OR REPLACE TABLE olist_gold.agg_kpis AS
+SELECT
+    f.total_revenue,
+    f.total_orders,
+    f.total_items,
+    c.total_customers,
+    s.avg_rating,
+    s.total_sellers,
+    f.first_purchase,
+    f.last_purchase
+FROM (
+    SELECT
+        SUM(total_order_value) AS total_revenue,
+        COUNT(DISTINCT order_id) AS total_orders,
+        COUNT(*) AS total_items,
+        MIN(order_purchase_timestamp) AS first_purchase,
+        MAX(order_purchase_timestamp) AS last_purchase
+    FROM olist_gold.fct_orders
+) f
+CROSS JOIN (
+    SELECT COUNT(DISTINCT customer_id) AS total_customers FROM olist_gold.dim_customers
+) c
+CROSS JOIN (
+    SELECT AVG(avg_review_score) AS avg_rating, COUNT(*) AS total_sellers
+    FROM olist_gold.dim_sellers
+) s;
+
+-- Revenue & orders by month
+CREATE OR REPLACE TABLE olist_gold.agg_monthly AS
+SELECT
+    DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM') AS month,
+    SUM(total_order_value) AS revenue,
+    COUNT(DISTINCT order_id) AS orders
+FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp IS NOT NULL
+GROUP BY DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM');
+
+-- Revenue & orders by month and category
+CREATE OR REPLACE TABLE olist_gold.agg_monthly_category AS
+SELECT
+    DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM') AS month,
+    product_category_name,
+    SUM(total_order_value) AS revenue,
+    COUNT(DISTINCT order_id) AS orders
+FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp IS NOT NULL AND product_category_name IS NOT NULL
+GROUP BY DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM'), product_category_name;
+
+-- Revenue, freight, items & orders by day (date-range prefix sums, app/timeindex.py)
+CREATE OR REPLACE TABLE olist_gold.agg_daily AS
+SELECT
+    DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM-dd') AS day,
+    SUM(total_order_value) AS revenue,
+    SUM(freight_value) AS freight,
+    COUNT(*) AS items,
+    COUNT(DISTINCT order_id) AS orders
+FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp IS NOT NULL
+GROUP BY DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM-dd');
+
+-- The same by day and category
+CREATE OR REPLACE TABLE olist_gold.agg_daily_category AS
+SELECT
+    DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM-dd') AS day,
+    product_category_name,
+    SUM(total_order_value) AS revenue,
+    SUM(freight_value) AS freight,
+    COUNT(*) AS items,
+    COUNT(DISTINCT order_id) AS orders
+FROM olist_gold.fct_orders
+WHERE order_purchase_timestamp IS NOT NULL AND product_category_name IS NOT NULL
+GROUP BY DATE_FORMAT(order_purchase_timestamp, 'yyyy-MM-dd'), product_category_name;
+
+-- People by the day of their first purchase (new customers per period)
+CREATE OR REPLACE TABLE olist_gold.agg_daily_new_customers AS
+SELECT DATE_FORMAT(first_purchase, 'yyyy-MM-dd') AS day, COUNT(*) AS customers
+FROM (
+    SELECT c.customer_unique_id, MIN(f.order_purchase_timestamp) AS first_purchase
+    FROM olist_gold.fct_orders f
+    JOIN olist_gold.dim_customers c ON f.customer_id = c.customer_id
+    GROUP BY c.customer_unique_id
+) p
+WHERE first_purchase IS NOT NULL
+GROUP BY DATE_FORMAT(first_purchase, 'yyyy-MM-dd');
+
+-- Revenue & orders by category (top-N comes from ordering this)
+CREATE OR REPLACE TABLE olist_gold.agg_category AS
+SELECT
+    product_category_name,
+    SUM(total_order_value) AS revenue,
+    COUNT(DISTINCT order_id) AS orders
+FROM olist_gold.fct_orders
+WHERE product_category_name IS NOT NULL
+GROUP BY product_category_name;
+
+-- All customers by state
+CREATE OR REPLACE TABLE olist_gold.agg_state_customers AS
+SELECT state, COUNT(*) AS customers
+FROM olist_gold.dim_customers
+WHERE state IS NOT NULL
+GROUP BY state;
+
+-- Customers with at least one order, by state
+CREATE OR REPLACE TABLE olist_gold.agg_state_buyers AS
+SELECT c.state, COUNT(*) AS customers
+FROM (SELECT DISTINCT customer_id FROM olist_gold.fct_orders) f
+JOIN olist_gold.dim_customers c ON f.customer_id = c.customer_id
+WHERE c.state IS NOT NULL
+GROUP BY c.state;
+
+-- Customers with at least one order, by category and state
+CREATE OR REPLACE TABLE olist_gold.agg_category_state_buyers AS
+SELECT f.product_category_name, c.state, COUNT(*) AS customers
+FROM (
+    SELECT DISTINCT product_category_name, customer_id
+    FROM olist_gold.fct_orders
+    WHERE product_category_name IS NOT NULL
+) f
+JOIN olist_gold.dim_customers c ON f.customer_id = c.customer_id
+WHERE c.state IS NOT NULL
+GROUP BY f.product_category_name, c.state;
+
+-- Sellers by performance tier
+CREATE OR REPLACE TABLE olist_gold.agg_seller_tiers AS
+SELECT seller_tier, COUNT(*) AS sellers
+FROM olist_gold.dim_sellers
+GROUP BY seller_tier;
@@ -0,0 +1,16 @@
+-- ============================================
+-- MAINTENANCE: Clustering & Statistics
+-- ============================================
+-- Run after 05_gold_aggregates.sql.
+-- OPTIMIZE incrementally re-clusters new files on the CLUSTER BY keys;
+-- ANALYZE refreshes the column statistics used for file skipping and joins.
+
+OPTIMIZE olist_gold.fct_orders;
+OPTIMIZE olist_gold.dim_customers;
+OPTIMIZE olist_gold.dim_products;
+OPTIMIZE olist_gold.dim_sellers;
+
+ANALYZE TABLE olist_gold.fct_orders COMPUTE STATISTICS FOR ALL COLUMNS;
+ANALYZE TABLE olist_gold.dim_customers COMPUTE STATISTICS FOR ALL COLUMNS;
+ANALYZE TABLE olist_gold.dim_products COMPUTE STATISTICS FOR ALL COLUMNS;
+ANALYZE TABLE olist_gold.dim_sellers COMPUTE STATISTICS FOR ALL COLUMNS;
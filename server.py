@@ -0,0 +1,17 @@
+"""
+Production entry point for the Olist Analytics Dashboard
+`streamlit run server.py` serves streamlit_app.py as usual, but warms every
+cache as the server starts and exposes GET /api/ready for the load
+balancer's readiness probe (app.warmup).
+"""
+
+import streamlit as st
+from starlette.routing import Route
+
+from app import warmup
+
+app = st.App(
+    "streamlit_app.py",
+    lifespan=warmup.lifespan,
+    routes=[Route("/api/ready", warmup.ready)],
+)
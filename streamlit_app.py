@@ -4,10 +4,22 @@ Streamlit app for e-commerce data visualization
 """
 
 import streamlit as st
-import pandas as pd
 
+from app import profiling, refresh, summary
+from app.profiling import timed
 from app.styles import inject_css
-from app.database import load_data
+from app.aggregates import get_aggregates
+from app.cohorts import get_cohorts
+from app.database import (
+    connector_errors,
+    dashboard_mode,
+    load_aggregates,
+    load_data,
+    load_dimensions,
+)
+from app.refresh import get_data_version
+from app.sketches import distinct_mode, get_sketches
+from app.timeindex import get_daily_index
 from tabs import home, engineering, analytics, query, about
 
 
@@ -19,37 +31,117 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# Opt-in timing breakdown (OLIST_PROFILE=1 or ?profile)
+profiling.start()
+
 # Inject custom CSS
 inject_css()
 
-# Load data from Databricks
+# Tab navigation
+tab_home, tab_engineering, tab_analytics, tab_query, tab_about = st.tabs(
+    ["🏠 HOME", "🔧 DATA ENGINEERING", "📊 ANALYTICS", "🔍 QUERY DATA", "👤 ABOUT"]
+)
+
+# First paint: Home renders from the precomputed summary (app.summary) before
+# any Gold table is touched, whatever the size of fct_orders
+try:
+    refresh.pin()
+    data_version = get_data_version()
+    home_summary = summary.load(data_version)
+except (*connector_errors(), OSError, ValueError) as e:
+    st.error(f"Connection Error: {e}")
+    st.stop()
+
+if home_summary is not None:
+    with tab_home, timed("tab", "home"):
+        home_comparison = home.render(home_summary)
+
+# Load data from Databricks. In "aggregates" mode only the small agg_* tables
+# are fetched up front; the item-level tables wait for the Query Data tab. In
+# "out_of_core" mode fct_orders is scanned from partitioned Parquet on demand.
+# Every load is keyed on the version this rerun is pinned to; a background
+# refresher warms the next version before reruns switch to it (app.refresh).
+mode = dashboard_mode()
+aggregates_only = mode == "aggregates"
+facts = None
+# Distinct-count sketches for the Analytics roll-ups, need the row-level data
+sketches = None
+# Cohort retention, also from the row-level data
+cohorts = None
+approximate = distinct_mode() == "approximate" and not aggregates_only
 try:
-    fct_orders, dim_customers, dim_products, dim_sellers = load_data()
-    fct_orders["order_purchase_timestamp"] = pd.to_datetime(
-        fct_orders["order_purchase_timestamp"]
-    )
+    if aggregates_only:
+        aggs = load_aggregates(data_version)
+    elif mode == "out_of_core":
+        # pyarrow.dataset is only imported in this mode
+        from app.outofcore import (
+            fact_dataset_path,
+            get_dataset_aggregates,
+            get_dataset_cohorts,
+            get_dataset_sketches,
+            get_fact_dataset,
+        )
+
+        facts = get_fact_dataset(fact_dataset_path(), data_version)
+        fct_orders = None
+        dim_customers, dim_products, dim_sellers = load_dimensions(data_version)
+        aggs = get_dataset_aggregates(data_version, facts, dim_customers, dim_sellers)
+        cohorts = get_dataset_cohorts(data_version, facts, dim_customers)
+        if approximate:
+            sketches = get_dataset_sketches(data_version, facts, dim_customers)
+    else:
+        fct_orders, dim_customers, dim_products, dim_sellers = load_data(data_version)
+        aggs = get_aggregates(data_version, fct_orders, dim_customers, dim_sellers)
+        cohorts = get_cohorts(data_version, fct_orders, dim_customers)
+        if approximate:
+            sketches = get_sketches(data_version, fct_orders, dim_customers)
+    # Prefix sums for the date-range KPIs, from the daily aggregates
+    daily_index = get_daily_index(data_version, aggs)
 except Exception as e:
     st.error(f"Connection Error: {e}")
     st.stop()
 
+# Frames this rerun holds, for the OLIST_PROFILE=memory panel
+held = {f"agg_{name}": df for name, df in aggs.items()}
 
-# Tab navigation
-tab_home, tab_engineering, tab_analytics, tab_query, tab_about = st.tabs(
-    ["🏠 HOME", "🔧 DATA ENGINEERING", "📊 ANALYTICS", "🔍 QUERY DATA", "👤 ABOUT"]
-)
+# Render each tab; Home only if the summary was not built yet
+if home_summary is None:
+    with tab_home, timed("tab", "home"):
+        home_comparison = home.render(summary.publish(data_version, aggs))
 
-# Render each tab
-with tab_home:
-    home.render(fct_orders, dim_customers, dim_sellers)
+# The period comparison fills its slot on Home once the index is loaded
+with home_comparison, timed("tab", "home.comparison"):
+    home.render_comparison(daily_index)
 
-with tab_engineering:
+with tab_engineering, timed("tab", "engineering"):
     engineering.render()
 
-with tab_analytics:
-    analytics.render(fct_orders, dim_customers, dim_sellers)
+with tab_analytics, timed("tab", "analytics"):
+    analytics.render(aggs, sketches, daily_index, cohorts)
+
+with tab_query, timed("tab", "query"):
+    if not aggregates_only:
+        query.render(fct_orders, dim_products, dim_customers, facts)
+        held.update(
+            fct_orders=fct_orders,
+            dim_customers=dim_customers,
+            dim_products=dim_products,
+            dim_sellers=dim_sellers,
+        )
+    else:
+        if not st.session_state.get("row_data_loaded"):
+            st.info("Row-level queries need the full Gold tables, loaded on demand.")
+            st.session_state["row_data_loaded"] = st.button("📥 Load row-level data")
+        if st.session_state["row_data_loaded"]:
+            fct_orders, dim_customers, dim_products, _ = load_data(data_version)
+            query.render(fct_orders, dim_products, dim_customers)
+            held.update(
+                fct_orders=fct_orders,
+                dim_customers=dim_customers,
+                dim_products=dim_products,
+            )
 
-with tab_query:
-    query.render(fct_orders, dim_products, dim_customers)
+with tab_about, timed("tab", "about"):
+    about.render(aggs)
 
-with tab_about:
-    about.render(fct_orders)
+profiling.finish(held)
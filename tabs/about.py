@@ -2,10 +2,11 @@
 About tab component
 """
 
+import pandas as pd
 import streamlit as st
 
 
-def render(fct_orders):
+def render(aggs):
     """Render the About tab with project info."""
     st.markdown(
         """
@@ -22,8 +23,9 @@ def render(fct_orders):
 
     with col1:
         # Dataset info
-        min_date = fct_orders["order_purchase_timestamp"].min().strftime("%b %Y")
-        max_date = fct_orders["order_purchase_timestamp"].max().strftime("%b %Y")
+        kpis = aggs["kpis"].iloc[0]
+        min_date = pd.Timestamp(kpis["first_purchase"]).strftime("%b %Y")
+        max_date = pd.Timestamp(kpis["last_purchase"]).strftime("%b %Y")
 
         st.markdown(
             f"""
@@ -35,8 +37,8 @@ def render(fct_orders):
             </p>
             <div style="display: flex; gap: 1.5rem; margin-top: 0.75rem;">
                 <div><span style="color: #888;">📅</span> <strong style="color: white;">{min_date} - {max_date}</strong></div>
-                <div><span style="color: #888;">📦</span> <strong style="color: white;">{fct_orders['order_id'].nunique():,}</strong> orders</div>
-                <div><span style="color: #888;">🗂️</span> <strong style="color: white;">{len(fct_orders):,}</strong> records</div>
+                <div><span style="color: #888;">📦</span> <strong style="color: white;">{kpis['total_orders']:,}</strong> orders</div>
+                <div><span style="color: #888;">🗂️</span> <strong style="color: white;">{kpis['total_items']:,}</strong> records</div>
             </div>
         </div>
         """,
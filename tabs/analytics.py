@@ -2,14 +2,45 @@
 Analytics tab component
 """
 
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from app.profiling import timed
+from app.sketches import ERROR, SPARSE_LIMIT
+from app.utils import fmt_curr, fmt_num
 
+ALL_STATES = "All States"
 
-def render(fct_orders, dim_customers, dim_sellers):
-    """Render the Analytics tab with interactive charts."""
+
+def filter_category(aggs, category):
+    """Monthly revenue/orders and buyers by state for one category (or all)."""
+    if category == "All Categories":
+        return aggs["monthly"], aggs["state_buyers"]
+    monthly = aggs["monthly_category"]
+    buyers = aggs["category_state_buyers"]
+    return (
+        monthly[monthly["product_category_name"] == category],
+        buyers[buyers["product_category_name"] == category],
+    )
+
+
+def filter_state(sketches, category, state):
+    """Monthly revenue and estimated orders of one category (or all) in one state."""
+    filters = {"state": state}
+    if category != "All Categories":
+        filters["product_category_name"] = category
+    return sketches.rollup(["month"], **filters)
+
+
+def render(aggs, sketches=None, daily_index=None, cohorts=None):
+    """Render the Analytics tab with interactive charts.
+
+    With sketches (app.sketches, OLIST_DISTINCT_COUNTS=approximate) the
+    monthly chart can also be filtered by customer state. With daily_index
+    (app.timeindex) a date-range slider shows the KPIs of any period, and
+    with cohorts (app.cohorts) a heatmap shows repeat purchases by cohort.
+    """
     st.markdown(
         """
     <div class="hero-header" style="background: linear-gradient(135deg, #10b981 0%, #06b6d4 50%, #3b82f6 100%);">
@@ -21,16 +52,24 @@ def render(fct_orders, dim_customers, dim_sellers):
     )
 
     # Filter
-    col1, col2 = st.columns([1, 3])
+    col1, col2, _ = st.columns([1, 1, 2])
     with col1:
         cats = ["All Categories"] + sorted(
-            fct_orders["product_category_name"].dropna().unique().tolist()
+            aggs["category"]["product_category_name"].tolist()
         )
         sel_cat = st.selectbox("🏷️ Filter Category", cats)
+    sel_state = ALL_STATES
+    if sketches is not None:
+        with col2:
+            states = sorted(aggs["state_customers"]["state"].dropna().tolist())
+            sel_state = st.selectbox("📍 Filter State", [ALL_STATES] + states)
+
+    monthly, buyers = filter_category(aggs, sel_cat)
+    if sel_state != ALL_STATES:
+        monthly = filter_state(sketches, sel_cat, sel_state)
 
-    df = fct_orders.copy()
-    if sel_cat != "All Categories":
-        df = df[df["product_category_name"] == sel_cat]
+    if daily_index is not None:
+        render_date_range(daily_index, sel_cat)
 
     # Revenue Chart
     st.markdown(
@@ -38,73 +77,69 @@ def render(fct_orders, dim_customers, dim_sellers):
         unsafe_allow_html=True,
     )
 
-    monthly = df.copy()
-    monthly["month"] = monthly["order_purchase_timestamp"].dt.tz_localize(None).dt.to_period("M").astype(str)
-    m_agg = (
-        monthly.groupby("month")
-        .agg({"total_order_value": "sum", "order_id": "nunique"})
-        .reset_index()
-    )
-    m_agg.columns = ["Month", "Revenue", "Orders"]
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(
-        go.Bar(
-            x=m_agg["Month"],
-            y=m_agg["Revenue"],
-            name="Revenue",
-            marker=dict(
-                color=m_agg["Revenue"],
-                colorscale=[[0, "#6366f1"], [0.5, "#a855f7"], [1, "#8b5cf6"]],
+    with timed("chart", "revenue & orders"):
+        from plotly.subplots import make_subplots  # Not needed at startup
+
+        m_agg = monthly[["month", "revenue", "orders"]]
+        m_agg.columns = ["Month", "Revenue", "Orders"]
+
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(
+            go.Bar(
+                x=m_agg["Month"],
+                y=m_agg["Revenue"],
+                name="Revenue",
+                marker=dict(
+                    color=m_agg["Revenue"],
+                    colorscale=[[0, "#6366f1"], [0.5, "#a855f7"], [1, "#8b5cf6"]],
+                ),
             ),
-        ),
-        secondary_y=False,
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=m_agg["Month"],
-            y=m_agg["Orders"],
-            name="Orders",
-            line=dict(color="#22c55e", width=3),
-            mode="lines+markers",
-        ),
-        secondary_y=True,
-    )
+            secondary_y=False,
+        )
+        fig.add_trace(
+            go.Scatter(
+                x=m_agg["Month"],
+                y=m_agg["Orders"],
+                name="Orders",
+                line=dict(color="#22c55e", width=3),
+                mode="lines+markers",
+            ),
+            secondary_y=True,
+        )
 
-    fig.update_layout(
-        height=350,
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(tickfont=dict(color="#888"), gridcolor="rgba(255,255,255,0.05)"),
-        yaxis=dict(
-            title="Revenue (R$)",
-            gridcolor="rgba(255,255,255,0.05)",
-            tickfont=dict(color="#888"),
-        ),
-        yaxis2=dict(title="Orders", tickfont=dict(color="#888")),
-        legend=dict(orientation="h", y=1.1, font=dict(color="#fff")),
-        margin=dict(t=40, b=60),
-    )
-    st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+        fig.update_layout(
+            height=350,
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            xaxis=dict(tickfont=dict(color="#888"), gridcolor="rgba(255,255,255,0.05)"),
+            yaxis=dict(
+                title="Revenue (R$)",
+                gridcolor="rgba(255,255,255,0.05)",
+                tickfont=dict(color="#888"),
+            ),
+            yaxis2=dict(title="Orders", tickfont=dict(color="#888")),
+            legend=dict(orientation="h", y=1.1, font=dict(color="#fff")),
+            margin=dict(t=40, b=60),
+        )
+        st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+        if sel_state != ALL_STATES:
+            st.caption(
+                f"Orders in {sel_state} are HyperLogLog estimates: near-exact up to "
+                f"{SPARSE_LIMIT:,} a month, ±{ERROR:.1%} standard error beyond. "
+                "Revenue is exact."
+            )
 
     # Two charts row
     col1, col2 = st.columns(2)
 
-    with col1:
+    with col1, timed("chart", "customers by state"):
         st.markdown(
             '<div class="section-title">📍 Customers by State</div>',
             unsafe_allow_html=True,
         )
-        # Filter customers based on orders in the filtered dataset
-        filtered_customer_ids = df["customer_id"].unique()
-        filtered_customers = dim_customers[
-            dim_customers["customer_id"].isin(filtered_customer_ids)
-        ]
-        state_data = (
-            filtered_customers.groupby("state")
-            .size()
-            .nlargest(10)
-            .reset_index(name="Count")
+        # Customers who bought in the selected category, by state
+        state_data = buyers.nlargest(10, "customers").rename(
+            columns={"customers": "Count"}
         )
 
         fig = go.Figure(
@@ -127,13 +162,13 @@ def render(fct_orders, dim_customers, dim_sellers):
         )
         st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
 
-    with col2:
+    with col2, timed("chart", "seller tiers"):
         st.markdown(
             '<div class="section-title">⭐ Seller Performance Tiers</div>',
             unsafe_allow_html=True,
         )
         # Note: Seller data shown for all categories (seller_id not in fct_orders)
-        tier_data = dim_sellers.groupby("seller_tier").size().reset_index(name="Count")
+        tier_data = aggs["seller_tiers"].rename(columns={"sellers": "Count"})
         tier_order = ["Platinum", "Gold", "Silver", "Bronze"]
         tier_data["seller_tier"] = pd.Categorical(
             tier_data["seller_tier"], categories=tier_order, ordered=True
@@ -157,3 +192,75 @@ def render(fct_orders, dim_customers, dim_sellers):
             bargap=0.4,
         )
         st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+
+    if cohorts is not None:
+        with timed("chart", "cohort retention"):
+            render_cohorts(cohorts)
+
+
+def render_date_range(daily_index, category):
+    """KPIs of the selected date range, from the prefix-sum index."""
+    st.markdown(
+        '<div class="section-title">🗓️ Date Range</div>',
+        unsafe_allow_html=True,
+    )
+    first, last = daily_index.first.date(), daily_index.last.date()
+    start, end = st.slider(
+        "Purchase dates", first, last, (first, last), format="YYYY-MM-DD"
+    )
+
+    totals = daily_index.range_totals(
+        start, end, None if category == "All Categories" else category
+    )
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Revenue", fmt_curr(totals["revenue"]))
+    col2.metric("Orders", fmt_num(totals["orders"]))
+    col3.metric("Avg Order", fmt_curr(totals["avg_order_value"]))
+    col4.metric("Freight Share", f"{totals['freight_share']:.1%}")
+    st.caption(
+        f"{totals['days']:,} days · {fmt_num(totals['items'])} items · "
+        f"{fmt_curr(totals['avg_daily_revenue'])} per day"
+    )
+
+
+def render_cohorts(cohorts):
+    """Retention heatmap of the first-purchase month cohorts."""
+    st.markdown(
+        '<div class="section-title">🔁 Cohort Retention</div>',
+        unsafe_allow_html=True,
+    )
+    # Month 0 is every cohort's first purchase (100%), so it is left out
+    retention = cohorts.retention().iloc[:, 1:] * 100
+    sizes = np.broadcast_to(cohorts.sizes[:, None], retention.shape)
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=retention.to_numpy(),
+            x=retention.columns,
+            y=retention.index,
+            customdata=sizes,
+            colorscale=[[0, "#1a1a24"], [0.5, "#6366f1"], [1, "#a855f7"]],
+            hovertemplate=(
+                "Cohort %{y} (%{customdata:,} customers)<br>"
+                "Month %{x}: %{z:.2f}% ordered again<extra></extra>"
+            ),
+            colorbar={"ticksuffix": "%", "tickfont": {"color": "#888"}},
+        )
+    )
+    fig.update_layout(
+        height=max(300, 18 * len(retention)),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        xaxis={
+            "title": {"text": "Months since first purchase", "font": {"color": "#888"}},
+            "tickfont": {"color": "#888"},
+            "dtick": 1,
+        },
+        yaxis={"tickfont": {"color": "#fff", "size": 9}, "autorange": "reversed"},
+        margin={"t": 10, "b": 40},
+    )
+    st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+    st.caption(
+        "Share of each first-purchase month's customers (customer_unique_id) "
+        "who ordered again that many months later; blank cells are past the data."
+    )
@@ -2,13 +2,28 @@
 Home tab component
 """
 
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-from app.utils import fmt_curr, fmt_num
+from app.profiling import timed
+from app.timeindex import COMPARED, COMPARISONS
+from app.utils import fmt_curr, fmt_num, fmt_span
 
+# Compared metric -> (label, formatter)
+COMPARED_LABELS = {
+    "revenue": ("Revenue", fmt_curr),
+    "orders": ("Orders", fmt_num),
+    "avg_order_value": ("Avg Order", fmt_curr),
+    "new_customers": ("New Customers", fmt_num),
+}
 
-def render(fct_orders, dim_customers, dim_sellers):
-    """Render the Home tab with KPIs and overview charts."""
+
+def render(summary):
+    """Render the Home tab with KPIs and overview charts from app.summary.
+
+    Returns the empty container below the KPI cards that render_comparison()
+    fills once the date-range index is loaded.
+    """
     st.markdown(
         """
     <div class="hero-header">
@@ -20,12 +35,16 @@ def render(fct_orders, dim_customers, dim_sellers):
     )
 
     # Calculate metrics
-    total_rev = fct_orders["total_order_value"].sum()
-    total_ord = fct_orders["order_id"].nunique()
-    total_cust = dim_customers["customer_id"].nunique()
+    kpis = summary["kpis"]
+    total_rev = kpis["total_revenue"]
+    total_ord = kpis["total_orders"]
+    total_cust = kpis["total_customers"]
     avg_order = total_rev / total_ord if total_ord > 0 else 0
-    avg_rating = dim_sellers["avg_review_score"].mean()
-    total_sellers = len(dim_sellers)
+    avg_rating = kpis["avg_rating"]
+    total_sellers = kpis["total_sellers"]
+    sales_span = fmt_span(
+        pd.Timestamp(kpis["first_purchase"]), pd.Timestamp(kpis["last_purchase"])
+    )
 
     # 6 KPI Cards
     st.markdown(
@@ -35,7 +54,7 @@ def render(fct_orders, dim_customers, dim_sellers):
             <div class="kpi-icon">💰</div>
             <div class="kpi-label">Total Revenue</div>
             <div class="kpi-value">{fmt_curr(total_rev)}</div>
-            <div class="kpi-desc">2 years of sales</div>
+            <div class="kpi-desc">{sales_span} of sales</div>
         </div>
         <div class="kpi-card">
             <div class="kpi-icon">📦</div>
@@ -71,6 +90,7 @@ def render(fct_orders, dim_customers, dim_sellers):
     """,
         unsafe_allow_html=True,
     )
+    comparison = st.container()
 
     # Key Insights Section
     st.markdown(
@@ -78,17 +98,13 @@ def render(fct_orders, dim_customers, dim_sellers):
         unsafe_allow_html=True,
     )
 
-    top_category = (
-        fct_orders.groupby("product_category_name")["total_order_value"].sum().idxmax()
-    )
-    top_category_rev = (
-        fct_orders.groupby("product_category_name")["total_order_value"].sum().max()
-    )
-    top_state = dim_customers["state"].value_counts().idxmax()
-    top_state_pct = (
-        dim_customers["state"].value_counts().max() / len(dim_customers) * 100
-    )
-    platinum_sellers = (dim_sellers["seller_tier"] == "Platinum").sum()
+    categories = summary["top_categories"]
+    top_category = categories["product_category_name"][0]
+    top_category_rev = categories["revenue"][0]
+    states = summary["top_states"]
+    top_state = states["state"][0]
+    top_state_pct = states["customers"][0] / total_cust * 100
+    platinum_sellers = summary["platinum_sellers"]
 
     col1, col2, col3 = st.columns(3)
 
@@ -139,7 +155,7 @@ def render(fct_orders, dim_customers, dim_sellers):
 
     col1, col2 = st.columns(2)
 
-    with col1:
+    with col1, timed("chart", "monthly revenue"):
         st.markdown(
             """
         <div class="chart-card">
@@ -150,19 +166,12 @@ def render(fct_orders, dim_customers, dim_sellers):
             unsafe_allow_html=True,
         )
 
-        monthly = fct_orders.copy()
-        monthly["month"] = (
-            monthly["order_purchase_timestamp"]
-            .dt.tz_localize(None)
-            .dt.to_period("M")
-            .astype(str)
-        )
-        m_agg = monthly.groupby("month")["total_order_value"].sum().reset_index()
+        m_agg = summary["monthly"]
 
         fig = go.Figure(
             go.Scatter(
                 x=m_agg["month"],
-                y=m_agg["total_order_value"],
+                y=m_agg["revenue"],
                 mode="lines+markers",
                 fill="tozeroy",
                 line=dict(color="#a855f7", width=3),
@@ -184,7 +193,7 @@ def render(fct_orders, dim_customers, dim_sellers):
         )
         st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
 
-    with col2:
+    with col2, timed("chart", "rating gauge"):
         st.markdown(
             """
         <div class="chart-card">
@@ -233,7 +242,7 @@ def render(fct_orders, dim_customers, dim_sellers):
     # Second row of charts
     col1, col2 = st.columns(2)
 
-    with col1:
+    with col1, timed("chart", "top categories"):
         st.markdown(
             """
         <div class="chart-card">
@@ -244,24 +253,17 @@ def render(fct_orders, dim_customers, dim_sellers):
             unsafe_allow_html=True,
         )
 
-        cat_data = (
-            fct_orders.groupby("product_category_name")["total_order_value"]
-            .sum()
-            .nlargest(5)
-            .reset_index()
-        )
-        cat_data = cat_data.sort_values("total_order_value")
-
         fig = go.Figure(
             go.Bar(
-                x=cat_data["total_order_value"],
-                y=cat_data["product_category_name"],
+                # Ascending, so the top category is drawn at the top
+                x=categories["revenue"][::-1],
+                y=categories["product_category_name"][::-1],
                 orientation="h",
                 marker=dict(
                     color=["#3b82f6", "#6366f1", "#8b5cf6", "#a855f7", "#c084fc"],
                     line=dict(width=0),
                 ),
-                text=[fmt_curr(x) for x in cat_data["total_order_value"]],
+                text=[fmt_curr(x) for x in categories["revenue"][::-1]],
                 textposition="outside",
                 textfont=dict(color="#c4b5fd", size=10),
             )
@@ -276,7 +278,7 @@ def render(fct_orders, dim_customers, dim_sellers):
         )
         st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
 
-    with col2:
+    with col2, timed("chart", "customer states"):
         st.markdown(
             """
         <div class="chart-card">
@@ -287,13 +289,10 @@ def render(fct_orders, dim_customers, dim_sellers):
             unsafe_allow_html=True,
         )
 
-        state_data = dim_customers["state"].value_counts().head(5).reset_index()
-        state_data.columns = ["State", "Count"]
-
         fig = go.Figure(
             go.Pie(
-                labels=state_data["State"],
-                values=state_data["Count"],
+                labels=states["state"],
+                values=states["customers"],
                 hole=0.6,
                 marker=dict(
                     colors=["#a855f7", "#8b5cf6", "#6366f1", "#4f46e5", "#4338ca"],
@@ -392,3 +391,60 @@ def render(fct_orders, dim_customers, dim_sellers):
     """,
         unsafe_allow_html=True,
     )
+    return comparison
+
+
+def _period(start, end) -> str:
+    return f"{start:%d %b %Y} – {end:%d %b %Y}"
+
+
+def render_comparison(daily_index):
+    """Period-over-period KPIs from the date-range index (app.timeindex)."""
+    st.markdown(
+        '<div class="section-title">📊 Period Comparison</div>',
+        unsafe_allow_html=True,
+    )
+    first, last = daily_index.first, daily_index.last
+    col1, col2 = st.columns([1, 2])
+    comparison = col1.selectbox("Compare", COMPARISONS, key="home_comparison")
+    if comparison == "Custom vs prior period":
+        default = (max(first, last - pd.Timedelta(days=29)).date(), last.date())
+        dates = col2.date_input(
+            "Period", default, first.date(), last.date(), key="home_period"
+        )
+        if len(dates) != 2:
+            return  # The end date is not picked yet
+        start, end = dates
+    else:
+        months = pd.period_range(first, last, freq="M")[::-1]
+        # The latest month is usually partial, so default to the last whole one
+        default = 0 if last.is_month_end or len(months) == 1 else 1
+        month = col2.selectbox(
+            "Month",
+            months,
+            index=default,
+            format_func=lambda m: m.strftime("%b %Y"),
+            key="home_month",
+        )
+        # A month still in progress is compared day for day
+        start, end = month.start_time, min(month.end_time.normalize(), last)
+
+    result = daily_index.compare(comparison, start, end)
+    for col, metric in zip(st.columns(len(COMPARED)), COMPARED):
+        label, fmt = COMPARED_LABELS[metric]
+        now, before, change = result[metric]
+        col.metric(
+            label,
+            fmt(now),
+            None if change is None else f"{change:+.1%}",
+            help=f"{fmt(before)} in the previous period",
+        )
+    note = (
+        ""
+        if result["covered"]
+        else f" · no change shown: the data runs {_period(first, last)}"
+    )
+    st.caption(
+        f"{_period(*result['current'])} vs {_period(*result['previous'])} · "
+        f"new customers are first purchases{note}"
+    )
@@ -2,12 +2,71 @@
 Query Data tab component
 """
 
+import time
+
 import streamlit as st
+from app.drilldown import get_customer_orders, order_summary
+from app.engine import get_engine, get_order_months
+from app.profiling import timed
+from app.refresh import get_data_version
+from app.search import SEARCH_FIELDS, get_search_index
 from app.utils import fmt_curr
 
 
-def render(fct_orders, dim_products, dim_customers):
-    """Render the Query Data tab with filter and download options."""
+MONTH_COLUMNS = [
+    "order_id",
+    "customer_id",
+    "product_category_name",
+    "price",
+    "total_order_value",
+]
+
+
+def order_months(fct_orders, engine=None):
+    """Purchase month (YYYY-MM) of every order item."""
+    return get_engine(engine).order_months(fct_orders)
+
+
+def month_orders(fct_orders, months, month):
+    """Order items purchased in one month."""
+    return fct_orders.loc[months == month, MONTH_COLUMNS]
+
+
+def category_products(dim_products, category):
+    """Products of one category."""
+    return dim_products.loc[
+        dim_products["product_category_name"] == category,
+        [
+            "product_id",
+            "product_category_name",
+            "times_sold",
+            "total_revenue",
+            "sales_tier",
+        ],
+    ]
+
+
+def state_customers(dim_customers, state):
+    """Customers living in one state."""
+    return dim_customers.loc[
+        dim_customers["state"] == state,
+        [
+            "customer_unique_id",
+            "city",
+            "state",
+            "total_orders",
+            "lifetime_value",
+            "customer_type",
+        ],
+    ]
+
+
+def render(fct_orders, dim_products, dim_customers, facts=None):
+    """Render the Query Data tab with filter and download options.
+
+    With facts (app.outofcore.FactDataset) fct_orders is None and the order
+    queries are scans of the partitioned dataset instead.
+    """
     st.markdown(
         """
     <div class="hero-header" style="background: linear-gradient(135deg, #f97316 0%, #f59e0b 50%, #eab308 100%);">
@@ -18,8 +77,8 @@ def render(fct_orders, dim_products, dim_customers):
         unsafe_allow_html=True,
     )
 
-    query_tab1, query_tab2, query_tab3 = st.tabs(
-        ["📅 Orders", "🏷️ Products", "👥 Customers"]
+    query_tab1, query_tab2, query_tab3, query_tab4 = st.tabs(
+        ["📅 Orders", "🏷️ Products", "👥 Customers", "🔎 Search"]
     )
 
     with query_tab1:
@@ -28,21 +87,18 @@ def render(fct_orders, dim_products, dim_customers):
             unsafe_allow_html=True,
         )
 
-        fct_orders["month"] = (
-            fct_orders["order_purchase_timestamp"].dt.tz_localize(None).dt.to_period("M").astype(str)
-        )
-        months = sorted(fct_orders["month"].unique().tolist())
+        if facts is None:
+            # Kept out of fct_orders: it is shared with the other tabs and caches
+            item_months = get_order_months(get_data_version(), fct_orders)
+            months = sorted(item_months.unique().tolist())
+        else:
+            months = facts.months()
         sel_month = st.selectbox("Select Month", months, index=len(months) - 1)
 
-        month_data = fct_orders[fct_orders["month"] == sel_month][
-            [
-                "order_id",
-                "customer_id",
-                "product_category_name",
-                "price",
-                "total_order_value",
-            ]
-        ].copy()
+        if facts is None:
+            month_data = month_orders(fct_orders, item_months, sel_month)
+        else:
+            month_data = facts.month_orders(sel_month, MONTH_COLUMNS)
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Orders", f"{month_data['order_id'].nunique():,}")
@@ -51,7 +107,8 @@ def render(fct_orders, dim_products, dim_customers):
 
         st.dataframe(month_data.head(100), width="stretch", hide_index=True)
 
-        csv = month_data.to_csv(index=False)
+        with timed("csv", "orders"):
+            csv = month_data.to_csv(index=False)
         st.download_button(
             f"📥 Download {len(month_data):,} orders",
             csv,
@@ -70,15 +127,7 @@ def render(fct_orders, dim_products, dim_customers):
         )
         sel_cat_q = st.selectbox("Select Category", categories, key="cat_query")
 
-        cat_data = dim_products[dim_products["product_category_name"] == sel_cat_q][
-            [
-                "product_id",
-                "product_category_name",
-                "times_sold",
-                "total_revenue",
-                "sales_tier",
-            ]
-        ].copy()
+        cat_data = category_products(dim_products, sel_cat_q)
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Products", f"{len(cat_data):,}")
@@ -91,7 +140,8 @@ def render(fct_orders, dim_products, dim_customers):
             hide_index=True,
         )
 
-        csv = cat_data.to_csv(index=False)
+        with timed("csv", "products"):
+            csv = cat_data.to_csv(index=False)
         st.download_button(
             f"📥 Download {len(cat_data):,} products", csv, "products.csv", "text/csv"
         )
@@ -105,16 +155,7 @@ def render(fct_orders, dim_products, dim_customers):
         states = sorted(dim_customers["state"].dropna().unique().tolist())
         sel_state = st.selectbox("Select State", states)
 
-        state_data = dim_customers[dim_customers["state"] == sel_state][
-            [
-                "customer_unique_id",
-                "city",
-                "state",
-                "total_orders",
-                "lifetime_value",
-                "customer_type",
-            ]
-        ].copy()
+        state_data = state_customers(dim_customers, sel_state)
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Customers", f"{len(state_data):,}")
@@ -125,10 +166,85 @@ def render(fct_orders, dim_products, dim_customers):
             state_data.nlargest(100, "lifetime_value"), width="stretch", hide_index=True
         )
 
-        csv = state_data.to_csv(index=False)
+        with timed("csv", "customers"):
+            csv = state_data.to_csv(index=False)
         st.download_button(
             f"📥 Download {len(state_data):,} customers",
             csv,
             f"customers_{sel_state}.csv",
             "text/csv",
         )
+
+        st.markdown(
+            '<div class="section-title">🧾 Customer Drill-down</div>',
+            unsafe_allow_html=True,
+        )
+
+        if facts is None:
+            customer_orders = get_customer_orders(
+                get_data_version(), fct_orders, dim_customers
+            )
+        top_customers = (
+            state_data.nlargest(100, "lifetime_value")["customer_unique_id"]
+            .drop_duplicates()
+            .tolist()
+        )
+        sel_customer = st.selectbox("Select Customer", top_customers)
+
+        if sel_customer:
+            if facts is None:
+                items = customer_orders.items(sel_customer)
+            else:
+                items = facts.customer_items(
+                    dim_customers.loc[
+                        dim_customers["customer_unique_id"] == sel_customer,
+                        "customer_id",
+                    ]
+                )
+            orders = order_summary(items)
+            st.dataframe(orders, width="stretch", hide_index=True)
+
+            if len(orders):
+                sel_order = st.selectbox("Select Order", orders["order_id"].tolist())
+                st.dataframe(
+                    items[items["order_id"] == sel_order][
+                        [
+                            "product_id",
+                            "product_category_name",
+                            "price",
+                            "freight_value",
+                            "total_order_value",
+                        ]
+                    ],
+                    width="stretch",
+                    hide_index=True,
+                )
+
+    with query_tab4:
+        st.markdown(
+            '<div class="section-title">🔎 Search by Prefix</div>',
+            unsafe_allow_html=True,
+        )
+
+        index = get_search_index(
+            get_data_version(), fct_orders, dim_customers, dim_products
+        )
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            field = st.selectbox("Search in", list(SEARCH_FIELDS), key="search_field")
+        with col2:
+            prefix = st.text_input(
+                "Starts with", placeholder="e.g. 3a5f, sao paulo, beleza"
+            )
+
+        if prefix.strip():
+            start = time.perf_counter()
+            if field == "Order ID" and facts is not None:
+                n_matches, matches = facts.search_order_ids(prefix)
+            else:
+                n_matches, matches = index.search(field, prefix)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            st.caption(f"{n_matches:,} matches in {elapsed_ms:.1f} ms")
+            st.dataframe(matches, width="stretch", hide_index=True)
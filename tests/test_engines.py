@@ -0,0 +1,51 @@
+"""
+Parity of the Polars engine with pandas (app.engine)
+Every dashboard aggregate and the Query Data month column must come out of
+the Polars engine exactly as pandas computes them, on synthetic tables and
+on tables with the missing keys and values pandas drops or skips.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.aggregates import build_aggregates
+from app.synthetic import generate
+from tabs.query import order_months
+
+pytest.importorskip("polars")
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return generate(0.05, seed=7)
+
+
+@pytest.fixture(scope="module")
+def gappy_tables(tables):
+    """The synthetic tables with missing categories, timestamps and customers."""
+    fct_orders, dim_customers, dim_products, dim_sellers = tables
+    fct_orders = fct_orders.copy()
+    rows = np.random.default_rng(0).permutation(len(fct_orders))[:300]
+    fct_orders.loc[fct_orders.index[rows[:100]], "product_category_name"] = None
+    fct_orders.loc[fct_orders.index[rows[100:200]], "order_purchase_timestamp"] = pd.NaT
+    fct_orders.loc[fct_orders.index[rows[200:]], "customer_id"] = "not-a-customer"
+    return fct_orders, dim_customers, dim_products, dim_sellers
+
+
+@pytest.mark.parametrize("which", ["tables", "gappy_tables"])
+def test_aggregates_match_pandas(which, request):
+    fct_orders, dim_customers, _, dim_sellers = request.getfixturevalue(which)
+    expected = build_aggregates(fct_orders, dim_customers, dim_sellers, "pandas")
+    actual = build_aggregates(fct_orders, dim_customers, dim_sellers, "polars")
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        pd.testing.assert_frame_equal(actual[name], expected[name], obj=name)
+
+
+@pytest.mark.parametrize("which", ["tables", "gappy_tables"])
+def test_order_months_match_pandas(which, request):
+    fct_orders = request.getfixturevalue(which)[0]
+    pd.testing.assert_series_equal(
+        order_months(fct_orders, "polars"), order_months(fct_orders, "pandas")
+    )